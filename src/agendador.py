@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .database import engine
+from .services import reserva_service
+
+logger = logging.getLogger("frotanext.expiracao")
+
+EXPIRACAO_HABILITADA = os.getenv("EXPIRACAO_HABILITADA", "true").lower() == "true"
+EXPIRACAO_INTERVALO_SEGUNDOS = float(os.getenv("EXPIRACAO_INTERVALO_SEGUNDOS", "300"))
+RESERVA_PENDENTE_VALIDADE_MINUTOS = float(
+    os.getenv("RESERVA_PENDENTE_VALIDADE_MINUTOS", "120")
+)
+EXPIRACAO_TAMANHO_LOTE = int(os.getenv("EXPIRACAO_TAMANHO_LOTE", "500"))
+
+# Chave do advisory lock do Postgres que elege o worker responsável pela
+# rodada. Qualquer inteiro de 64 bits serve, desde que seja só desta tarefa.
+CHAVE_LOCK_EXPIRACAO = 7_302_150_001
+
+
+class AgendadorExpiracao:
+    """
+    Expira periodicamente as reservas pendentes que passaram da validade.
+    Cada worker roda o próprio agendador; a cada rodada, só quem obtém o
+    advisory lock trabalha, e os demais pulam a vez.
+    """
+
+    def __init__(
+        self,
+        intervalo_segundos: float,
+        validade_minutos: float,
+        tamanho_lote: int,
+        engine_alvo=engine,
+    ):
+        self.intervalo_segundos = intervalo_segundos
+        self.validade = timedelta(minutes=validade_minutos)
+        self.tamanho_lote = tamanho_lote
+        self._engine = engine_alvo
+        self._tarefa: Optional[asyncio.Task] = None
+
+    def executar_rodada(self) -> Optional[int]:
+        """
+        Roda uma expiração completa. Retorna quantas reservas expiraram, ou
+        None se outro worker detém o lock.
+        """
+        usa_lock = self._engine.dialect.name == "postgresql"
+        with self._engine.connect() as conexao:
+            if usa_lock:
+                obteve = conexao.scalar(
+                    text("SELECT pg_try_advisory_lock(:chave)"),
+                    {"chave": CHAVE_LOCK_EXPIRACAO},
+                )
+                # O lock é de sessão: sobrevive aos commits de cada lote.
+                conexao.commit()
+                if not obteve:
+                    return None
+            try:
+                with Session(bind=conexao) as sessao_banco:
+                    return reserva_service.expirar_reservas_pendentes(
+                        sessao_banco,
+                        criadas_antes_de=datetime.now() - self.validade,
+                        tamanho_lote=self.tamanho_lote,
+                    )
+            finally:
+                if usa_lock:
+                    conexao.execute(
+                        text("SELECT pg_advisory_unlock(:chave)"),
+                        {"chave": CHAVE_LOCK_EXPIRACAO},
+                    )
+                    conexao.commit()
+
+    async def _laco(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_segundos)
+            try:
+                expiradas = await to_thread.run_sync(self.executar_rodada)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Falha ao expirar reservas pendentes.")
+                continue
+            if expiradas:
+                logger.info("%d reservas pendentes expiradas.", expiradas)
+
+    def iniciar(self) -> None:
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._laco())
+
+    async def encerrar(self) -> None:
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+
+agendador_expiracao = AgendadorExpiracao(
+    intervalo_segundos=EXPIRACAO_INTERVALO_SEGUNDOS,
+    validade_minutos=RESERVA_PENDENTE_VALIDADE_MINUTOS,
+    tamanho_lote=EXPIRACAO_TAMANHO_LOTE,
+)
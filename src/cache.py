@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache em memória, limitado por quantidade de entradas (descarta a usada
+    há mais tempo) e com expiração por entrada em horário absoluto (epoch).
+    Seguro para uso entre threads; conta acertos e falhas.
+    """
+
+    def __init__(self, tamanho_maximo: int):
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        agora = time.time()
+        with self._trava:
+            entrada = self._entradas.get(chave, _AUSENTE)
+            if entrada is not _AUSENTE:
+                valor, expira_em = entrada
+                if expira_em is None or expira_em > agora:
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._entradas[chave]
+            self.falhas += 1
+            return padrao
+
+    def definir(
+        self, chave: Hashable, valor: Any, expira_em: Optional[float] = None
+    ) -> None:
+        if self.tamanho_maximo <= 0:
+            return
+        with self._trava:
+            self._entradas[chave] = (valor, expira_em)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, chave: Hashable) -> None:
+        with self._trava:
+            self._entradas.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._entradas.clear()
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "tamanho_maximo": self.tamanho_maximo,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+class GeracaoCache:
+    """
+    Contador de invalidações de um CacheLRU. Quem monta um valor captura a
+    geração antes de consultar a origem; se uma invalidação acontecer no meio
+    do caminho, o valor montado é descartado em vez de guardado.
+    """
+
+    def __init__(self, cache: CacheLRU):
+        self.cache = cache
+        self._geracao = 0
+        self._trava = threading.Lock()
+
+    def atual(self) -> int:
+        with self._trava:
+            return self._geracao
+
+    def invalidar(self) -> None:
+        with self._trava:
+            self._geracao += 1
+            self.cache.limpar()
+
+    def definir_se_atual(
+        self,
+        geracao: int,
+        chave: Hashable,
+        valor: Any,
+        expira_em: Optional[float] = None,
+    ) -> None:
+        with self._trava:
+            if geracao == self._geracao:
+                self.cache.definir(chave, valor, expira_em=expira_em)
@@ -0,0 +1,135 @@
+import os
+import time
+from typing import Hashable, NamedTuple, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import CacheLRU, GeracaoCache
+from .models.veiculo import RemocaoVeiculo, Veiculo
+
+_CHAVE_ALTEROU_CATALOGO = "alterou_catalogo"
+
+
+class VersaoCatalogo(NamedTuple):
+    """
+    Maiores versões gravadas em `veiculos` e em `remocoes_veiculos`. Toda
+    escrita recebe uma versão maior que as anteriores (`ProximaVersao`), então
+    o par só se repete se nada mudou. Cada `max` lê a ponta de um índice.
+    """
+
+    maior_versao: int
+    maior_remocao: int
+
+
+def _consulta_versao_catalogo():
+    return select(
+        func.coalesce(
+            select(func.max(Veiculo.__table__.c.versao)).scalar_subquery(), 0
+        ),
+        func.coalesce(select(func.max(RemocaoVeiculo.versao)).scalar_subquery(), 0),
+    )
+
+
+def obter_versao_catalogo(sessao_banco: Session) -> VersaoCatalogo:
+    return VersaoCatalogo(*sessao_banco.execute(_consulta_versao_catalogo()).one())
+
+
+async def obter_versao_catalogo_async(sessao_banco: AsyncSession) -> VersaoCatalogo:
+    resultado = await sessao_banco.execute(_consulta_versao_catalogo())
+    return VersaoCatalogo(*resultado.one())
+
+
+@event.listens_for(Session, "before_flush")
+def _marcar_alteracao_por_flush(sessao_banco, _flush_context, _instancias):
+    if any(isinstance(obj, Veiculo) for obj in sessao_banco.new) or any(
+        isinstance(obj, Veiculo) for obj in sessao_banco.deleted
+    ):
+        sessao_banco.info[_CHAVE_ALTEROU_CATALOGO] = True
+        return
+    if any(
+        isinstance(obj, Veiculo) and sessao_banco.is_modified(obj)
+        for obj in sessao_banco.dirty
+    ):
+        sessao_banco.info[_CHAVE_ALTEROU_CATALOGO] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_alteracao_por_instrucao(estado_execucao):
+    # UPDATE/DELETE em massa (ex.: reserva condicional, transições em lote).
+    if estado_execucao.is_update or estado_execucao.is_delete:
+        mapper = estado_execucao.bind_mapper
+        if mapper is not None and mapper.isa(Veiculo.__mapper__):
+            estado_execucao.session.info[_CHAVE_ALTEROU_CATALOGO] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_nova_versao(sessao_banco):
+    if sessao_banco.info.pop(_CHAVE_ALTEROU_CATALOGO, False):
+        # Depois do commit, que já levou os dados novos: uma resposta montada
+        # antes daqui carrega a geração antiga e é recusada por
+        # guardar_resposta_catalogo.
+        invalidar_respostas_catalogo()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_alteracao(sessao_banco, _transacao_anterior):
+    sessao_banco.info.pop(_CHAVE_ALTEROU_CATALOGO, None)
+
+
+# Respostas prontas (bytes JSON) das listagens do catálogo, por parâmetros
+# normalizados. Limpo a cada commit que altera veículos neste processo; o TTL
+# cobre as alterações feitas por outros workers.
+CATALOGO_CACHE_TAMANHO = int(os.getenv("CATALOGO_CACHE_TAMANHO", "512"))
+CATALOGO_CACHE_TTL_SEGUNDOS = float(os.getenv("CATALOGO_CACHE_TTL_SEGUNDOS", "5"))
+cache_respostas_catalogo = CacheLRU(CATALOGO_CACHE_TAMANHO)
+geracao_respostas = GeracaoCache(cache_respostas_catalogo)
+
+
+class RespostaCatalogo(NamedTuple):
+    etag: str
+    corpo: bytes
+    proximo_cursor: Optional[str]
+
+
+def geracao_respostas_catalogo() -> int:
+    """Capturar antes de consultar o banco e repassar a guardar_resposta_catalogo."""
+    return geracao_respostas.atual()
+
+
+def invalidar_respostas_catalogo() -> None:
+    geracao_respostas.invalidar()
+
+
+def guardar_resposta_catalogo(
+    chave: Hashable, resposta: RespostaCatalogo, geracao: int
+) -> None:
+    # Uma alteração concorrida com a montagem da resposta a torna suspeita:
+    # melhor não guardar do que servir dados antigos até o TTL.
+    geracao_respostas.definir_se_atual(
+        geracao, chave, resposta, expira_em=time.time() + CATALOGO_CACHE_TTL_SEGUNDOS
+    )
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca (RFC 9110) de If-None-Match contra a ETag atual."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == alvo
+        for candidato in if_none_match.split(",")
+    )
+
+
+def etag_catalogo(versao_catalogo: VersaoCatalogo) -> str:
+    return (
+        f'W/"catalogo-{versao_catalogo.maior_versao}-{versao_catalogo.maior_remocao}"'
+    )
+
+
+def etag_veiculo(id_veiculo: int, versao: int) -> str:
+    return f'W/"veiculo-{id_veiculo}-{versao}"'
@@ -1,13 +1,200 @@
 import os
+import threading
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+class _EstatisticasPoolMixin:
+    """
+    Registra quantos chamadores aguardam uma conexão e quanto tempo esperaram,
+    para dimensionar workers contra o banco. Só conta como espera o checkout
+    feito com o pool esgotado (sem conexão ociosa nem overflow disponível).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trava_estatisticas = threading.Lock()
+        self._aguardando = 0
+        self._total_checkouts = 0
+        self._total_esperas = 0
+        self._tempo_espera_total = 0.0
+        self._tempo_espera_maximo = 0.0
+
+    def _esgotado(self) -> bool:
+        # max_overflow == -1 significa estouro ilimitado: nunca esgota.
+        return self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+
+    def _do_get(self):
+        if not self._esgotado():
+            conexao = super()._do_get()
+            with self._trava_estatisticas:
+                self._total_checkouts += 1
+            return conexao
+
+        with self._trava_estatisticas:
+            self._aguardando += 1
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._trava_estatisticas:
+                self._aguardando -= 1
+                self._total_checkouts += 1
+                self._total_esperas += 1
+                self._tempo_espera_total += espera
+                self._tempo_espera_maximo = max(self._tempo_espera_maximo, espera)
+
+    def estatisticas(self) -> dict:
+        with self._trava_estatisticas:
+            media_ms = (
+                self._tempo_espera_total / self._total_esperas * 1000
+                if self._total_esperas
+                else 0.0
+            )
+            return {
+                "tamanho": self.size(),
+                "conexoes_em_uso": self.checkedout(),
+                "conexoes_ociosas": self.checkedin(),
+                "overflow": self.overflow(),
+                "aguardando": self._aguardando,
+                "total_checkouts": self._total_checkouts,
+                "checkouts_com_espera": self._total_esperas,
+                "espera_media_ms": round(media_ms, 3),
+                "espera_maxima_ms": round(self._tempo_espera_maximo * 1000, 3),
+            }
+
+
+class PoolObservavel(_EstatisticasPoolMixin, QueuePool):
+    pass
+
+
+class PoolObservavelAsync(_EstatisticasPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _argumentos_engine(url: str, assincrono: bool = False) -> dict:
+    # SQLite (usado nos testes locais) não aceita as opções de pool do Postgres.
+    if str(url).startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": PoolObservavelAsync if assincrono else PoolObservavel,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _converter_url_async(url: str):
+    url_banco = make_url(url)
+    if url_banco.get_backend_name() == "sqlite":
+        return url_banco.set(drivername="sqlite+aiosqlite")
+    return url_banco.set(drivername=f"{url_banco.get_backend_name()}+asyncpg")
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão de leitura: consulta a réplica (quando configurada) e passa a usar
+    o primário a partir da primeira escrita, garantindo read-your-writes
+    dentro da mesma requisição.
+    """
+
+    def __init__(self, *args, bind_replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bind_replica = bind_replica
+        self.escreveu_no_primario = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if clause is not None and getattr(clause, "is_dml", False):
+            self.escreveu_no_primario = True
+        if self.bind_replica is None or self.escreveu_no_primario:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.bind_replica
+
+
+@event.listens_for(SessaoRoteada, "before_flush")
+def _marcar_escrita_no_primario(sessao_banco, _flush_context, _instancias):
+    sessao_banco.escreveu_no_primario = True
+
+
+engine = create_engine(DATABASE_URL, **_argumentos_engine(DATABASE_URL))
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or _converter_url_async(DATABASE_URL),
+    **_argumentos_engine(DATABASE_URL, assincrono=True),
+)
+
+engine_replica = None
+async_engine_replica = None
+if DATABASE_REPLICA_URL:
+    engine_replica = create_engine(
+        DATABASE_REPLICA_URL, **_argumentos_engine(DATABASE_REPLICA_URL)
+    )
+    async_engine_replica = create_async_engine(
+        _converter_url_async(DATABASE_REPLICA_URL),
+        **_argumentos_engine(DATABASE_REPLICA_URL, assincrono=True),
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+SessionLeitura = sessionmaker(
+    class_=SessaoRoteada,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    bind_replica=engine_replica,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+AsyncSessionLeitura = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=SessaoRoteada,
+    autoflush=False,
+    expire_on_commit=False,
+    bind_replica=async_engine_replica.sync_engine if async_engine_replica else None,
+)
+
 Base = declarative_base()
+
+
+def obter_estatisticas_pool(engine_alvo=None) -> dict:
+    """
+    Retorna um retrato do pool de conexões do engine informado (ou do principal).
+    """
+    engine_alvo = engine_alvo or engine
+    pool = getattr(engine_alvo, "sync_engine", engine_alvo).pool
+    if isinstance(pool, _EstatisticasPoolMixin):
+        return pool.estatisticas()
+
+    estatisticas = {"tipo": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        estatisticas.update(
+            {
+                "tamanho": pool.size(),
+                "conexoes_em_uso": pool.checkedout(),
+                "conexoes_ociosas": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    return estatisticas
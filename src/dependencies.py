@@ -1,13 +1,30 @@
-from typing import Annotated
+import os
+import secrets
+import time
+from typing import Annotated, Callable, Dict, Hashable, NamedTuple, Optional
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBearer,
+    OAuth2PasswordBearer,
+)
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
 from src.services import auth_service
 
 from . import models
 from . import seguranca as seguranca_service
-from .database import SessionLocal
+from .database import (
+    AsyncSessionLeitura,
+    AsyncSessionLocal,
+    SessionLeitura,
+    SessionLocal,
+)
+from .models.enums import TipoPerfilEnum
 
 
 def obter_sessao_banco() -> Session:
@@ -20,11 +37,66 @@ def obter_sessao_banco() -> Session:
             sessao_banco.close()
 
 
+async def obter_sessao_banco_async() -> AsyncSession:
+    async with AsyncSessionLocal() as sessao_banco:
+        yield sessao_banco
+
+
+def obter_sessao_leitura() -> Session:
+    """
+    Sessão para rotas somente-leitura: usa a réplica, se configurada.
+    """
+    sessao_banco: Session | None = None
+    try:
+        sessao_banco = SessionLeitura()
+        yield sessao_banco
+    finally:
+        if sessao_banco is not None:
+            sessao_banco.close()
+
+
+async def obter_sessao_leitura_async() -> AsyncSession:
+    async with AsyncSessionLeitura() as sessao_banco:
+        yield sessao_banco
+
+
 oauth2_scheme_funcionario = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 oauth2_scheme_cliente = OAuth2PasswordBearer(tokenUrl="clientes/token")
 
 
+def _instantanea_principal(principal):
+    """
+    Cópia desanexada apenas com as colunas do principal. Nunca pertence a
+    uma sessão, então não é expirada por commits de outras requisições.
+    """
+    mapper = inspect(principal).mapper
+    copia = mapper.class_manager.new_instance()
+    for atributo in mapper.column_attrs:
+        set_committed_value(copia, atributo.key, getattr(principal, atributo.key))
+    make_transient_to_detached(copia)
+    return copia
+
+
+def _carregar_principal(
+    sessao_banco: Session, chave: Hashable, carregar: Callable[[], Optional[object]]
+):
+    instantanea = seguranca_service.cache_principais.obter(chave)
+    if instantanea is not None:
+        # load=False anexa a cópia à sessão da requisição sem ir ao banco;
+        # relacionamentos continuam carregando sob demanda por essa sessão.
+        return sessao_banco.merge(instantanea, load=False)
+
+    principal = carregar()
+    if principal is not None:
+        seguranca_service.cache_principais.definir(
+            chave,
+            _instantanea_principal(principal),
+            expira_em=time.time() + seguranca_service.PRINCIPAL_CACHE_TTL_SEGUNDOS,
+        )
+    return principal
+
+
 def obter_cliente_atual(
     token: Annotated[str, Depends(oauth2_scheme_cliente)],
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
@@ -48,7 +120,11 @@ def obter_cliente_atual(
     except ValueError as exc:
         raise credenciais_excecao from exc
 
-    cliente_encontrado = sessao_banco.get(models.Pessoa, id_pessoa)
+    cliente_encontrado = _carregar_principal(
+        sessao_banco,
+        ("cliente", id_pessoa),
+        lambda: sessao_banco.get(models.Pessoa, id_pessoa),
+    )
 
     if cliente_encontrado is None:
         raise credenciais_excecao
@@ -80,7 +156,11 @@ def obter_funcionario_atual(
     if email is None:
         raise credenciais_excecao
 
-    funcionario = auth_service.buscar_funcionario_por_email(sessao_banco, email=email)
+    funcionario = _carregar_principal(
+        sessao_banco,
+        ("funcionario", email),
+        lambda: auth_service.buscar_funcionario_por_email(sessao_banco, email=email),
+    )
     if funcionario is None:
         raise credenciais_excecao
 
@@ -90,12 +170,90 @@ def obter_funcionario_atual(
     return funcionario
 
 
+class FuncionarioToken(NamedTuple):
+    """Funcionário autenticado só pelas claims do token (sem carregar a linha)."""
+
+    email: str
+    e_admin: bool
+
+
+def _carregar_versoes_token() -> Dict[str, int]:
+    with SessionLocal() as sessao_banco:
+        return dict(
+            sessao_banco.execute(
+                select(models.Funcionario.email, models.Funcionario.versao_token).where(
+                    models.Funcionario.e_ativado
+                )
+            ).all()
+        )
+
+
+def obter_funcionario_token(
+    token: Annotated[str, Depends(oauth2_scheme_funcionario)],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+) -> FuncionarioToken:
+    """
+    Autoriza rotas de funcionário pelas claims "papel" e "ver" do token,
+    comparando a versão com a tabela em memória. Tokens sem essas claims
+    (emitidos antes delas) seguem pelo caminho que carrega o funcionário.
+    """
+    payload = seguranca_service.verificar_token(token)
+    papel = payload.get("papel") if payload else None
+    versao = payload.get("ver") if payload else None
+
+    if (
+        papel not in (TipoPerfilEnum.ADMIN, TipoPerfilEnum.FUNCIONARIO)
+        or versao is None
+    ):
+        funcionario = obter_funcionario_atual(token, sessao_banco)
+        return FuncionarioToken(email=funcionario.email, e_admin=funcionario.e_admin)
+
+    email = payload.get("sub")
+    versao_vigente = seguranca_service.tabela_versoes_token.versao_vigente(
+        email, _carregar_versoes_token
+    )
+    if versao_vigente is None or versao_vigente != versao:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado. Faça login novamente.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return FuncionarioToken(email=email, e_admin=papel == TipoPerfilEnum.ADMIN)
+
+
 def obter_admin_atual(
-    funcionario_atual: Annotated[models.Funcionario, Depends(obter_funcionario_atual)],
-) -> models.Funcionario:
+    funcionario_atual: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
+) -> FuncionarioToken:
     if not funcionario_atual.e_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso negado: Requer privilégios de administrador.",
         )
     return funcionario_atual
+
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+esquema_token_metricas = HTTPBearer(auto_error=False)
+
+
+def verificar_token_metricas(
+    credenciais: Annotated[
+        Optional[HTTPAuthorizationCredentials], Depends(esquema_token_metricas)
+    ],
+) -> None:
+    """
+    Libera /metrics só para quem envia `Authorization: Bearer <METRICS_TOKEN>`.
+    Sem METRICS_TOKEN configurado a rota fica desligada (404).
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if credenciais is None or not secrets.compare_digest(
+        credenciais.credentials.encode(), METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
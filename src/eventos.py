@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+import os
+import threading
+from datetime import datetime
+from typing import Any, Iterable, Tuple
+
+from .models.enums import StatusVeiculoEnum
+
+EVENTOS_FILA_ASSINANTE = int(os.getenv("EVENTOS_FILA_ASSINANTE", "256"))
+
+
+class AssinaturaEventos:
+    """Fila limitada de um assinante, consumida no event loop dele."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, tamanho_fila: int):
+        self.loop = loop
+        self.fila: "asyncio.Queue[Tuple[int, Any]]" = asyncio.Queue(tamanho_fila)
+        self.descartados = 0
+
+    def entregar(self, item: Tuple[int, Any]) -> None:
+        # Roda no loop do assinante. Fila cheia (cliente lento): descarta o
+        # evento mais antigo em vez de bloquear quem publica.
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.fila.put_nowait(item)
+
+    async def proximo(self) -> Tuple[int, Any]:
+        return await self.fila.get()
+
+
+class HubEventos:
+    """
+    Difusão em memória, dentro do processo: cada evento publicado vai para a
+    fila de todos os assinantes. Publicar é seguro a partir de qualquer thread
+    (rotas síncronas, agendador) e nunca espera pelos consumidores.
+    """
+
+    def __init__(self, tamanho_fila: int):
+        self.tamanho_fila = tamanho_fila
+        self._assinaturas: set = set()
+        self._trava = threading.Lock()
+        self._sequencia = itertools.count(1)
+        self._publicados = 0
+        self._descartados_encerradas = 0
+
+    def assinar(self) -> AssinaturaEventos:
+        assinatura = AssinaturaEventos(asyncio.get_running_loop(), self.tamanho_fila)
+        with self._trava:
+            self._assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: AssinaturaEventos) -> None:
+        with self._trava:
+            if assinatura in self._assinaturas:
+                self._assinaturas.discard(assinatura)
+                self._descartados_encerradas += assinatura.descartados
+
+    def publicar(self, evento: Any) -> None:
+        with self._trava:
+            item = (next(self._sequencia), evento)
+            self._publicados += 1
+            assinaturas = list(self._assinaturas)
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.entregar, item)
+            except RuntimeError:
+                # Loop já encerrado: o assinante não vai mais consumir.
+                self.cancelar(assinatura)
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            return {
+                "assinantes": len(self._assinaturas),
+                "publicados": self._publicados,
+                "descartados": self._descartados_encerradas
+                + sum(a.descartados for a in self._assinaturas),
+            }
+
+
+hub_status_veiculos = HubEventos(EVENTOS_FILA_ASSINANTE)
+
+
+def publicar_status_veiculos(
+    ids_veiculos: Iterable[int], novo_status: StatusVeiculoEnum
+) -> None:
+    """Anuncia a mudança de status de veículos. Chamar só depois do commit."""
+    ocorrido_em = datetime.now().isoformat()
+    for id_veiculo in ids_veiculos:
+        hub_status_veiculos.publicar(
+            {
+                "id_veiculo": id_veiculo,
+                "status": novo_status.value,
+                "ocorrido_em": ocorrido_em,
+            }
+        )
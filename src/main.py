@@ -1,18 +1,119 @@
+import logging
 import time
 from contextlib import asynccontextmanager
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
-from sqlalchemy.exc import OperationalError, ProgrammingError
-
-from .database import Base, engine
 
+from fastapi import Depends, FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from . import models
+from .agendador import EXPIRACAO_HABILITADA, agendador_expiracao
+from .database import Base, async_engine, async_engine_replica, engine
+from .dependencies import verificar_token_metricas
+from .observabilidade import (
+    MiddlewareConsultasBanco,
+    MiddlewareMetricas,
+    gerar_metricas,
+)
 from .routers import (
+    auth_router,
     empresa_router,
     pessoa_fisica_router,
     pessoa_juridica_router,
     reserva_router,
     veiculo_router,
 )
+from .seguranca import pool_hash_senha
+
+logger = logging.getLogger("frotanext.inicializacao")
+
+
+def _valores_duplicados(conexao, indice) -> list:
+    # Ex.: Foo@x.com e foo@x.com gravados antes de uq_*_email_lower existir.
+    expressoes = list(indice.expressions)
+    return conexao.execute(
+        select(*expressoes, func.count())
+        .select_from(indice.table)
+        .group_by(*expressoes)
+        .having(func.count() > 1)
+        .limit(5)
+    ).all()
+
+
+def criar_indices_ausentes():
+    # create_all não adiciona índices novos a tabelas que já existem. IF NOT
+    # EXISTS evita a reflexão, que ignora índices de expressão (ex.: trigramas).
+    # Uma transação por índice: a falha de um não desfaz os demais.
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            try:
+                with engine.begin() as conexao:
+                    if indice.unique:
+                        duplicados = _valores_duplicados(conexao, indice)
+                        if duplicados:
+                            logger.error(
+                                "Índice único %s não criado: valores duplicados "
+                                "em %s (ex.: %s). Corrija os dados e reinicie.",
+                                indice.name,
+                                tabela.name,
+                                duplicados,
+                            )
+                            continue
+                    conexao.execute(CreateIndex(indice, if_not_exists=True))
+            except SQLAlchemyError:
+                logger.exception("Falha ao criar o índice %s", indice.name)
+
+
+# Colunas acrescentadas a tabelas que já existiam em produção. Todas têm
+# server_default, então o ALTER TABLE preenche as linhas antigas.
+COLUNAS_ADICIONADAS = (
+    models.Funcionario.__table__.c.versao_token,
+    models.Veiculo.__table__.c.versao,
+)
+
+
+def criar_colunas_ausentes():
+    # create_all também não altera tabelas existentes; sem isto toda consulta
+    # à tabela falharia com "column does not exist".
+    with engine.begin() as conexao:
+        inspetor = inspect(conexao)
+        preparador = conexao.dialect.identifier_preparer
+        for coluna in COLUNAS_ADICIONADAS:
+            existentes = {
+                coluna_existente["name"]
+                for coluna_existente in inspetor.get_columns(coluna.table.name)
+            }
+            if coluna.name in existentes:
+                continue
+            definicao = CreateColumn(coluna).compile(dialect=conexao.dialect)
+            conexao.execute(
+                text(
+                    f"ALTER TABLE {preparador.format_table(coluna.table)} "
+                    f"ADD COLUMN {definicao}"
+                )
+            )
+
+
+def alinhar_sequencia_versoes():
+    # Em bancos anteriores à sequência, as versões já gravadas podem passar do
+    # valor inicial dela; sem avançá-la, as próximas escritas não mudariam a
+    # versão do catálogo. Só avança: nunca devolve valores já entregues.
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conexao:
+        sequencia = conexao.dialect.identifier_preparer.format_sequence(
+            models.veiculo.VERSAO_VEICULOS_SEQ
+        )
+        conexao.execute(
+            text(
+                f"SELECT setval('{sequencia}', maior) FROM ("
+                "SELECT max(versao) AS maior FROM veiculos) AS v "
+                f"WHERE maior > (SELECT last_value FROM {sequencia})"
+            )
+        )
 
 
 def criar_banco_de_dados_e_tablelas_com_tentaivas():
@@ -26,6 +127,9 @@ def criar_banco_de_dados_e_tablelas_com_tentaivas():
             )
 
             Base.metadata.create_all(bind=engine)
+            criar_colunas_ausentes()
+            alinhar_sequencia_versoes()
+            criar_indices_ausentes()
 
             print("Tabelas verificadas/criadas com sucesso.")
             break
@@ -41,7 +145,7 @@ def criar_banco_de_dados_e_tablelas_com_tentaivas():
             print(f"Aviso de criação de tabela (provavelmente já existem): {e}")
             break
 
-        except Exception as e: # pylint: disable=broad-exception-caught
+        except Exception as e:  # pylint: disable=broad-exception-caught
             print(f"Erro inesperado ao criar tabelas: {e}")
             break
 
@@ -55,8 +159,15 @@ def criar_banco_de_dados_e_tablelas_com_tentaivas():
 async def lifespan(_app: FastAPI):
     print("Iniciando FrotaNext Backend...")
     criar_banco_de_dados_e_tablelas_com_tentaivas()
+    if EXPIRACAO_HABILITADA:
+        agendador_expiracao.iniciar()
     yield
     print("Desligando aplicação...")
+    await agendador_expiracao.encerrar()
+    pool_hash_senha.encerrar()
+    await async_engine.dispose()
+    if async_engine_replica is not None:
+        await async_engine_replica.dispose()
 
 
 app = FastAPI(
@@ -66,6 +177,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.include_router(auth_router.router)
 app.include_router(empresa_router.router)
 app.include_router(pessoa_fisica_router.router)
 app.include_router(pessoa_juridica_router.router)
@@ -83,9 +195,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-ms", "X-Next-Cursor", "ETag"],
 )
 
+app.add_middleware(MiddlewareConsultasBanco)
+app.add_middleware(MiddlewareMetricas)
+
 
 @app.get("/")
 def read_root():
     return {"message": "Bem-vindo à API Principal da FrotaNext!"}
+
+
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(verificar_token_metricas)],
+)
+async def rota_metricas():
+    return Response(content=gerar_metricas(), media_type=CONTENT_TYPE_LATEST)
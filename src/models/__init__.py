@@ -14,6 +14,7 @@ from .reserva import Reserva
 from .veiculo import (
     Motocicleta,
     Passeio,
+    RemocaoVeiculo,
     Utilitario,
     Veiculo,
 )
@@ -11,6 +11,7 @@ class TipoPerfilEnum(str, enum.Enum):
     CLIENTE_PF = "cliente_pf"
     CLIENTE_PJ = "cliente_pj"
     ADMIN = "admin"
+    FUNCIONARIO = "funcionario"
 
 
 class TipoVeiculoEnum(str, enum.Enum):
@@ -45,3 +46,16 @@ class StatusReservaEnum(str, enum.Enum):
     EM_ANDAMENTO = "em_andamento"
     FINALIZADA = "finalizada"
     CANCELADA = "cancelada"
+
+
+class OrdenacaoVeiculoEnum(str, enum.Enum):
+    ID = "id_veiculo"
+    VALOR_DIARIA = "valor_diaria"
+    ANO_MODELO = "ano_modelo"
+    MARCA = "marca"
+    RELEVANCIA = "relevancia"
+
+
+class DirecaoOrdenacaoEnum(str, enum.Enum):
+    ASC = "asc"
+    DESC = "desc"
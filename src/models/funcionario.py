@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String, func
 
 from ..database import Base
 
@@ -12,3 +12,10 @@ class Funcionario(Base):
     senha = Column(String, nullable=False)
     e_admin = Column(Boolean, default=False, nullable=False)
     e_ativado = Column(Boolean, default=True, nullable=False)
+    # Incrementada ao desativar ou mudar o papel: revoga tokens já emitidos.
+    versao_token = Column(Integer, default=1, server_default="1", nullable=False)
+
+
+# Login e cadastro comparam lower(email): o índice funcional atende a busca e
+# impede dois funcionários cujo email só difere em maiúsculas.
+Index("uq_funcionarios_email_lower", func.lower(Funcionario.email), unique=True)
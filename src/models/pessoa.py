@@ -1,6 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -48,6 +57,11 @@ class Pessoa(Base):
     }
 
 
+# Login e cadastro comparam lower(email): o índice funcional atende a busca e
+# impede duas contas cujo email só difere em maiúsculas.
+Index("uq_pessoas_email_lower", func.lower(Pessoa.email), unique=True)
+
+
 class PessoaFisica(Pessoa):
     __tablename__ = "pessoas_fisicas"
     id_pessoa = Column(Integer, ForeignKey("pessoas.id_pessoa"), primary_key=True)
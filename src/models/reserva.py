@@ -1,14 +1,39 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+)
 from sqlalchemy.orm import relationship
 
 from ..database import Base
 from .enums import StatusReservaEnum
 
+# Reservas que ainda ocupam o veículo no período reservado.
+STATUS_RESERVA_OCUPAM_VEICULO = (
+    StatusReservaEnum.PENDENTE,
+    StatusReservaEnum.CONFIRMADA,
+    StatusReservaEnum.EM_ANDAMENTO,
+)
+
 
 class Reserva(Base):
     __tablename__ = "reservas"
+    __table_args__ = (
+        # Paginação keyset do painel admin, com e sem filtro de status.
+        Index("ix_reservas_retirada_id", "data_retirada", "id_reserva"),
+        Index(
+            "ix_reservas_status_retirada_id", "status", "data_retirada", "id_reserva"
+        ),
+        # Expiração das pendentes mais antigas, em lotes.
+        Index("ix_reservas_status_criacao_id", "status", "data_criacao", "id_reserva"),
+    )
     id_reserva = Column(Integer, primary_key=True, index=True)
 
     data_retirada = Column(DateTime, nullable=False)
@@ -39,3 +64,16 @@ class Reserva(Base):
     motorista = relationship("Pessoa", foreign_keys=[motorista_id])
 
     veiculo = relationship("Veiculo", back_populates="reservas")
+
+
+# Busca de disponibilidade por período (teste de sobreposição por veículo).
+# Parcial: reservas finalizadas/canceladas, a maior parte do histórico, ficam
+# fora do índice.
+Index(
+    "ix_reservas_veiculo_periodo_ativas",
+    Reserva.veiculo_id,
+    Reserva.data_retirada,
+    Reserva.data_devolucao,
+    postgresql_where=Reserva.status.in_(STATUS_RESERVA_OCUPAM_VEICULO),
+    sqlite_where=Reserva.status.in_(STATUS_RESERVA_OCUPAM_VEICULO),
+)
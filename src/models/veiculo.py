@@ -1,12 +1,66 @@
-from sqlalchemy import Boolean, Column, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    event,
+    func,
+    literal_column,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from ..database import Base
 from .enums import CorVeiculoEnum, StatusVeiculoEnum, TipoVeiculoEnum
 
+# Fonte única e crescente de `Veiculo.versao` e `RemocaoVeiculo.versao`: toda
+# escrita recebe um valor maior que qualquer outro já gravado, então o maior
+# valor das duas tabelas identifica o estado do catálogo (ver catalogo.py).
+VERSAO_VEICULOS_SEQ = Sequence("veiculos_versao_seq", metadata=Base.metadata)
+
+
+class ProximaVersao(FunctionElement):  # pylint: disable=abstract-method,too-many-ancestors
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(ProximaVersao, "postgresql")
+def _proxima_versao_postgresql(_elemento, compilador, **kw):
+    # nextval não participa da transação: não há linha para travar.
+    return compilador.process(VERSAO_VEICULOS_SEQ.next_value(), **kw)
+
+
+@compiles(ProximaVersao)
+def _proxima_versao_padrao(_elemento, _compilador, **_kw):
+    # Sem sequências (SQLite): o banco serializa as escritas, então o maior
+    # valor gravado + 1 não se repete entre transações.
+    return (
+        "(SELECT coalesce(max(versao), 0) + 1 FROM ("
+        "SELECT max(versao) AS versao FROM veiculos "
+        "UNION ALL SELECT max(versao) FROM remocoes_veiculos))"
+    )
+
 
 class Veiculo(Base):
     __tablename__ = "veiculos"
+    __table_args__ = (
+        # Ordenações paginadas do catálogo (com e sem filtro de disponibilidade).
+        Index("ix_veiculos_valor_diaria_id", "valor_diaria", "id_veiculo"),
+        Index("ix_veiculos_ano_modelo_id", "ano_modelo", "id_veiculo"),
+        Index("ix_veiculos_marca_id", "marca", "id_veiculo"),
+        Index(
+            "ix_veiculos_status_valor_diaria_id", "status", "valor_diaria", "id_veiculo"
+        ),
+        Index("ix_veiculos_status_ano_modelo_id", "status", "ano_modelo", "id_veiculo"),
+        Index("ix_veiculos_status_marca_id", "status", "marca", "id_veiculo"),
+    )
     id_veiculo = Column(Integer, primary_key=True, index=True)
 
     marca = Column(String, nullable=False)
@@ -31,6 +85,18 @@ class Veiculo(Base):
         index=True,
     )
 
+    # Renovada a cada INSERT/UPDATE da tabela (ETag do veículo e, pelo maior
+    # valor, do catálogo). Alterações só em colunas das subclasses precisam
+    # renová-la explicitamente.
+    versao = Column(
+        Integer,
+        nullable=False,
+        index=True,
+        default=ProximaVersao(),
+        server_default="1",
+        onupdate=ProximaVersao(),
+    )
+
     reservas = relationship("Reserva", back_populates="veiculo")
 
     tipo_veiculo = Column(Enum(TipoVeiculoEnum), nullable=False)
@@ -40,6 +106,42 @@ class Veiculo(Base):
     }
 
 
+# Texto pesquisável do catálogo. A busca usa exatamente esta expressão para
+# que o Postgres aproveite o índice trigram abaixo.
+texto_busca_veiculo = func.lower(
+    Veiculo.marca
+    + literal_column("' '")
+    + Veiculo.modelo
+    + literal_column("' '")
+    + Veiculo.placa
+)
+
+Index(
+    "ix_veiculos_busca_trgm",
+    texto_busca_veiculo.label("texto_busca"),
+    postgresql_using="gin",
+    postgresql_ops={"texto_busca": "gin_trgm_ops"},
+)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class RemocaoVeiculo(Base):
+    """
+    Marca a exclusão de um veículo com uma versão nova, para que a versão do
+    catálogo avance mesmo quando o veículo removido tinha a maior versão.
+    """
+
+    __tablename__ = "remocoes_veiculos"
+    id_remocao = Column(Integer, primary_key=True)
+    id_veiculo = Column(Integer, nullable=False)
+    versao = Column(Integer, nullable=False, index=True, default=ProximaVersao())
+
+
 class Passeio(Veiculo):
     __tablename__ = "veiculos_passeio"
     id_veiculo = Column(Integer, ForeignKey("veiculos.id_veiculo"), primary_key=True)
@@ -47,7 +149,10 @@ class Passeio(Veiculo):
     qtde_portas = Column(Integer, nullable=False)
     qtde_passageiros = Column(Integer, default=5)
 
-    __mapper_args__ = {"polymorphic_identity": TipoVeiculoEnum.PASSEIO}
+    __mapper_args__ = {
+        "polymorphic_identity": TipoVeiculoEnum.PASSEIO,
+        "polymorphic_load": "inline",
+    }
 
 
 class Utilitario(Veiculo):
@@ -60,7 +165,10 @@ class Utilitario(Veiculo):
     qtde_eixos = Column(Integer)
     max_passageiros = Column(Integer)
 
-    __mapper_args__ = {"polymorphic_identity": TipoVeiculoEnum.UTILITARIO}
+    __mapper_args__ = {
+        "polymorphic_identity": TipoVeiculoEnum.UTILITARIO,
+        "polymorphic_load": "inline",
+    }
 
 
 class Motocicleta(Veiculo):
@@ -72,4 +180,7 @@ class Motocicleta(Veiculo):
     partida_eletrica = Column(Boolean, default=True)
     modos_pilotagem = Column(String)
 
-    __mapper_args__ = {"polymorphic_identity": TipoVeiculoEnum.MOTOCICLETA}
+    __mapper_args__ = {
+        "polymorphic_identity": TipoVeiculoEnum.MOTOCICLETA,
+        "polymorphic_load": "inline",
+    }
@@ -0,0 +1,271 @@
+import contextvars
+import logging
+import os
+import time
+from typing import Optional
+
+from anyio import to_thread
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from .catalogo import cache_respostas_catalogo
+from .database import (
+    async_engine,
+    async_engine_replica,
+    engine,
+    engine_replica,
+    obter_estatisticas_pool,
+)
+from .eventos import hub_status_veiculos
+from .seguranca import cache_principais, cache_tokens, pool_hash_senha
+from .services.reserva_service import cache_cotacoes
+from .services.veiculo_service import cache_diarias
+
+logger = logging.getLogger("frotanext.sql")
+
+LIMITE_CONSULTA_LENTA_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+
+class EstatisticasRequisicao:
+    """Contadores de SQL acumulados durante uma única requisição HTTP."""
+
+    __slots__ = ("escopo", "quantidade_consultas", "tempo_total_ms")
+
+    def __init__(self, escopo: dict):
+        self.escopo = escopo
+        self.quantidade_consultas = 0
+        self.tempo_total_ms = 0.0
+
+    @property
+    def rota(self) -> str:
+        rota = self.escopo.get("route")
+        return getattr(rota, "path", None) or self.escopo.get("path", "?")
+
+
+_estatisticas_requisicao: contextvars.ContextVar[Optional[EstatisticasRequisicao]] = (
+    contextvars.ContextVar("estatisticas_requisicao", default=None)
+)
+
+
+def obter_estatisticas_requisicao() -> Optional[EstatisticasRequisicao]:
+    return _estatisticas_requisicao.get()
+
+
+def _antes_de_executar(conexao, _cursor, _sql, _parametros, _contexto, _executemany):
+    conexao.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+def _registrar_consulta(conexao, sql, falhou: bool = False) -> None:
+    inicios = conexao.info.get("inicio_consultas")
+    if not inicios:
+        return
+    duracao_ms = (time.perf_counter() - inicios.pop()) * 1000
+
+    estatisticas = _estatisticas_requisicao.get()
+    if estatisticas is not None:
+        estatisticas.quantidade_consultas += 1
+        estatisticas.tempo_total_ms += duracao_ms
+
+    if duracao_ms >= LIMITE_CONSULTA_LENTA_MS:
+        logger.warning(
+            "Consulta lenta%s (%.1f ms) em %s: %s",
+            " com erro" if falhou else "",
+            duracao_ms,
+            estatisticas.rota if estatisticas is not None else "-",
+            sql,
+        )
+
+
+def _depois_de_executar(conexao, _cursor, sql, _parametros, _contexto, _executemany):
+    _registrar_consulta(conexao, sql)
+
+
+def _ao_falhar(contexto_erro):
+    # after_cursor_execute não dispara quando a instrução levanta exceção
+    # (timeout, violação de unicidade); sem isto o início ficaria na conexão
+    # do pool para sempre e as consultas mais lentas nunca seriam registradas.
+    if contexto_erro.connection is not None:
+        _registrar_consulta(
+            contexto_erro.connection, contexto_erro.statement, falhou=True
+        )
+
+
+def instrumentar_engine(engine_alvo: Engine) -> None:
+    if event.contains(engine_alvo, "before_cursor_execute", _antes_de_executar):
+        return
+    event.listen(engine_alvo, "before_cursor_execute", _antes_de_executar)
+    event.listen(engine_alvo, "after_cursor_execute", _depois_de_executar)
+    event.listen(engine_alvo, "handle_error", _ao_falhar)
+
+
+for _engine in (engine, async_engine, engine_replica, async_engine_replica):
+    if _engine is not None:
+        instrumentar_engine(getattr(_engine, "sync_engine", _engine))
+
+
+class MiddlewareConsultasBanco:
+    """
+    Conta as consultas SQL de cada requisição e devolve o total nos cabeçalhos
+    X-DB-Queries e X-DB-Time-ms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasRequisicao(scope)
+        token = _estatisticas_requisicao.set(estatisticas)
+
+        async def enviar_com_cabecalhos(mensagem):
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = MutableHeaders(scope=mensagem)
+                cabecalhos.append(
+                    "X-DB-Queries", str(estatisticas.quantidade_consultas)
+                )
+                cabecalhos.append("X-DB-Time-ms", f"{estatisticas.tempo_total_ms:.2f}")
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar_com_cabecalhos)
+        finally:
+            _estatisticas_requisicao.reset(token)
+
+
+LATENCIA_REQUISICAO = Histogram(
+    "frotanext_requisicao_latencia_segundos",
+    "Latência das requisições HTTP por roteador e rota.",
+    ["roteador", "metodo", "rota"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUISICOES_TOTAL = Counter(
+    "frotanext_requisicoes_total",
+    "Requisições HTTP atendidas por roteador, rota e status.",
+    ["roteador", "metodo", "rota", "status"],
+)
+ERROS_TOTAL = Counter(
+    "frotanext_requisicoes_erro_total",
+    "Requisições HTTP que terminaram com status 5xx ou exceção.",
+    ["roteador", "metodo", "rota"],
+)
+THREADPOOL_EM_USO = Gauge(
+    "frotanext_threadpool_em_uso", "Workers do threadpool ocupados por rotas síncronas."
+)
+THREADPOOL_CAPACIDADE = Gauge(
+    "frotanext_threadpool_capacidade", "Tamanho do threadpool de rotas síncronas."
+)
+THREADPOOL_AGUARDANDO = Gauge(
+    "frotanext_threadpool_aguardando", "Tarefas aguardando um worker livre."
+)
+POOL_BANCO = Gauge(
+    "frotanext_pool_banco",
+    "Estado do pool de conexões do banco.",
+    ["engine", "metrica"],
+)
+POOL_HASH_SENHA = Gauge(
+    "frotanext_hash_senha",
+    "Pool de processos do argon2: processos, tarefas em execução, fila e rejeições.",
+    ["metrica"],
+)
+CACHES = Gauge(
+    "frotanext_cache",
+    "Caches em memória: entradas, acertos, falhas e taxa de acerto.",
+    ["cache", "metrica"],
+)
+EVENTOS_STATUS_VEICULOS = Gauge(
+    "frotanext_eventos_status_veiculo",
+    "Fluxo SSE de status dos veículos: assinantes, eventos publicados e descartados.",
+    ["metrica"],
+)
+
+_CACHES_MONITORADOS = {
+    "tokens_jwt": cache_tokens,
+    "principais": cache_principais,
+    "diarias_veiculos": cache_diarias,
+    "cotacoes": cache_cotacoes,
+    "respostas_catalogo": cache_respostas_catalogo,
+}
+
+_ENGINES_MONITORADAS = {
+    "primario": engine,
+    "primario_async": async_engine,
+    "replica": engine_replica,
+    "replica_async": async_engine_replica,
+}
+
+
+def _rotulos_rota(escopo: dict) -> tuple:
+    rota = escopo.get("route")
+    if rota is None:
+        return "-", "nao_encontrada"
+    tags = getattr(rota, "tags", None)
+    return (tags[0] if tags else "-"), rota.path
+
+
+class MiddlewareMetricas:
+    """Registra contagem, latência e erros de cada requisição por rota."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_resposta = 500
+        inicio = time.perf_counter()
+
+        async def enviar_registrando_status(mensagem):
+            nonlocal status_resposta
+            if mensagem["type"] == "http.response.start":
+                status_resposta = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar_registrando_status)
+        finally:
+            roteador, rota = _rotulos_rota(scope)
+            metodo = scope["method"]
+            LATENCIA_REQUISICAO.labels(roteador, metodo, rota).observe(
+                time.perf_counter() - inicio
+            )
+            REQUISICOES_TOTAL.labels(roteador, metodo, rota, status_resposta).inc()
+            if status_resposta >= 500:
+                ERROS_TOTAL.labels(roteador, metodo, rota).inc()
+
+
+def gerar_metricas() -> bytes:
+    """
+    Atualiza os gauges (threadpool, pools do banco e do argon2, caches, eventos) e
+    serializa todas as métricas no formato texto do Prometheus. Deve rodar no
+    event loop.
+    """
+    limitador = to_thread.current_default_thread_limiter()
+    THREADPOOL_EM_USO.set(limitador.borrowed_tokens)
+    THREADPOOL_CAPACIDADE.set(limitador.total_tokens)
+    THREADPOOL_AGUARDANDO.set(limitador.statistics().tasks_waiting)
+
+    for nome_engine, engine_alvo in _ENGINES_MONITORADAS.items():
+        if engine_alvo is None:
+            continue
+        for metrica, valor in obter_estatisticas_pool(engine_alvo).items():
+            if isinstance(valor, (int, float)):
+                POOL_BANCO.labels(nome_engine, metrica).set(valor)
+
+    for metrica, valor in pool_hash_senha.estatisticas().items():
+        POOL_HASH_SENHA.labels(metrica).set(valor)
+
+    for metrica, valor in hub_status_veiculos.estatisticas().items():
+        EVENTOS_STATUS_VEICULOS.labels(metrica).set(valor)
+
+    for nome_cache, cache in _CACHES_MONITORADOS.items():
+        for metrica, valor in cache.estatisticas().items():
+            CACHES.labels(nome_cache, metrica).set(valor)
+
+    return generate_latest()
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+TAMANHO_PAGINA_PADRAO = int(os.getenv("PAGINA_TAMANHO_PADRAO", "50"))
+TAMANHO_PAGINA_MAXIMO = int(os.getenv("PAGINA_TAMANHO_MAXIMO", "200"))
+
+
+class Pagina(NamedTuple):
+    itens: list
+    proximo_cursor: Optional[str]
+
+
+def _serializar_valor(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if hasattr(valor, "value"):
+        return valor.value
+    return valor
+
+
+def codificar_cursor(valores: Sequence) -> str:
+    """
+    Gera um token opaco (base64 url-safe) com os valores da chave de ordenação
+    do último item da página.
+    """
+    bruto = json.dumps([_serializar_valor(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(token: str, conversores: Sequence[Callable]) -> List:
+    try:
+        preenchimento = "=" * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(token + preenchimento))
+        if not isinstance(valores, list) or len(valores) != len(conversores):
+            raise ValueError("Quantidade de campos inválida.")
+        return [converter(v) for converter, v in zip(conversores, valores)]
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        ) from exc
+
+
+def filtro_apos_cursor(colunas: Sequence, valores: Sequence, descendente: bool = False):
+    """
+    Condição de keyset: linhas estritamente depois do cursor na ordem
+    (colunas...). Usa comparação de tupla, que o Postgres resolve pelo índice
+    composto correspondente.
+    """
+    chave = tuple_(*colunas)
+    limite = tuple_(*valores)
+    return chave < limite if descendente else chave > limite
+
+
+def montar_pagina(
+    linhas: list, limite: int, chave_cursor: Callable[[object], Sequence]
+) -> Pagina:
+    """
+    Recebe até limite + 1 linhas (o excedente indica que há próxima página)
+    e devolve a página com o cursor do último item, se houver continuação.
+    """
+    if len(linhas) <= limite:
+        return Pagina(itens=linhas, proximo_cursor=None)
+    itens = linhas[:limite]
+    return Pagina(itens=itens, proximo_cursor=codificar_cursor(chave_cursor(itens[-1])))
+
+
+def cabecalhos_pagina(proximo_cursor: Optional[str]) -> Dict[str, str]:
+    """Cabeçalho X-Next-Cursor, presente só quando há próxima página."""
+    return {"X-Next-Cursor": proximo_cursor} if proximo_cursor else {}
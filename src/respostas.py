@@ -0,0 +1,217 @@
+import os
+import types
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from anyio import to_thread
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+from .paginacao import Pagina, cabecalhos_pagina
+from .schemas.reserva_schema import SCHEMA_CLIENTE_POR_TIPO_PESSOA, SchemaCliente
+
+# A partir deste tamanho, a serialização de uma listagem em rota async sai do
+# event loop: validar e gerar alguns milhares de itens leva segundos de CPU.
+SERIALIZACAO_ITENS_THREAD = int(os.getenv("SERIALIZACAO_ITENS_THREAD", "500"))
+# Desligar volta as listagens para a validação completa do response_model.
+SERIALIZACAO_CONFIAVEL = os.getenv("SERIALIZACAO_CONFIAVEL", "true").lower() == "true"
+
+Construtor = Callable[[Any], Any]
+
+# Uniões resolvidas por um atributo discriminador do ORM, em vez de tentar
+# membro a membro como a validação faz.
+_UNIOES_DISCRIMINADAS: Dict[Any, Tuple[str, Mapping[Any, Type[BaseModel]]]] = {
+    SchemaCliente: ("tipo_pessoa", SCHEMA_CLIENTE_POR_TIPO_PESSOA),
+}
+
+_construtores: Dict[Any, Construtor] = {}
+
+
+def _identidade(valor: Any) -> Any:
+    return valor
+
+
+def construtor_confiavel(tipo: Any) -> Construtor:
+    """
+    Função que monta `tipo` (schema, lista, Optional ou união) a partir de
+    objetos do ORM sem validar: os valores entram como o banco os devolveu.
+    Só serve para saída de dados gravados pela própria aplicação, que já
+    passaram pelos schemas de entrada.
+    """
+    construtor = _construtores.get(tipo)
+    if construtor is None:
+        construtor = _construtores[tipo] = _compilar_construtor(tipo)
+    return construtor
+
+
+def _compilar_construtor(tipo: Any) -> Construtor:
+    if isinstance(tipo, type) and issubclass(tipo, BaseModel):
+        return _compilar_modelo(tipo)
+
+    origem = get_origin(tipo)
+    if origem is list:
+        return _compilar_lista(get_args(tipo)[0])
+
+    if origem is Union or origem is types.UnionType:
+        argumentos = get_args(tipo)
+        membros = tuple(arg for arg in argumentos if arg is not types.NoneType)
+        if len(membros) < len(argumentos):
+            return _compilar_opcional(Union[membros])
+        return _compilar_uniao(tipo, membros)
+
+    return _identidade
+
+
+def _compilar_lista(tipo_item: Any) -> Construtor:
+    construir_item = construtor_confiavel(tipo_item)
+    if construir_item is _identidade:
+        return _identidade
+
+    def construir_lista(valores: Any) -> list:
+        return [construir_item(valor) for valor in valores]
+
+    return construir_lista
+
+
+def _compilar_opcional(tipo_interno: Any) -> Construtor:
+    construir_interno = construtor_confiavel(tipo_interno)
+    if construir_interno is _identidade:
+        return _identidade
+
+    def construir_opcional(valor: Any) -> Any:
+        return None if valor is None else construir_interno(valor)
+
+    return construir_opcional
+
+
+def _compilar_uniao(tipo: Any, membros: Tuple[Any, ...]) -> Construtor:
+    if not any(isinstance(m, type) and issubclass(m, BaseModel) for m in membros):
+        return _identidade
+    # União sem discriminador registrado, ou valor desconhecido: valida.
+    adaptador = TypeAdapter(tipo)
+
+    def validar(valor: Any) -> Any:
+        return adaptador.validate_python(valor, from_attributes=True)
+
+    if tipo not in _UNIOES_DISCRIMINADAS:
+        return validar
+    atributo, membro_por_valor = _UNIOES_DISCRIMINADAS[tipo]
+    construtores = {
+        chave: construtor_confiavel(membro)
+        for chave, membro in membro_por_valor.items()
+    }
+
+    def construir_uniao(valor: Any) -> Any:
+        construtor = construtores.get(getattr(valor, atributo, None), validar)
+        return construtor(valor)
+
+    return construir_uniao
+
+
+def _compilar_modelo(modelo: Type[BaseModel]) -> Construtor:
+    campos = []
+    for nome, campo in modelo.model_fields.items():
+        construir_campo = construtor_confiavel(campo.annotation)
+        campos.append(
+            (nome, None if construir_campo is _identidade else construir_campo, campo)
+        )
+    ausente = object()
+
+    def valores_do_objeto(objeto: Any) -> dict:
+        valores = {}
+        for nome, construir_campo, campo in campos:
+            valor = getattr(objeto, nome, ausente)
+            if valor is ausente:
+                # Ex.: campo de Utilitario ao montar um Passeio como SchemaVeiculo;
+                # model_construct preenche o default.
+                if campo.is_required():
+                    raise AttributeError(f"{type(objeto).__name__} sem '{nome}'.")
+                continue
+            if construir_campo is not None:
+                valor = construir_campo(valor)
+            valores[nome] = valor
+        return valores
+
+    def construir(objeto: Any) -> BaseModel:
+        return modelo.model_construct(**valores_do_objeto(objeto))
+
+    return construir
+
+
+class RespostaJSONRapida(Response):
+    """
+    Listagem já em bytes JSON, gerados de uma vez pelo núcleo do pydantic
+    (Rust). Saída idêntica à do response_model padrão: datas em ISO 8601 e
+    enums pelo valor. A rota devolve a resposta pronta e o FastAPI não
+    valida de novo; o response_model fica no decorador para a documentação.
+    """
+
+    media_type = "application/json"
+
+    @classmethod
+    def de_itens(
+        cls,
+        adaptador: TypeAdapter,
+        itens: Sequence[Any],
+        headers: Optional[Mapping[str, str]] = None,
+        status_code: int = status.HTTP_200_OK,
+        construtor: Optional[Construtor] = None,
+    ) -> "RespostaJSONRapida":
+        """
+        Com `construtor` (de construtor_confiavel), os itens do ORM viram
+        schemas sem revalidação; sem ele, valem as regras do response_model.
+        """
+        if construtor is not None and SERIALIZACAO_CONFIAVEL:
+            prontos = construtor(itens)
+        else:
+            prontos = adaptador.validate_python(itens, from_attributes=True)
+        return cls(
+            content=adaptador.dump_json(prontos),
+            status_code=status_code,
+            headers=headers,
+        )
+
+    @classmethod
+    async def de_itens_async(
+        cls,
+        adaptador: TypeAdapter,
+        itens: Sequence[Any],
+        headers: Optional[Mapping[str, str]] = None,
+        status_code: int = status.HTTP_200_OK,
+        construtor: Optional[Construtor] = None,
+    ) -> "RespostaJSONRapida":
+        """
+        Para rotas async: listas grandes são serializadas numa thread, sem
+        travar as demais requisições. Os itens precisam estar carregados.
+        """
+        if len(itens) < SERIALIZACAO_ITENS_THREAD:
+            return cls.de_itens(adaptador, itens, headers, status_code, construtor)
+        return await to_thread.run_sync(
+            cls.de_itens, adaptador, itens, headers, status_code, construtor
+        )
+
+    @classmethod
+    async def de_pagina_async(
+        cls,
+        adaptador: TypeAdapter,
+        pagina: Pagina,
+        construtor: Optional[Construtor] = None,
+    ) -> "RespostaJSONRapida":
+        """Página de uma listagem paginada, com o cursor da seguinte no cabeçalho."""
+        return await cls.de_itens_async(
+            adaptador,
+            pagina.itens,
+            cabecalhos_pagina(pagina.proximo_cursor),
+            construtor=construtor,
+        )
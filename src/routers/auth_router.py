@@ -0,0 +1,147 @@
+import logging
+from typing import Annotated, Awaitable, Callable
+
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from .. import seguranca as seguranca_service
+from ..database import AsyncSessionLocal
+from ..dependencies import (
+    FuncionarioToken,
+    obter_admin_atual,
+    obter_sessao_banco,
+    obter_sessao_banco_async,
+)
+from ..models.enums import TipoPerfilEnum
+from ..schemas import auth_schema
+from ..services import auth_service, cliente_auth_service
+
+logger = logging.getLogger("frotanext.auth")
+
+router = APIRouter(tags=["Autenticação"])
+
+
+def _credenciais_invalidas() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Email ou senha incorretos.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _regravar_hash_em_segundo_plano(
+    atualizar_hash: Callable[..., Awaitable[bool]],
+    identificador: int,
+    hash_atual: str,
+    senha_texto_puro: str,
+) -> None:
+    # Roda depois da resposta, com sessão própria: a da requisição já fechou.
+    try:
+        async with AsyncSessionLocal() as sessao_banco:
+            await atualizar_hash(
+                sessao_banco, identificador, hash_atual, senha_texto_puro
+            )
+    except HTTPException:
+        # Pool do argon2 saturado: o rehash fica para o próximo login.
+        logger.info("Rehash de senha adiado (pool do argon2 saturado).")
+
+
+@router.post(
+    "/auth/token",
+    response_model=auth_schema.SchemaToken,
+    summary="Login de funcionário (OAuth2 password flow)",
+)
+async def rota_login_funcionario(
+    dados_formulario: Annotated[OAuth2PasswordRequestForm, Depends()],
+    tarefas: BackgroundTasks,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco_async)],
+):
+    funcionario = await auth_service.autenticar_funcionario_async(
+        sessao_banco,
+        email_formulario=dados_formulario.username,
+        senha_formulario=dados_formulario.password,
+    )
+    if funcionario is None:
+        raise _credenciais_invalidas()
+
+    if seguranca_service.precisa_rehash(funcionario.senha):
+        tarefas.add_task(
+            _regravar_hash_em_segundo_plano,
+            auth_service.atualizar_hash_senha_funcionario_async,
+            funcionario.id_funcionario,
+            funcionario.senha,
+            dados_formulario.password,
+        )
+
+    # Funcionário recém-criado ainda não está na tabela deste processo; sem
+    # isto o primeiro uso do token esperaria a próxima recarga permitida.
+    seguranca_service.tabela_versoes_token.registrar(
+        funcionario.email, funcionario.versao_token
+    )
+    token_acesso = seguranca_service.criar_token_acesso(
+        dados={"sub": funcionario.email},
+        papel=auth_service.papel_funcionario(funcionario).value,
+        versao=funcionario.versao_token,
+    )
+    return {"access_token": token_acesso, "token_type": "bearer"}
+
+
+@router.post(
+    "/clientes/token",
+    response_model=auth_schema.SchemaToken,
+    summary="Login de cliente PF ou PJ (OAuth2 password flow)",
+)
+async def rota_login_cliente(
+    dados_formulario: Annotated[OAuth2PasswordRequestForm, Depends()],
+    tarefas: BackgroundTasks,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco_async)],
+):
+    cliente = await cliente_auth_service.autenticar_cliente_async(
+        sessao_banco,
+        email_formulario=dados_formulario.username,
+        senha_formulario=dados_formulario.password,
+    )
+    if cliente is None:
+        raise _credenciais_invalidas()
+
+    if seguranca_service.precisa_rehash(cliente.senha):
+        tarefas.add_task(
+            _regravar_hash_em_segundo_plano,
+            cliente_auth_service.atualizar_hash_senha_cliente_async,
+            cliente.id_pessoa,
+            cliente.senha,
+            dados_formulario.password,
+        )
+
+    papel = (
+        TipoPerfilEnum.CLIENTE_PJ
+        if isinstance(cliente, models.PessoaJuridica)
+        else TipoPerfilEnum.CLIENTE_PF
+    )
+    token_acesso = seguranca_service.criar_token_acesso(
+        dados={"sub": str(cliente.id_pessoa)}, papel=papel.value
+    )
+    return {"access_token": token_acesso, "token_type": "bearer"}
+
+
+@router.patch(
+    "/auth/funcionarios/{id_funcionario}/status",
+    response_model=auth_schema.SchemaFuncionario,
+    summary="Ativa/desativa um funcionário (Requer Admin)",
+)
+def rota_alterar_status_funcionario(
+    id_funcionario: int,
+    e_ativado: Annotated[bool, Body(embed=True)],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    _admin_logado: Annotated[FuncionarioToken, Depends(obter_admin_atual)],
+):
+    """
+    Desativar revoga na hora os tokens já emitidos para o funcionário e
+    descarta o cadastro dele do cache de principais deste processo.
+    """
+    return auth_service.alterar_status_funcionario(
+        sessao_banco, id_funcionario=id_funcionario, e_ativado=e_ativado
+    )
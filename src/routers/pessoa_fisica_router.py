@@ -1,15 +1,20 @@
+from functools import partial
 from typing import Annotated, List
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from .. import models
 from ..dependencies import (
-    obter_sessao_banco,
-    obter_funcionario_atual,
+    FuncionarioToken,
     obter_cliente_atual,
+    obter_funcionario_token,
+    obter_sessao_banco,
+    obter_sessao_leitura,
 )
 from ..models.enums import StatusContaEnum
+from ..respostas import RespostaJSONRapida, construtor_confiavel
 from ..schemas import cliente_schema
 from ..services import cliente_service
 
@@ -17,6 +22,24 @@ router = APIRouter(
     prefix="/clientes/pessoas-fisicas", tags=["Clientes - Pessoa Física"]
 )
 
+_ADAPTADOR_LISTA_PESSOAS_FISICAS = TypeAdapter(List[cliente_schema.SchemaPessoaFisica])
+_CONSTRUIR_LISTA_PESSOAS_FISICAS = construtor_confiavel(
+    List[cliente_schema.SchemaPessoaFisica]
+)
+
+
+def _cadastrar_pessoa_fisica(
+    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
+    sessao_banco: Session,
+    hash_senha: str,
+) -> cliente_schema.SchemaPessoaFisica:
+    cliente_criado = cliente_service.criar_pessoa_fisica(
+        dados_entrada_cliente=dados_entrada_cliente,
+        sessao_banco=sessao_banco,
+        hash_senha=hash_senha,
+    )
+    return cliente_schema.SchemaPessoaFisica.model_validate(cliente_criado)
+
 
 @router.post(
     "/",
@@ -24,14 +47,19 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="Cadastra um novo cliente Pessoa Física (Auto-cadastro)",
 )
-def rota_criar_pessoa_fisica(
+async def rota_criar_pessoa_fisica(
     dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
 ):
-    cliente_criado = cliente_service.criar_pessoa_fisica(
-        dados_entrada_cliente=dados_entrada_cliente, sessao_banco=sessao_banco
+    return await cliente_service.cadastrar_com_hash_async(
+        partial(
+            cliente_service.validar_nova_pessoa_fisica,
+            dados_entrada_cliente,
+            sessao_banco,
+        ),
+        partial(_cadastrar_pessoa_fisica, dados_entrada_cliente, sessao_banco),
+        dados_entrada_cliente.senha_texto_puro,
     )
-    return cliente_criado
 
 
 @router.get(
@@ -40,13 +68,15 @@ def rota_criar_pessoa_fisica(
     summary="Lista todas as Pessoas Físicas (Requer Funcionário)",
 )
 def rota_listar_pessoas_fisicas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_leitura)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     lista_clientes = cliente_service.listar_pessoas_fisicas(sessao_banco=sessao_banco)
-    return lista_clientes
+    return RespostaJSONRapida.de_itens(
+        _ADAPTADOR_LISTA_PESSOAS_FISICAS,
+        lista_clientes,
+        construtor=_CONSTRUIR_LISTA_PESSOAS_FISICAS,
+    )
 
 
 @router.get(
@@ -95,10 +125,8 @@ def rota_atualizar_meus_dados_pf(
 )
 def rota_buscar_pessoa_fisica_por_id(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_leitura)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente = cliente_service.buscar_pessoa_fisica_por_id(
         id_pessoa=id_pessoa, sessao_banco=sessao_banco
@@ -115,9 +143,7 @@ def rota_atualizar_pessoa_fisica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaFisicaCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente_atualizado = cliente_service.atualizar_pessoa_fisica(
         id_pessoa=id_pessoa,
@@ -135,9 +161,7 @@ def rota_atualizar_pessoa_fisica(
 def rota_deletar_pessoa_fisica(
     id_pessoa: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente_service.deletar_pessoa_fisica(
         id_pessoa=id_pessoa, sessao_banco=sessao_banco
@@ -153,9 +177,7 @@ def rota_alterar_status_cliente_pf(
     id_pessoa: int,
     novo_status: Annotated[StatusContaEnum, Body(embed=True)],
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente_atualizado = cliente_service.alterar_status_pessoa_fisica(
         id_pessoa=id_pessoa, novo_status=novo_status, sessao_banco=sessao_banco
@@ -1,15 +1,20 @@
+from functools import partial
 from typing import Annotated, List
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from .. import models
 from ..dependencies import (
-    obter_sessao_banco,
-    obter_funcionario_atual,
+    FuncionarioToken,
     obter_cliente_atual,
+    obter_funcionario_token,
+    obter_sessao_banco,
+    obter_sessao_leitura,
 )
 from ..models.enums import StatusContaEnum
+from ..respostas import RespostaJSONRapida, construtor_confiavel
 from ..schemas import cliente_schema
 from ..services import cliente_service
 
@@ -17,6 +22,26 @@ router = APIRouter(
     prefix="/clientes/pessoas-juridicas", tags=["Clientes - Pessoa Jurídica"]
 )
 
+_ADAPTADOR_LISTA_PESSOAS_JURIDICAS = TypeAdapter(
+    List[cliente_schema.SchemaPessoaJuridica]
+)
+_CONSTRUIR_LISTA_PESSOAS_JURIDICAS = construtor_confiavel(
+    List[cliente_schema.SchemaPessoaJuridica]
+)
+
+
+def _cadastrar_pessoa_juridica(
+    dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
+    sessao_banco: Session,
+    hash_senha: str,
+) -> cliente_schema.SchemaPessoaJuridica:
+    empresa_criada = cliente_service.criar_pessoa_juridica(
+        dados_entrada_empresa=dados_entrada_empresa,
+        sessao_banco=sessao_banco,
+        hash_senha=hash_senha,
+    )
+    return cliente_schema.SchemaPessoaJuridica.model_validate(empresa_criada)
+
 
 @router.post(
     "/",
@@ -24,14 +49,19 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="Cadastra um novo cliente Pessoa Jurídica (Auto-cadastro)",
 )
-def rota_criar_pessoa_juridica(
+async def rota_criar_pessoa_juridica(
     dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
 ):
-    empresa_criada = cliente_service.criar_pessoa_juridica(
-        dados_entrada_empresa=dados_entrada_empresa, sessao_banco=sessao_banco
+    return await cliente_service.cadastrar_com_hash_async(
+        partial(
+            cliente_service.validar_nova_pessoa_juridica,
+            dados_entrada_empresa,
+            sessao_banco,
+        ),
+        partial(_cadastrar_pessoa_juridica, dados_entrada_empresa, sessao_banco),
+        dados_entrada_empresa.senha_texto_puro,
     )
-    return empresa_criada
 
 
 @router.get(
@@ -40,13 +70,15 @@ def rota_criar_pessoa_juridica(
     summary="Lista todas as Pessoas Jurídicas (Requer Funcionário)",
 )
 def rota_listar_pessoas_juridicas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_leitura)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     lista_empresas = cliente_service.listar_pessoas_juridicas(sessao_banco=sessao_banco)
-    return lista_empresas
+    return RespostaJSONRapida.de_itens(
+        _ADAPTADOR_LISTA_PESSOAS_JURIDICAS,
+        lista_empresas,
+        construtor=_CONSTRUIR_LISTA_PESSOAS_JURIDICAS,
+    )
 
 
 @router.get("/me", response_model=cliente_schema.SchemaPessoaJuridica)
@@ -80,10 +112,8 @@ def rota_atualizar_meus_dados_pj(
 )
 def rota_buscar_pessoa_juridica_por_id(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    sessao_banco: Annotated[Session, Depends(obter_sessao_leitura)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     empresa = cliente_service.buscar_pessoa_juridica_por_id(
         id_pessoa=id_pessoa, sessao_banco=sessao_banco
@@ -100,9 +130,7 @@ def rota_atualizar_pessoa_juridica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaJuridicaCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     empresa_atualizada = cliente_service.atualizar_pessoa_juridica(
         id_pessoa=id_pessoa,
@@ -120,9 +148,7 @@ def rota_atualizar_pessoa_juridica(
 def rota_deletar_pessoa_juridica(
     id_pessoa: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente_service.deletar_pessoa_juridica(
         id_pessoa=id_pessoa, sessao_banco=sessao_banco
@@ -138,9 +164,7 @@ def rota_alterar_status_cliente_pj(
     id_pessoa: int,
     novo_status: Annotated[StatusContaEnum, Body(embed=True)],
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     cliente_atualizado = cliente_service.alterar_status_pessoa_juridica(
         id_pessoa=id_pessoa, novo_status=novo_status, sessao_banco=sessao_banco
@@ -1,39 +1,67 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
 from ..dependencies import (
+    FuncionarioToken,
     obter_cliente_atual,
-    obter_funcionario_atual,
+    obter_funcionario_token,
     obter_sessao_banco,
+    obter_sessao_leitura_async,
 )
+from ..paginacao import TAMANHO_PAGINA_MAXIMO, TAMANHO_PAGINA_PADRAO
+from ..respostas import RespostaJSONRapida, construtor_confiavel
 from ..schemas import reserva_schema
 from ..services import reserva_service
 
 router = APIRouter(prefix="/reservas", tags=["Reservas"])
 
+_ADAPTADOR_LISTA_RESERVAS = TypeAdapter(List[reserva_schema.SchemaReserva])
+_CONSTRUIR_LISTA_RESERVAS = construtor_confiavel(List[reserva_schema.SchemaReserva])
+
 
 @router.post(
     "/simulacao",
     response_model=reserva_schema.SchemaReservaSimulacaoResultado,
     summary="Simula o valor total de uma reserva antes da confirmação",
 )
-def rota_simular_preco_reserva(
+async def rota_simular_preco_reserva(
     dados_simulacao: reserva_schema.SchemaReservaSimulacao,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
 ):
     """
     Retorna o valor estimado das diárias + seguros baseados nas datas e veículo escolhido.
     Não salva nada no banco.
     """
-    resultado = reserva_service.simular_valor_reserva(
+    resultado = await reserva_service.simular_valor_reserva_async(
         dados_simulacao=dados_simulacao, sessao_banco=sessao_banco
     )
     return resultado
 
 
+@router.post(
+    "/simulacao/lote",
+    response_model=List[reserva_schema.SchemaReservaSimulacaoLoteResultado],
+    summary="Simula valores de vários veículos/períodos em uma única chamada",
+)
+async def rota_simular_precos_em_lote(
+    dados_lote: reserva_schema.SchemaReservaSimulacaoLote,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+):
+    """
+    Uma cotação por item, na ordem enviada, com as mesmas regras da simulação
+    individual. As diárias de todos os veículos vêm de uma única consulta.
+    """
+    resultado = await reserva_service.simular_valores_em_lote_async(
+        dados_lote=dados_lote, sessao_banco=sessao_banco
+    )
+    return resultado
+
+
 @router.post(
     "/",
     response_model=reserva_schema.SchemaReserva,
@@ -58,14 +86,18 @@ def rota_criar_reserva(
     response_model=List[reserva_schema.SchemaReserva],
     summary="Lista as reservas do cliente logado",
 )
-def rota_listar_minhas_reservas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+async def rota_listar_minhas_reservas(
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
     cliente_logado: Annotated[models.Pessoa, Depends(obter_cliente_atual)],
 ):
-    lista_reservas = reserva_service.listar_reservas_por_cliente(
+    lista_reservas = await reserva_service.listar_reservas_por_cliente_async(
         cliente_logado=cliente_logado, sessao_banco=sessao_banco
     )
-    return lista_reservas
+    return await RespostaJSONRapida.de_itens_async(
+        _ADAPTADOR_LISTA_RESERVAS,
+        lista_reservas,
+        construtor=_CONSTRUIR_LISTA_RESERVAS,
+    )
 
 
 @router.get(
@@ -73,12 +105,12 @@ def rota_listar_minhas_reservas(
     response_model=reserva_schema.SchemaReserva,
     summary="Detalhes de uma reserva específica do cliente logado",
 )
-def rota_buscar_minha_reserva_detalhes(
+async def rota_buscar_minha_reserva_detalhes(
     id_reserva: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
     cliente_logado: Annotated[models.Pessoa, Depends(obter_cliente_atual)],
 ):
-    reserva = reserva_service.buscar_reserva_por_id_e_cliente(
+    reserva = await reserva_service.buscar_reserva_por_id_e_cliente_async(
         id_reserva=id_reserva,
         id_cliente=cliente_logado.id_pessoa,
         sessao_banco=sessao_banco,
@@ -86,6 +118,57 @@ def rota_buscar_minha_reserva_detalhes(
     return reserva
 
 
+# As rotas em lote vêm antes de "/{id_reserva}/..." para que "lote" não seja
+# interpretado como ID.
+@router.put(
+    "/lote/confirmar",
+    response_model=List[reserva_schema.SchemaReservaTransicaoResultado],
+    summary="Confirma várias reservas pendentes de uma vez (Requer Funcionário)",
+)
+def rota_confirmar_reservas_em_lote(
+    dados_lote: reserva_schema.SchemaReservaTransicaoLote,
+    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
+):
+    return reserva_service.confirmar_reservas_em_lote(
+        dados_lote.ids_reservas, sessao_banco
+    )
+
+
+@router.put(
+    "/lote/retirar",
+    response_model=List[reserva_schema.SchemaReservaTransicaoResultado],
+    summary="Registra a retirada de várias reservas confirmadas (Requer Funcionário)",
+)
+def rota_registrar_retiradas_em_lote(
+    dados_lote: reserva_schema.SchemaReservaTransicaoLote,
+    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
+):
+    return reserva_service.registrar_retiradas_em_lote(
+        dados_lote.ids_reservas, sessao_banco
+    )
+
+
+@router.put(
+    "/lote/finalizar",
+    response_model=List[reserva_schema.SchemaReservaTransicaoResultado],
+    summary="Finaliza várias locações em andamento (Requer Funcionário)",
+)
+def rota_finalizar_reservas_em_lote(
+    dados_lote: reserva_schema.SchemaReservaTransicaoLote,
+    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
+):
+    """
+    Cada reserva recebe seu valor final (dias usados, seguros e multa por
+    atraso), como na finalização individual.
+    """
+    return reserva_service.finalizar_reservas_em_lote(
+        dados_lote.ids_reservas, sessao_banco
+    )
+
+
 @router.put(
     "/{id_reserva}/cancelar",
     response_model=reserva_schema.SchemaReserva,
@@ -142,17 +225,31 @@ def rota_modificar_reserva(
     response_model=List[reserva_schema.SchemaReserva],
     summary="Lista todas as reservas (Painel Admin)",
 )
-def rota_listar_reservas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+async def rota_listar_reservas(
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
     filtro_status: Annotated[str | None, Query(alias="status")] = None,
+    cursor: Annotated[
+        Optional[str],
+        Query(description="Cursor devolvido no cabeçalho X-Next-Cursor"),
+    ] = None,
+    limite: Annotated[
+        int, Query(ge=1, le=TAMANHO_PAGINA_MAXIMO, description="Itens por página")
+    ] = TAMANHO_PAGINA_PADRAO,
 ):
-    lista_reservas = reserva_service.listar_reservas(
-        sessao_banco=sessao_banco, filtro_status=filtro_status
+    """
+    Paginação por cursor (keyset) em (data_retirada, id_reserva). Quando há
+    mais itens, o cursor da próxima página vem no cabeçalho X-Next-Cursor.
+    """
+    pagina = await reserva_service.listar_reservas_async(
+        sessao_banco=sessao_banco,
+        filtro_status=filtro_status,
+        cursor=cursor,
+        limite=limite,
+    )
+    return await RespostaJSONRapida.de_pagina_async(
+        _ADAPTADOR_LISTA_RESERVAS, pagina, construtor=_CONSTRUIR_LISTA_RESERVAS
     )
-    return lista_reservas
 
 
 @router.get(
@@ -160,14 +257,12 @@ def rota_listar_reservas(
     response_model=reserva_schema.SchemaReserva,
     summary="Busca uma reserva pelo ID (Requer Login de Funcionário)",
 )
-def rota_buscar_reserva_por_id(
+async def rota_buscar_reserva_por_id(
     id_reserva: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
-    reserva = reserva_service.buscar_reserva_por_id(
+    reserva = await reserva_service.buscar_reserva_por_id_async(
         id_reserva=id_reserva, sessao_banco=sessao_banco
     )
     return reserva
@@ -181,9 +276,7 @@ def rota_buscar_reserva_por_id(
 def rota_finalizar_reserva(
     id_reserva: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     reserva_finalizada = reserva_service.finalizar_reserva(
         id_reserva=id_reserva, sessao_banco=sessao_banco
@@ -199,9 +292,7 @@ def rota_finalizar_reserva(
 def rota_confirmar_reserva(
     id_reserva: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     return reserva_service.confirmar_reserva(id_reserva, sessao_banco)
 
@@ -214,8 +305,6 @@ def rota_confirmar_reserva(
 def rota_registrar_retirada(
     id_reserva: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     return reserva_service.registrar_retirada(id_reserva, sessao_banco)
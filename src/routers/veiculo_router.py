@@ -1,16 +1,89 @@
-from typing import Annotated, List, Optional
+from datetime import datetime
+from typing import Annotated, AsyncIterable, List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.sse import EventSourceResponse, ServerSentEvent
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models
-from ..dependencies import obter_funcionario_atual, obter_sessao_banco
-from ..models.enums import TipoVeiculoEnum
+from ..catalogo import (
+    RespostaCatalogo,
+    cache_respostas_catalogo,
+    etag_catalogo,
+    etag_corresponde,
+    etag_veiculo,
+    geracao_respostas_catalogo,
+    guardar_resposta_catalogo,
+    obter_versao_catalogo_async,
+)
+from ..dependencies import (
+    FuncionarioToken,
+    obter_funcionario_token,
+    obter_sessao_banco,
+    obter_sessao_leitura_async,
+)
+from ..eventos import hub_status_veiculos
+from ..models.enums import DirecaoOrdenacaoEnum, OrdenacaoVeiculoEnum, TipoVeiculoEnum
+from ..paginacao import (
+    TAMANHO_PAGINA_MAXIMO,
+    TAMANHO_PAGINA_PADRAO,
+    cabecalhos_pagina,
+)
+from ..respostas import RespostaJSONRapida, construtor_confiavel
 from ..schemas import veiculo_schema
 from ..services import veiculo_service
 
 router = APIRouter(prefix="/veiculos", tags=["Veículos"])
 
+_ADAPTADOR_LISTA_VEICULOS = TypeAdapter(List[veiculo_schema.SchemaVeiculo])
+_CONSTRUIR_LISTA_VEICULOS = construtor_confiavel(List[veiculo_schema.SchemaVeiculo])
+
+
+def _nao_modificado(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def _filtro_catalogo(
+    categoria: Annotated[
+        Optional[TipoVeiculoEnum], Query(description="Filtrar por tipo de veículo")
+    ] = None,
+    apenas_disponiveis: Annotated[
+        bool, Query(description="Listar apenas veículos disponíveis para aluguel")
+    ] = True,
+    termo_busca: Annotated[
+        Optional[str],
+        Query(description="Buscar por marca, modelo ou placa"),
+    ] = None,
+    ordenar_por: Annotated[
+        Optional[OrdenacaoVeiculoEnum],
+        Query(
+            description="Campo de ordenação (padrão: relevância com termo_busca, "
+            "senão id_veiculo)"
+        ),
+    ] = None,
+    direcao: Annotated[
+        Optional[DirecaoOrdenacaoEnum],
+        Query(description="Sentido da ordenação (padrão: desc para relevância)"),
+    ] = None,
+) -> veiculo_service.FiltroCatalogo:
+    return veiculo_service.FiltroCatalogo(
+        categoria, apenas_disponiveis, termo_busca, ordenar_por, direcao
+    )
+
+
+def _filtro_disponibilidade(
+    retirada: Annotated[datetime, Query(description="Data e hora de retirada")],
+    devolucao: Annotated[datetime, Query(description="Data e hora de devolução")],
+    categoria: Annotated[
+        Optional[TipoVeiculoEnum], Query(description="Filtrar por tipo de veículo")
+    ] = None,
+) -> veiculo_service.FiltroDisponibilidade:
+    return veiculo_service.FiltroDisponibilidade(retirada, devolucao, categoria)
+
 
 @router.post(
     "/passeio",
@@ -21,9 +94,7 @@ router = APIRouter(prefix="/veiculos", tags=["Veículos"])
 def rota_criar_veiculo_passeio(
     dados_entrada_veiculo: veiculo_schema.SchemaPasseioCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     veiculo_criado = veiculo_service.criar_veiculo_passeio(
         dados_entrada_veiculo=dados_entrada_veiculo, sessao_banco=sessao_banco
@@ -40,9 +111,7 @@ def rota_criar_veiculo_passeio(
 def rota_criar_veiculo_utilitario(
     dados_entrada_veiculo: veiculo_schema.SchemaUtilitarioCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     veiculo_criado = veiculo_service.criar_veiculo_utilitario(
         dados_entrada_veiculo=dados_entrada_veiculo, sessao_banco=sessao_banco
@@ -59,9 +128,7 @@ def rota_criar_veiculo_utilitario(
 def rota_criar_veiculo_motocicleta(
     dados_entrada_veiculo: veiculo_schema.SchemaMotocicletaCriar,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     veiculo_criado = veiculo_service.criar_veiculo_motocicleta(
         dados_entrada_veiculo=dados_entrada_veiculo, sessao_banco=sessao_banco
@@ -74,25 +141,114 @@ def rota_criar_veiculo_motocicleta(
     response_model=List[veiculo_schema.SchemaVeiculo],
     summary="Lista veículos com filtros (Aberto para Clientes)",
 )
-def rota_listar_veiculos(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    categoria: Annotated[
-        Optional[TipoVeiculoEnum], Query(description="Filtrar por tipo de veículo")
+async def rota_listar_veiculos(
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+    filtro: Annotated[veiculo_service.FiltroCatalogo, Depends(_filtro_catalogo)],
+    cursor: Annotated[
+        Optional[str],
+        Query(description="Cursor devolvido no cabeçalho X-Next-Cursor"),
     ] = None,
-    apenas_disponiveis: Annotated[
-        bool, Query(description="Listar apenas veículos disponíveis para aluguel")
-    ] = True,
-    termo_busca: Annotated[
-        Optional[str], Query(description="Buscar por modelo ou marca")
+    limite: Annotated[
+        int, Query(ge=1, le=TAMANHO_PAGINA_MAXIMO, description="Itens por página")
+    ] = TAMANHO_PAGINA_PADRAO,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """
+    A ETag acompanha a versão do catálogo (maiores versões de veículos e de
+    remoções), que muda a cada alteração. Com If-None-Match igual, responde
+    304 sem consultar a listagem.
+    Respostas repetidas saem prontas do cache em memória, sem tocar o banco.
+    """
+    # A busca já ignora maiúsculas; o restante entra na chave como veio.
+    chave = (
+        filtro._replace(
+            termo_busca=filtro.termo_busca.lower() if filtro.termo_busca else None
+        ),
+        cursor,
+        limite,
+    )
+    pronta = cache_respostas_catalogo.obter(chave)
+    if pronta is None:
+        geracao = geracao_respostas_catalogo()
+        etag = etag_catalogo(await obter_versao_catalogo_async(sessao_banco))
+        if etag_corresponde(if_none_match, etag):
+            return _nao_modificado(etag)
+
+        pagina = await veiculo_service.listar_veiculos_async(
+            sessao_banco=sessao_banco, filtro=filtro, cursor=cursor, limite=limite
+        )
+        pronta = RespostaCatalogo(
+            etag=etag,
+            corpo=RespostaJSONRapida.de_itens(
+                _ADAPTADOR_LISTA_VEICULOS,
+                pagina.itens,
+                construtor=_CONSTRUIR_LISTA_VEICULOS,
+            ).body,
+            proximo_cursor=pagina.proximo_cursor,
+        )
+        guardar_resposta_catalogo(chave, pronta, geracao)
+
+    if etag_corresponde(if_none_match, pronta.etag):
+        return _nao_modificado(pronta.etag)
+    cabecalhos = {
+        "ETag": pronta.etag,
+        "Cache-Control": "no-cache",
+        **cabecalhos_pagina(pronta.proximo_cursor),
+    }
+    return RespostaJSONRapida(content=pronta.corpo, headers=cabecalhos)
+
+
+@router.get(
+    "/disponiveis",
+    response_model=List[veiculo_schema.SchemaVeiculo],
+    summary="Lista veículos livres em um período (Aberto para Clientes)",
+)
+async def rota_listar_veiculos_disponiveis_no_periodo(
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+    filtro: Annotated[
+        veiculo_service.FiltroDisponibilidade, Depends(_filtro_disponibilidade)
+    ],
+    cursor: Annotated[
+        Optional[str],
+        Query(description="Cursor devolvido no cabeçalho X-Next-Cursor"),
     ] = None,
+    limite: Annotated[
+        int, Query(ge=1, le=TAMANHO_PAGINA_MAXIMO, description="Itens por página")
+    ] = TAMANHO_PAGINA_PADRAO,
 ):
-    lista_veiculos = veiculo_service.listar_veiculos(
-        sessao_banco=sessao_banco,
-        categoria=categoria,
-        apenas_disponiveis=apenas_disponiveis,
-        termo_busca=termo_busca,
+    """
+    Só lista veículos que podem ser reservados agora para o período: status
+    DISPONIVEL e sem reserva ativa sobreposta. Um veículo reservado ou alugado
+    não aparece, mesmo que o período pedido comece depois da devolução.
+    """
+    pagina = await veiculo_service.listar_veiculos_disponiveis_no_periodo_async(
+        sessao_banco=sessao_banco, filtro=filtro, cursor=cursor, limite=limite
+    )
+    return await RespostaJSONRapida.de_pagina_async(
+        _ADAPTADOR_LISTA_VEICULOS, pagina, construtor=_CONSTRUIR_LISTA_VEICULOS
     )
-    return lista_veiculos
+
+
+@router.get(
+    "/status/eventos",
+    response_class=EventSourceResponse,
+    summary="Fluxo (SSE) das mudanças de status dos veículos (Aberto)",
+)
+async def rota_eventos_status_veiculos() -> AsyncIterable[ServerSentEvent]:
+    """
+    Substitui o polling do catálogo: carregue a lista uma vez e aplique os
+    eventos "status_veiculo" ({id_veiculo, status, ocorrido_em}) que chegarem.
+    Eventos não são reenviados após reconexão; nesse caso, recarregue a lista.
+    """
+    assinatura = hub_status_veiculos.assinar()
+    try:
+        while True:
+            sequencia, evento = await assinatura.proximo()
+            yield ServerSentEvent(
+                data=evento, event="status_veiculo", id=str(sequencia)
+            )
+    finally:
+        hub_status_veiculos.cancelar(assinatura)
 
 
 @router.get(
@@ -100,13 +256,26 @@ def rota_listar_veiculos(
     response_model=veiculo_schema.SchemaVeiculo,
     summary="Busca veículo por ID (Aberto para Clientes)",
 )
-def rota_buscar_veiculo_por_id(
+async def rota_buscar_veiculo_por_id(
     id_veiculo: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    resposta: Response,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura_async)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-    veiculo = veiculo_service.buscar_veiculo_por_id(
+    if if_none_match:
+        versao = await veiculo_service.obter_versao_veiculo_async(
+            id_veiculo, sessao_banco
+        )
+        if versao is not None:
+            etag = etag_veiculo(id_veiculo, versao)
+            if etag_corresponde(if_none_match, etag):
+                return _nao_modificado(etag)
+
+    veiculo = await veiculo_service.buscar_veiculo_por_id_async(
         id_veiculo=id_veiculo, sessao_banco=sessao_banco
     )
+    resposta.headers["ETag"] = etag_veiculo(veiculo.id_veiculo, veiculo.versao)
+    resposta.headers["Cache-Control"] = "no-cache"
     return veiculo
 
 
@@ -119,9 +288,7 @@ def rota_atualizar_veiculo_passeio(
     id_veiculo: int,
     dados_atualizacao: veiculo_schema.SchemaPasseioUpdate,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     return veiculo_service.atualizar_veiculo_passeio(
         id_veiculo=id_veiculo,
@@ -139,9 +306,7 @@ def rota_atualizar_veiculo_utilitario(
     id_veiculo: int,
     dados_atualizacao: veiculo_schema.SchemaUtilitarioUpdate,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     return veiculo_service.atualizar_veiculo_utilitario(
         id_veiculo=id_veiculo,
@@ -159,9 +324,7 @@ def rota_atualizar_veiculo_motocicleta(
     id_veiculo: int,
     dados_atualizacao: veiculo_schema.SchemaMotocicletaUpdate,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     return veiculo_service.atualizar_veiculo_motocicleta(
         id_veiculo=id_veiculo,
@@ -178,8 +341,6 @@ def rota_atualizar_veiculo_motocicleta(
 def rota_deletar_veiculo(
     id_veiculo: int,
     sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
-    ],
+    _funcionario_logado: Annotated[FuncionarioToken, Depends(obter_funcionario_token)],
 ):
     veiculo_service.deletar_veiculo(id_veiculo=id_veiculo, sessao_banco=sessao_banco)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -9,6 +9,13 @@ from .veiculo_schema import SchemaVeiculo
 
 SchemaCliente = Union[SchemaPessoaFisica, SchemaPessoaJuridica]
 
+# Membro do SchemaCliente conforme o discriminador do ORM (Pessoa.tipo_pessoa),
+# para quem monta a resposta sem validar (respostas.construtor_confiavel).
+SCHEMA_CLIENTE_POR_TIPO_PESSOA = {
+    "pessoa_fisica": SchemaPessoaFisica,
+    "pessoa_juridica": SchemaPessoaJuridica,
+}
+
 
 class SchemaReservaSimulacao(BaseModel):
     veiculo_id: int
@@ -35,6 +42,21 @@ class SchemaReservaSimulacaoResultado(BaseModel):
     valor_total_estimado: float
 
 
+TAMANHO_MAXIMO_LOTE_SIMULACAO = 200
+
+
+class SchemaReservaSimulacaoLote(BaseModel):
+    """Várias simulações de uma vez (ex.: página de busca com vários veículos)."""
+
+    itens: List[SchemaReservaSimulacao] = Field(
+        ..., min_length=1, max_length=TAMANHO_MAXIMO_LOTE_SIMULACAO
+    )
+
+
+class SchemaReservaSimulacaoLoteResultado(SchemaReservaSimulacaoResultado):
+    veiculo_id: int
+
+
 class SchemaReservaBase(BaseModel):
     veiculo_id: int
     data_retirada: datetime = Field(..., description="Data e hora de retirada")
@@ -90,3 +112,21 @@ class SchemaReservaUpdate(BaseModel):
         if inicio and v <= inicio:
             raise ValueError("Devolução deve ser após retirada.")
         return v
+
+
+TAMANHO_MAXIMO_LOTE_TRANSICAO = 200
+
+
+class SchemaReservaTransicaoLote(BaseModel):
+    """IDs de reservas que devem mudar de status juntas (ex.: retiradas da manhã)."""
+
+    ids_reservas: List[int] = Field(
+        ..., min_length=1, max_length=TAMANHO_MAXIMO_LOTE_TRANSICAO
+    )
+
+
+class SchemaReservaTransicaoResultado(BaseModel):
+    id_reserva: int
+    sucesso: bool
+    status: Optional[StatusReservaEnum] = None
+    erro: Optional[str] = None
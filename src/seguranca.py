@@ -1,22 +1,181 @@
+import asyncio
+import hashlib
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Dict, Optional
 
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import argon2
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from .cache import CacheLRU
 
 
-def verificar_senha(senha_texto_puro: str, senha_hashada: str) -> bool:
+def _parametros_argon2() -> dict:
+    # Sem variável definida, vale o padrão do passlib. Hashes gerados com
+    # outros custos passam a ser marcados por needs_update().
+    parametros = {}
+    for variavel, parametro in (
+        ("ARGON2_TIME_COST", "argon2__rounds"),
+        ("ARGON2_MEMORY_COST_KIB", "argon2__memory_cost"),
+        ("ARGON2_PARALLELISM", "argon2__parallelism"),
+    ):
+        if os.getenv(variavel):
+            parametros[parametro] = int(os.environ[variavel])
+    # needs_update() só compara o time cost com um mínimo explícito.
+    parametros["argon2__min_rounds"] = parametros.get(
+        "argon2__rounds", argon2.default_rounds
+    )
+    return parametros
+
+
+pwd_context = CryptContext(
+    schemes=["argon2"], deprecated="auto", **_parametros_argon2()
+)
+
+ARGON2_PROCESSOS = int(
+    os.getenv("ARGON2_PROCESSOS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+ARGON2_FILA_MAXIMA = int(os.getenv("ARGON2_FILA_MAXIMA", "32"))
+
+
+def _verificar_no_worker(senha_texto_puro: str, senha_hashada: str) -> bool:
     return pwd_context.verify(senha_texto_puro, senha_hashada)
 
 
+def _hash_no_worker(senha: str) -> str:
+    return pwd_context.hash(senha)
+
+
+class PoolHashSenha:
+    """
+    Executa o argon2 em processos dedicados, fora do threadpool das rotas.
+    Aceita no máximo `processos + fila_maxima` tarefas pendentes; acima disso
+    responde 503, para que um pico de logins não derrube o resto da API.
+    Com processos=0 o hash roda inline (útil em desenvolvimento).
+    """
+
+    def __init__(self, processos: int, fila_maxima: int):
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._trava = threading.Lock()
+        self._pendentes = 0
+        self._rejeitadas = 0
+
+    def _criar_executor(self) -> ProcessPoolExecutor:
+        # forkserver evita herdar threads e conexões abertas do processo web.
+        metodo = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        contexto = multiprocessing.get_context(metodo)
+        return ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto)
+
+    def _concluir(self, _futuro: Future) -> None:
+        with self._trava:
+            self._pendentes -= 1
+
+    def executar(self, funcao, *argumentos) -> Future:
+        if self.processos <= 0:
+            futuro = Future()
+            futuro.set_result(funcao(*argumentos))
+            return futuro
+
+        with self._trava:
+            if self._pendentes >= self.processos + self.fila_maxima:
+                self._rejeitadas += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serviço de autenticação sobrecarregado. "
+                    "Tente novamente em instantes.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pendentes += 1
+            if self._executor is None:
+                self._executor = self._criar_executor()
+            executor = self._executor
+
+        try:
+            futuro = executor.submit(funcao, *argumentos)
+        except BrokenProcessPool:
+            # Um worker morreu (ex.: OOM); recria o pool e tenta uma vez.
+            with self._trava:
+                if self._executor is executor:
+                    self._executor = self._criar_executor()
+                executor = self._executor
+            try:
+                futuro = executor.submit(funcao, *argumentos)
+            except BaseException:
+                self._concluir(None)
+                raise
+        except BaseException:
+            self._concluir(None)
+            raise
+
+        futuro.add_done_callback(self._concluir)
+        return futuro
+
+    def encerrar(self) -> None:
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            em_execucao = min(self._pendentes, max(self.processos, 0))
+            return {
+                "processos": self.processos,
+                "em_execucao": em_execucao,
+                "aguardando": self._pendentes - em_execucao,
+                "fila_maxima": self.fila_maxima,
+                "rejeitadas": self._rejeitadas,
+            }
+
+
+pool_hash_senha = PoolHashSenha(ARGON2_PROCESSOS, ARGON2_FILA_MAXIMA)
+
+
+# As variantes síncronas prendem a thread chamadora até o worker terminar:
+# nenhuma rota as usa (login e cadastro aguardam as _async); ficam para
+# scripts, testes e serviços chamados fora do ciclo de requisição.
+def verificar_senha(senha_texto_puro: str, senha_hashada: str) -> bool:
+    return pool_hash_senha.executar(
+        _verificar_no_worker, senha_texto_puro, senha_hashada
+    ).result()
+
+
 def obter_hash_senha(senha: str) -> str:
     """
     Gera um hash argon2 para a senha fornecida.
     """
-    return pwd_context.hash(senha)
+    return pool_hash_senha.executar(_hash_no_worker, senha).result()
+
+
+def precisa_rehash(senha_hashada: str) -> bool:
+    """
+    Indica se o hash foi gerado com parâmetros diferentes dos atuais (ex.:
+    após mudar o custo do argon2). Só inspeciona o hash, não roda o argon2.
+    """
+    return pwd_context.needs_update(senha_hashada)
+
+
+async def verificar_senha_async(senha_texto_puro: str, senha_hashada: str) -> bool:
+    return await asyncio.wrap_future(
+        pool_hash_senha.executar(_verificar_no_worker, senha_texto_puro, senha_hashada)
+    )
+
+
+async def obter_hash_senha_async(senha: str) -> str:
+    return await asyncio.wrap_future(pool_hash_senha.executar(_hash_no_worker, senha))
 
 
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -28,8 +187,21 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 
-def criar_token_acesso(dados: dict, expira_em: Optional[timedelta] = None):
+def criar_token_acesso(
+    dados: dict,
+    expira_em: Optional[timedelta] = None,
+    papel: Optional[str] = None,
+    versao: Optional[int] = None,
+):
+    """
+    `papel` e `versao` viram as claims "papel" e "ver": com elas as rotas de
+    funcionário autorizam pelo token, conferindo só a tabela de versões.
+    """
     copia_dados = dados.copy()
+    if papel is not None:
+        copia_dados["papel"] = papel
+    if versao is not None:
+        copia_dados["ver"] = versao
 
     if expira_em:
         horario_expiracao = datetime.now(timezone.utc) + expira_em
@@ -44,9 +216,113 @@ def criar_token_acesso(dados: dict, expira_em: Optional[timedelta] = None):
     return token_jwt_codificado
 
 
+# Payloads já validados, por digest do token. Cada entrada expira junto com
+# o "exp" do próprio token, então o cache nunca estende a validade.
+JWT_CACHE_TAMANHO = int(os.getenv("JWT_CACHE_TAMANHO", "4096"))
+cache_tokens = CacheLRU(JWT_CACHE_TAMANHO)
+
+
 def verificar_token(token: str) -> Optional[dict]:
+    chave = hashlib.sha256(token.encode()).digest()
+    payload = cache_tokens.obter(chave)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    expiracao = payload.get("exp")
+    if isinstance(expiracao, (int, float)):
+        cache_tokens.definir(chave, payload, expira_em=float(expiracao))
+    return dict(payload)
+
+
+# Principais autenticados (cliente por id, funcionário por email). TTL curto:
+# a invalidação explícita só alcança o processo que fez a alteração.
+PRINCIPAL_CACHE_TTL_SEGUNDOS = float(os.getenv("PRINCIPAL_CACHE_TTL_SEGUNDOS", "30"))
+PRINCIPAL_CACHE_TAMANHO = int(os.getenv("PRINCIPAL_CACHE_TAMANHO", "2048"))
+cache_principais = CacheLRU(PRINCIPAL_CACHE_TAMANHO)
+
+
+def invalidar_principal_cliente(id_pessoa: int) -> None:
+    cache_principais.invalidar(("cliente", id_pessoa))
+
+
+def invalidar_principal_funcionario(email: str) -> None:
+    cache_principais.invalidar(("funcionario", email))
+
+
+class TabelaVersoesToken:
+    """
+    Versão vigente dos tokens de cada funcionário ativo (email -> versão),
+    recarregada inteira do banco a cada `intervalo_segundos`. Desativar ou
+    mudar o papel de um funcionário incrementa a versão, revogando os tokens
+    emitidos antes em no máximo um intervalo em todos os processos.
+
+    Email ausente da tabela (funcionário recém-criado, desativado ou `sub`
+    forjado) força uma recarga, mas no máximo uma a cada
+    `intervalo_ausente_segundos`: tokens revogados repetidos não viram uma
+    consulta da tabela inteira por requisição.
+    """
+
+    def __init__(self, intervalo_segundos: float, intervalo_ausente_segundos: float):
+        self.intervalo_segundos = intervalo_segundos
+        self.intervalo_ausente_segundos = intervalo_ausente_segundos
+        self._versoes: Dict[str, int] = {}
+        self._carregada_em: Optional[float] = None
+        self._trava = threading.Lock()
+        self._trava_recarga = threading.Lock()
+
+    def _recarregar(
+        self, carregar: Callable[[], Dict[str, int]], carregada_em: Optional[float]
+    ) -> None:
+        # Uma recarga por vez; quem esperou a trava encontra a tabela já
+        # recarregada por outra thread e aproveita o resultado.
+        with self._trava_recarga:
+            with self._trava:
+                recarregada = self._carregada_em not in (None, carregada_em)
+            if recarregada:
+                return
+            versoes = carregar()
+            with self._trava:
+                self._versoes = versoes
+                self._carregada_em = time.monotonic()
+
+    def versao_vigente(
+        self, email: str, carregar: Callable[[], Dict[str, int]]
+    ) -> Optional[int]:
+        with self._trava:
+            versao = self._versoes.get(email)
+            carregada_em = self._carregada_em
+        idade = None if carregada_em is None else time.monotonic() - carregada_em
+
+        if idade is not None and idade < self.intervalo_segundos:
+            if versao is not None or idade < self.intervalo_ausente_segundos:
+                return versao
+
+        self._recarregar(carregar, carregada_em)
+        with self._trava:
+            return self._versoes.get(email)
+
+    def registrar(self, email: str, versao: Optional[int]) -> None:
+        """Atualiza este processo na hora; os demais, na próxima recarga."""
+        with self._trava:
+            if versao is None:
+                self._versoes.pop(email, None)
+            else:
+                self._versoes[email] = versao
+
+    def invalidar(self) -> None:
+        with self._trava:
+            self._carregada_em = None
+
+
+TOKEN_VERSOES_RECARGA_SEGUNDOS = float(os.getenv("TOKEN_VERSOES_RECARGA_SEGUNDOS", "5"))
+TOKEN_VERSOES_RECARGA_AUSENTE_SEGUNDOS = float(
+    os.getenv("TOKEN_VERSOES_RECARGA_AUSENTE_SEGUNDOS", "1")
+)
+tabela_versoes_token = TabelaVersoesToken(
+    TOKEN_VERSOES_RECARGA_SEGUNDOS, TOKEN_VERSOES_RECARGA_AUSENTE_SEGUNDOS
+)
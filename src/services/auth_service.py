@@ -1,19 +1,31 @@
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
 from .. import seguranca as seguranca_service
+from ..models.enums import TipoPerfilEnum
 from ..schemas import auth_schema
 
 
+def _consulta_funcionario_por_email(email: str) -> Select:
+    # Comparação sem diferenciar maiúsculas, atendida por uq_funcionarios_email_lower.
+    return (
+        select(models.Funcionario)
+        .where(func.lower(models.Funcionario.email) == email.lower())
+        .limit(1)
+    )
+
+
 def buscar_funcionario_por_email(
     sessao_banco: Session, email: str
 ) -> Optional[models.Funcionario]:
     return (
         sessao_banco.query(models.Funcionario)
-        .filter(models.Funcionario.email == email)
+        .filter(func.lower(models.Funcionario.email) == email.lower())
         .first()
     )
 
@@ -39,6 +51,52 @@ def autenticar_funcionario(
     return funcionario_encontrado
 
 
+async def autenticar_funcionario_async(
+    sessao_banco: AsyncSession, email_formulario: str, senha_formulario: str
+) -> Optional[models.Funcionario]:
+    resultado = await sessao_banco.scalars(
+        _consulta_funcionario_por_email(email_formulario)
+    )
+    funcionario_encontrado = resultado.first()
+
+    if not funcionario_encontrado:
+        return None
+
+    if not funcionario_encontrado.e_ativado:
+        return None
+
+    if not await seguranca_service.verificar_senha_async(
+        senha_texto_puro=senha_formulario, senha_hashada=funcionario_encontrado.senha
+    ):
+        return None
+
+    return funcionario_encontrado
+
+
+async def atualizar_hash_senha_funcionario_async(
+    sessao_banco: AsyncSession,
+    id_funcionario: int,
+    hash_atual: str,
+    senha_texto_puro: str,
+) -> bool:
+    """
+    Regrava o hash com os parâmetros atuais do argon2. Só troca se o hash no
+    banco ainda for o que foi verificado, para não sobrescrever uma troca de
+    senha concorrente.
+    """
+    novo_hash = await seguranca_service.obter_hash_senha_async(senha_texto_puro)
+    resultado = await sessao_banco.execute(
+        update(models.Funcionario)
+        .where(
+            models.Funcionario.id_funcionario == id_funcionario,
+            models.Funcionario.senha == hash_atual,
+        )
+        .values(senha=novo_hash)
+    )
+    await sessao_banco.commit()
+    return resultado.rowcount == 1
+
+
 def criar_funcionario(
     sessao_banco: Session, dados_funcionario: auth_schema.SchemaFuncionarioCriar
 ) -> models.Funcionario:
@@ -73,7 +131,7 @@ def autenticar_cliente(
 ) -> Optional[models.Pessoa]:
     cliente_encontrado = (
         sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == email_formulario)
+        .filter(func.lower(models.Pessoa.email) == email_formulario.lower())
         .first()
     )
 
@@ -89,3 +147,30 @@ def autenticar_cliente(
         return None
 
     return cliente_encontrado
+
+
+def alterar_status_funcionario(
+    sessao_banco: Session, id_funcionario: int, e_ativado: bool
+) -> models.Funcionario:
+    funcionario = sessao_banco.get(models.Funcionario, id_funcionario)
+    if funcionario is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Funcionário com ID {id_funcionario} não encontrado.",
+        )
+
+    funcionario.e_ativado = e_ativado
+    # Tokens emitidos antes da mudança deixam de valer.
+    funcionario.versao_token = models.Funcionario.versao_token + 1
+    sessao_banco.commit()
+    sessao_banco.refresh(funcionario)
+    seguranca_service.invalidar_principal_funcionario(funcionario.email)
+    seguranca_service.tabela_versoes_token.registrar(
+        funcionario.email, funcionario.versao_token if e_ativado else None
+    )
+
+    return funcionario
+
+
+def papel_funcionario(funcionario: models.Funcionario) -> TipoPerfilEnum:
+    return TipoPerfilEnum.ADMIN if funcionario.e_admin else TipoPerfilEnum.FUNCIONARIO
@@ -1,18 +1,29 @@
 # pylint: disable=duplicate-code
 from typing import Optional
 
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
 from .. import seguranca as seguranca_service
 
 
+def _consulta_cliente_por_email(email: str) -> Select:
+    # Comparação sem diferenciar maiúsculas, atendida por uq_pessoas_email_lower.
+    return (
+        select(models.Pessoa)
+        .where(func.lower(models.Pessoa.email) == email.lower())
+        .limit(1)
+    )
+
+
 def autenticar_cliente(
     sessao_banco: Session, email_formulario: str, senha_formulario: str
 ) -> Optional[models.Pessoa]:
     cliente_encontrado = (
         sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == email_formulario)
+        .filter(func.lower(models.Pessoa.email) == email_formulario.lower())
         .first()
     )
     if not cliente_encontrado:
@@ -27,3 +38,40 @@ def autenticar_cliente(
         return None
 
     return cliente_encontrado
+
+
+async def autenticar_cliente_async(
+    sessao_banco: AsyncSession, email_formulario: str, senha_formulario: str
+) -> Optional[models.Pessoa]:
+    resultado = await sessao_banco.scalars(
+        _consulta_cliente_por_email(email_formulario)
+    )
+    cliente_encontrado = resultado.first()
+    if not cliente_encontrado:
+        return None
+
+    if not cliente_encontrado.e_ativo:
+        return None
+
+    if not await seguranca_service.verificar_senha_async(
+        senha_texto_puro=senha_formulario, senha_hashada=cliente_encontrado.senha
+    ):
+        return None
+
+    return cliente_encontrado
+
+
+async def atualizar_hash_senha_cliente_async(
+    sessao_banco: AsyncSession,
+    id_pessoa: int,
+    hash_atual: str,
+    senha_texto_puro: str,
+) -> bool:
+    novo_hash = await seguranca_service.obter_hash_senha_async(senha_texto_puro)
+    resultado = await sessao_banco.execute(
+        update(models.Pessoa)
+        .where(models.Pessoa.id_pessoa == id_pessoa, models.Pessoa.senha == hash_atual)
+        .values(senha=novo_hash)
+    )
+    await sessao_banco.commit()
+    return resultado.rowcount == 1
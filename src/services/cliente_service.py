@@ -1,6 +1,8 @@
-from typing import List
+from typing import Callable, List, Optional, TypeVar
 
+from anyio import to_thread
 from fastapi import HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from .. import models
@@ -8,13 +10,37 @@ from .. import seguranca as seguranca_service
 from ..models.enums import StatusContaEnum
 from ..schemas import cliente_schema
 
+T = TypeVar("T")
 
-def criar_pessoa_fisica(
-    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar, sessao_banco: Session
-) -> models.PessoaFisica:
+
+def _filtro_email_pessoa(email: str):
+    # Sem diferenciar maiúsculas, como o login: o índice único em lower(email)
+    # impede Foo@x.com e foo@x.com em contas diferentes.
+    return func.lower(models.Pessoa.email) == email.lower()
+
+
+async def cadastrar_com_hash_async(
+    validar: Callable[[], None], cadastrar: Callable[[str], T], senha_texto_puro: str
+) -> T:
+    """
+    Roda `validar()` numa thread antes de tudo: um cadastro duplicado é
+    recusado sem gastar uma vaga do pool do argon2. Depois calcula o hash no
+    pool sem prender uma thread à espera e roda `cadastrar(hash_senha)`
+    (gravação e leitura das relações) numa thread.
+    """
+    await to_thread.run_sync(validar)
+    hash_senha = await seguranca_service.obter_hash_senha_async(senha_texto_puro)
+    return await to_thread.run_sync(cadastrar, hash_senha)
+
+
+def validar_nova_pessoa_fisica(
+    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
+    sessao_banco: Session,
+) -> None:
+    """Recusa email, CPF ou CNH já cadastrados (400)."""
     email_existente = (
         sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == dados_entrada_cliente.email)
+        .filter(_filtro_email_pessoa(dados_entrada_cliente.email))
         .first()
     )
     if email_existente:
@@ -42,13 +68,53 @@ def criar_pessoa_fisica(
             status_code=status.HTTP_400_BAD_REQUEST, detail="CNH já cadastrada."
         )
 
+
+def validar_nova_pessoa_juridica(
+    dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
+    sessao_banco: Session,
+) -> None:
+    """Recusa email ou CNPJ já cadastrados (400)."""
+    email_existente = (
+        sessao_banco.query(models.Pessoa)
+        .filter(_filtro_email_pessoa(dados_entrada_empresa.email))
+        .first()
+    )
+    if email_existente:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado."
+        )
+
+    cnpj_existente = (
+        sessao_banco.query(models.PessoaJuridica)
+        .filter(models.PessoaJuridica.cnpj == dados_entrada_empresa.cnpj)
+        .first()
+    )
+    if cnpj_existente:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="CNPJ já cadastrado."
+        )
+
+
+def criar_pessoa_fisica(
+    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
+    sessao_banco: Session,
+    hash_senha: Optional[str] = None,
+) -> models.PessoaFisica:
+    """
+    `hash_senha` já calculado (ex.: por cadastrar_com_hash_async) evita
+    prender a thread atual esperando o pool do argon2. A validação roda de
+    novo aqui: outro cadastro pode ter entrado enquanto o hash era calculado.
+    """
+    validar_nova_pessoa_fisica(dados_entrada_cliente, sessao_banco)
+
     novo_endereco_modelo = models.Endereco(
         **dados_entrada_cliente.endereco.model_dump()
     )
 
-    hash_senha = seguranca_service.obter_hash_senha(
-        dados_entrada_cliente.senha_texto_puro
-    )
+    if hash_senha is None:
+        hash_senha = seguranca_service.obter_hash_senha(
+            dados_entrada_cliente.senha_texto_puro
+        )
 
     dados_pessoa_fisica = dados_entrada_cliente.model_dump(
         exclude={"endereco", "senha_texto_puro"}
@@ -70,34 +136,19 @@ def criar_pessoa_fisica(
 def criar_pessoa_juridica(
     dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
     sessao_banco: Session,
+    hash_senha: Optional[str] = None,
 ) -> models.PessoaJuridica:
-    email_existente = (
-        sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == dados_entrada_empresa.email)
-        .first()
-    )
-    if email_existente:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado."
-        )
-
-    cnpj_existente = (
-        sessao_banco.query(models.PessoaJuridica)
-        .filter(models.PessoaJuridica.cnpj == dados_entrada_empresa.cnpj)
-        .first()
-    )
-    if cnpj_existente:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="CNPJ já cadastrado."
-        )
+    """Ver criar_pessoa_fisica sobre `hash_senha`."""
+    validar_nova_pessoa_juridica(dados_entrada_empresa, sessao_banco)
 
     novo_endereco_modelo = models.Endereco(
         **dados_entrada_empresa.endereco.model_dump()
     )
 
-    hash_senha = seguranca_service.obter_hash_senha(
-        dados_entrada_empresa.senha_texto_puro
-    )
+    if hash_senha is None:
+        hash_senha = seguranca_service.obter_hash_senha(
+            dados_entrada_empresa.senha_texto_puro
+        )
 
     dados_empresa = dados_entrada_empresa.model_dump(
         exclude={"endereco", "motoristas_ids", "senha_texto_puro"}
@@ -156,10 +207,10 @@ def atualizar_pessoa_fisica(
 ) -> models.PessoaFisica:
     cliente_para_atualizar = buscar_pessoa_fisica_por_id(id_pessoa, sessao_banco)
 
-    if dados_atualizacao.email != cliente_para_atualizar.email:
+    if dados_atualizacao.email.lower() != cliente_para_atualizar.email.lower():
         outro_cliente_email = (
             sessao_banco.query(models.Pessoa)
-            .filter(models.Pessoa.email == dados_atualizacao.email)
+            .filter(_filtro_email_pessoa(dados_atualizacao.email))
             .first()
         )
         if outro_cliente_email:
@@ -207,6 +258,7 @@ def atualizar_pessoa_fisica(
 
     sessao_banco.add(cliente_para_atualizar)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
     sessao_banco.refresh(cliente_para_atualizar)
 
     return cliente_para_atualizar
@@ -223,6 +275,7 @@ def deletar_pessoa_fisica(id_pessoa: int, sessao_banco: Session) -> None:
 
     sessao_banco.delete(cliente_para_deletar)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
 
 
 def listar_pessoas_juridicas(sessao_banco: Session) -> List[models.PessoaJuridica]:
@@ -262,10 +315,10 @@ def atualizar_pessoa_juridica(
                 detail="CNPJ já cadastrado para outra empresa.",
             )
 
-    if dados_atualizacao.email != empresa_para_atualizar.email:
+    if dados_atualizacao.email.lower() != empresa_para_atualizar.email.lower():
         outro_cliente_email = (
             sessao_banco.query(models.Pessoa)
-            .filter(models.Pessoa.email == dados_atualizacao.email)
+            .filter(_filtro_email_pessoa(dados_atualizacao.email))
             .first()
         )
         if outro_cliente_email:
@@ -306,6 +359,7 @@ def atualizar_pessoa_juridica(
 
     sessao_banco.add(empresa_para_atualizar)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
     sessao_banco.refresh(empresa_para_atualizar)
 
     return empresa_para_atualizar
@@ -322,6 +376,7 @@ def deletar_pessoa_juridica(id_pessoa: int, sessao_banco: Session) -> None:
 
     sessao_banco.delete(empresa_para_deletar)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
 
 
 def alterar_status_pessoa_fisica(
@@ -333,6 +388,7 @@ def alterar_status_pessoa_fisica(
 
     sessao_banco.add(cliente)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
     sessao_banco.refresh(cliente)
     return cliente
 
@@ -346,6 +402,7 @@ def alterar_status_pessoa_juridica(
 
     sessao_banco.add(empresa)
     sessao_banco.commit()
+    seguranca_service.invalidar_principal_cliente(id_pessoa)
     sessao_banco.refresh(empresa)
     return empresa
 
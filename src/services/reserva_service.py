@@ -1,24 +1,58 @@
 import math
+import os
 from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectin_polymorphic, selectinload
 
+from ..cache import CacheLRU
+from ..eventos import publicar_status_veiculos
 from ..models.enums import StatusReservaEnum, StatusVeiculoEnum
-from ..models.pessoa import Pessoa, PessoaJuridica
+from ..models.pessoa import Pessoa, PessoaFisica, PessoaJuridica
 from ..models.reserva import Reserva
 from ..models.veiculo import Veiculo
+from ..paginacao import (
+    TAMANHO_PAGINA_PADRAO,
+    Pagina,
+    decodificar_cursor,
+    filtro_apos_cursor,
+    montar_pagina,
+)
 from ..schemas import reserva_schema
+from . import veiculo_service
+
+
+def _opcoes_carregamento_reserva() -> tuple:
+    """
+    Carrega de antemão tudo que o SchemaReserva serializa (cliente PF/PJ com
+    endereço e motoristas, motorista e veículo), em um número fixo de SELECTs
+    por página, qualquer que seja o tamanho dela. Obrigatório no caminho
+    assíncrono, onde lazy loading não é permitido.
+    """
+    carregar_pessoa = (
+        selectin_polymorphic(Pessoa, [PessoaFisica, PessoaJuridica]),
+        selectinload(Pessoa.endereco),
+    )
+    return (
+        selectinload(Reserva.cliente).options(*carregar_pessoa),
+        selectinload(Reserva.cliente.of_type(PessoaJuridica))
+        .selectinload(PessoaJuridica.motoristas)
+        .selectinload(PessoaFisica.endereco),
+        selectinload(Reserva.motorista).options(*carregar_pessoa),
+        selectinload(Reserva.veiculo),
+    )
 
 
-def _calcular_custos_reserva(
-    data_retirada: datetime,
-    data_devolucao: datetime,
-    valor_diaria_veiculo: float,
-    incluir_seguro_pessoal: bool,
-    incluir_seguro_terceiros: bool,
-) -> dict:
+# Cotação por (diária, quantidade de diárias, seguros). A diária faz parte da
+# chave, então alterar o preço de um veículo nunca devolve valor antigo.
+COTACOES_CACHE_TAMANHO = int(os.getenv("COTACOES_CACHE_TAMANHO", "4096"))
+cache_cotacoes = CacheLRU(COTACOES_CACHE_TAMANHO)
+
+
+def _quantidade_diarias(data_retirada: datetime, data_devolucao: datetime) -> int:
     if data_devolucao <= data_retirada:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,8 +61,15 @@ def _calcular_custos_reserva(
 
     diferenca = data_devolucao - data_retirada
     quantidade_diarias = math.ceil(diferenca.total_seconds() / 86400)
-    quantidade_diarias = max(quantidade_diarias, 1)
+    return max(quantidade_diarias, 1)
+
 
+def _cotar(
+    valor_diaria_veiculo: float,
+    quantidade_diarias: int,
+    incluir_seguro_pessoal: bool,
+    incluir_seguro_terceiros: bool,
+) -> dict:
     valor_total_diarias = quantidade_diarias * valor_diaria_veiculo
 
     custo_seguros_por_dia = 0.0
@@ -48,17 +89,37 @@ def _calcular_custos_reserva(
     }
 
 
-def simular_valor_reserva(
-    dados_simulacao: reserva_schema.SchemaReservaSimulacao, sessao_banco: Session
+def _calcular_custos_reserva(
+    data_retirada: datetime,
+    data_devolucao: datetime,
+    valor_diaria_veiculo: float,
+    incluir_seguro_pessoal: bool,
+    incluir_seguro_terceiros: bool,
+) -> dict:
+    chave = (
+        valor_diaria_veiculo,
+        _quantidade_diarias(data_retirada, data_devolucao),
+        incluir_seguro_pessoal,
+        incluir_seguro_terceiros,
+    )
+    calculo = cache_cotacoes.obter(chave)
+    if calculo is None:
+        calculo = _cotar(*chave)
+        cache_cotacoes.definir(chave, calculo)
+    return dict(calculo)
+
+
+def _simular(
+    dados_simulacao: reserva_schema.SchemaReservaSimulacao, diarias_por_veiculo: dict
 ) -> reserva_schema.SchemaReservaSimulacaoResultado:
-    veiculo = sessao_banco.get(Veiculo, dados_simulacao.veiculo_id)
-    if not veiculo:
+    valor_diaria = diarias_por_veiculo.get(dados_simulacao.veiculo_id)
+    if valor_diaria is None:
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
 
     calculo = _calcular_custos_reserva(
         data_retirada=dados_simulacao.data_retirada,
         data_devolucao=dados_simulacao.data_devolucao,
-        valor_diaria_veiculo=veiculo.valor_diaria,
+        valor_diaria_veiculo=valor_diaria,
         incluir_seguro_pessoal=dados_simulacao.seguro_pessoal,
         incluir_seguro_terceiros=dados_simulacao.seguro_terceiros,
     )
@@ -66,6 +127,117 @@ def simular_valor_reserva(
     return reserva_schema.SchemaReservaSimulacaoResultado(**calculo)
 
 
+def simular_valor_reserva(
+    dados_simulacao: reserva_schema.SchemaReservaSimulacao, sessao_banco: Session
+) -> reserva_schema.SchemaReservaSimulacaoResultado:
+    diarias = veiculo_service.obter_diarias_veiculos(
+        [dados_simulacao.veiculo_id], sessao_banco
+    )
+    return _simular(dados_simulacao, diarias)
+
+
+async def simular_valor_reserva_async(
+    dados_simulacao: reserva_schema.SchemaReservaSimulacao,
+    sessao_banco: AsyncSession,
+) -> reserva_schema.SchemaReservaSimulacaoResultado:
+    diarias = await veiculo_service.obter_diarias_veiculos_async(
+        [dados_simulacao.veiculo_id], sessao_banco
+    )
+    return _simular(dados_simulacao, diarias)
+
+
+def _cotar_lote(
+    itens: List[reserva_schema.SchemaReservaSimulacao], diarias_por_veiculo: dict
+) -> List[reserva_schema.SchemaReservaSimulacaoLoteResultado]:
+    ausentes = sorted({item.veiculo_id for item in itens} - diarias_por_veiculo.keys())
+    if ausentes:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Veículos não encontrados: {', '.join(map(str, ausentes))}.",
+        )
+
+    return [
+        reserva_schema.SchemaReservaSimulacaoLoteResultado(
+            veiculo_id=item.veiculo_id,
+            **_calcular_custos_reserva(
+                data_retirada=item.data_retirada,
+                data_devolucao=item.data_devolucao,
+                valor_diaria_veiculo=diarias_por_veiculo[item.veiculo_id],
+                incluir_seguro_pessoal=item.seguro_pessoal,
+                incluir_seguro_terceiros=item.seguro_terceiros,
+            ),
+        )
+        for item in itens
+    ]
+
+
+def simular_valores_em_lote(
+    dados_lote: reserva_schema.SchemaReservaSimulacaoLote, sessao_banco: Session
+) -> List[reserva_schema.SchemaReservaSimulacaoLoteResultado]:
+    """
+    Cotações de vários veículos/períodos com no máximo uma consulta de
+    diárias, na mesma ordem dos itens recebidos.
+    """
+    ids_veiculos = {item.veiculo_id for item in dados_lote.itens}
+    diarias = veiculo_service.obter_diarias_veiculos(ids_veiculos, sessao_banco)
+    return _cotar_lote(dados_lote.itens, diarias)
+
+
+async def simular_valores_em_lote_async(
+    dados_lote: reserva_schema.SchemaReservaSimulacaoLote, sessao_banco: AsyncSession
+) -> List[reserva_schema.SchemaReservaSimulacaoLoteResultado]:
+    ids_veiculos = {item.veiculo_id for item in dados_lote.itens}
+    diarias = await veiculo_service.obter_diarias_veiculos_async(
+        ids_veiculos, sessao_banco
+    )
+    return _cotar_lote(dados_lote.itens, diarias)
+
+
+def _veiculo_indisponivel(status_veiculo: StatusVeiculoEnum) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Veículo indisponível (status: {status_veiculo.value}).",
+    )
+
+
+def _alterar_status_reserva_se(
+    sessao_banco: Session,
+    id_reserva: int,
+    status_origem: tuple,
+    status_destino: StatusReservaEnum,
+) -> bool:
+    # Mesmo princípio de _reservar_veiculo_se_disponivel: o status lido antes
+    # pode ter mudado (ex.: a expiração cancelou a reserva pendente), então só
+    # o UPDATE condicional decide.
+    resultado = sessao_banco.execute(
+        update(Reserva)
+        .where(Reserva.id_reserva == id_reserva, Reserva.status.in_(status_origem))
+        .values(status=status_destino)
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount != 0
+
+
+def _reserva_alterada_concorrentemente() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A reserva mudou de status durante a operação (ex.: expirou). "
+        "Consulte-a novamente.",
+    )
+
+
+def _reservar_veiculo_se_disponivel(sessao_banco: Session, id_veiculo: int) -> bool:
+    resultado = sessao_banco.execute(
+        update(Veiculo)
+        .where(
+            Veiculo.id_veiculo == id_veiculo,
+            Veiculo.status == StatusVeiculoEnum.DISPONIVEL,
+        )
+        .values(status=StatusVeiculoEnum.RESERVADO)
+    )
+    return resultado.rowcount != 0
+
+
 def criar_reserva(
     dados_entrada_reserva: reserva_schema.SchemaReservaCriar,
     cliente_logado: Pessoa,
@@ -76,10 +248,7 @@ def criar_reserva(
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
 
     if veiculo_encontrado.status != StatusVeiculoEnum.DISPONIVEL:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Veículo indisponível (status: {veiculo_encontrado.status.value}).",
-        )
+        raise _veiculo_indisponivel(veiculo_encontrado.status)
 
     motorista_id_final = cliente_logado.id_pessoa
 
@@ -125,11 +294,17 @@ def criar_reserva(
         status=StatusReservaEnum.PENDENTE,
     )
 
-    veiculo_encontrado.status = StatusVeiculoEnum.RESERVADO
+    # A leitura do status acima é só um atalho; quem decide é o UPDATE
+    # condicional, atômico no banco. Entre requisições simultâneas pelo mesmo
+    # veículo, apenas uma altera a linha; as demais recebem 409 sem esperar
+    # por trava alguma além da da própria linha.
+    if not _reservar_veiculo_se_disponivel(sessao_banco, veiculo_encontrado.id_veiculo):
+        sessao_banco.rollback()
+        raise _veiculo_indisponivel(StatusVeiculoEnum.RESERVADO)
 
     sessao_banco.add(nova_reserva)
-    sessao_banco.add(veiculo_encontrado)
     sessao_banco.commit()
+    publicar_status_veiculos([nova_reserva.veiculo_id], StatusVeiculoEnum.RESERVADO)
     sessao_banco.refresh(nova_reserva)
 
     return nova_reserva
@@ -146,7 +321,15 @@ def confirmar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
             detail=f"Apenas reservas pendentes podem ser confirmadas. Status atual: {reserva.status.value}",
         )
 
-    reserva.status = StatusReservaEnum.CONFIRMADA
+    if not _alterar_status_reserva_se(
+        sessao_banco,
+        id_reserva,
+        (StatusReservaEnum.PENDENTE,),
+        StatusReservaEnum.CONFIRMADA,
+    ):
+        sessao_banco.rollback()
+        raise _reserva_alterada_concorrentemente()
+
     sessao_banco.commit()
     sessao_banco.refresh(reserva)
     return reserva
@@ -172,26 +355,17 @@ def registrar_retirada(id_reserva: int, sessao_banco: Session) -> Reserva:
         sessao_banco.add(reserva.veiculo)
 
     sessao_banco.commit()
+    if reserva.veiculo:
+        publicar_status_veiculos([reserva.veiculo_id], StatusVeiculoEnum.ALUGADO)
     sessao_banco.refresh(reserva)
     return reserva
 
 
-def finalizar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
-    reserva = (
-        sessao_banco.query(Reserva).options(joinedload(Reserva.veiculo)).get(id_reserva)
-    )
-
-    if not reserva:
-        raise HTTPException(status_code=404, detail="Reserva não encontrada.")
-
-    if reserva.status != StatusReservaEnum.EM_ANDAMENTO:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Apenas reservas em andamento podem ser finalizadas. Status atual: {reserva.status.value}",
-        )
-
-    data_hoje = datetime.now()
-
+def _calcular_total_final(reserva, data_hoje: datetime) -> float:
+    """
+    Valor final da locação: diárias e seguros pelos dias efetivamente usados,
+    mais multa de meia diária por dia de atraso na devolução.
+    """
     dias_reais = math.ceil((data_hoje - reserva.data_retirada).total_seconds() / 86400)
     dias_reais = max(dias_reais, 1)
 
@@ -212,7 +386,24 @@ def finalizar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
             multa = dias_atraso * (reserva.valor_diaria_no_momento * 0.5)
             total_final += multa
 
-    reserva.valor_total_estimado = total_final
+    return total_final
+
+
+def finalizar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
+    reserva = (
+        sessao_banco.query(Reserva).options(joinedload(Reserva.veiculo)).get(id_reserva)
+    )
+
+    if not reserva:
+        raise HTTPException(status_code=404, detail="Reserva não encontrada.")
+
+    if reserva.status != StatusReservaEnum.EM_ANDAMENTO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Apenas reservas em andamento podem ser finalizadas. Status atual: {reserva.status.value}",
+        )
+
+    reserva.valor_total_estimado = _calcular_total_final(reserva, datetime.now())
     reserva.status = StatusReservaEnum.FINALIZADA
 
     if reserva.veiculo:
@@ -221,18 +412,287 @@ def finalizar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
 
     sessao_banco.add(reserva)
     sessao_banco.commit()
+    if reserva.veiculo:
+        publicar_status_veiculos([reserva.veiculo_id], StatusVeiculoEnum.DISPONIVEL)
     sessao_banco.refresh(reserva)
 
     return reserva
 
 
-def listar_reservas(
-    sessao_banco: Session, filtro_status: Optional[str] = None
-) -> List[Reserva]:
-    query = sessao_banco.query(Reserva)
+def _consulta_reservas_para_transicao(ids_reservas: List[int]) -> Select:
+    # Só as colunas usadas na transição e no cálculo do valor final. FOR UPDATE
+    # trava as linhas até o commit (ignorado pelo SQLite, que serializa escritas).
+    return (
+        select(
+            Reserva.id_reserva,
+            Reserva.status,
+            Reserva.veiculo_id,
+            Reserva.data_retirada,
+            Reserva.data_devolucao,
+            Reserva.valor_diaria_no_momento,
+            Reserva.seguro_pessoal,
+            Reserva.seguro_terceiros,
+        )
+        .where(Reserva.id_reserva.in_(ids_reservas))
+        .with_for_update()
+    )
+
+
+class TransicaoReserva(NamedTuple):
+    status_origem: StatusReservaEnum
+    status_destino: StatusReservaEnum
+    mensagem_status_invalido: str
+    # Novo status do veículo, quando a transição o altera.
+    status_veiculo: Optional[StatusVeiculoEnum] = None
+    recalcular_total: bool = False
+
+
+# Transições de reserva feitas pela equipe, por ação.
+TRANSICAO_CONFIRMAR = TransicaoReserva(
+    status_origem=StatusReservaEnum.PENDENTE,
+    status_destino=StatusReservaEnum.CONFIRMADA,
+    mensagem_status_invalido="Apenas reservas pendentes podem ser confirmadas.",
+)
+TRANSICAO_RETIRAR = TransicaoReserva(
+    status_origem=StatusReservaEnum.CONFIRMADA,
+    status_destino=StatusReservaEnum.EM_ANDAMENTO,
+    mensagem_status_invalido="Apenas reservas confirmadas podem ter retirada registrada.",
+    status_veiculo=StatusVeiculoEnum.ALUGADO,
+)
+TRANSICAO_FINALIZAR = TransicaoReserva(
+    status_origem=StatusReservaEnum.EM_ANDAMENTO,
+    status_destino=StatusReservaEnum.FINALIZADA,
+    mensagem_status_invalido="Apenas reservas em andamento podem ser finalizadas.",
+    status_veiculo=StatusVeiculoEnum.DISPONIVEL,
+    recalcular_total=True,
+)
+
+
+def _transicionar_reservas_em_lote(
+    ids_reservas: List[int], sessao_banco: Session, transicao: TransicaoReserva
+) -> List[reserva_schema.SchemaReservaTransicaoResultado]:
+    """
+    Aplica a mesma transição a várias reservas numa única transação: uma
+    leitura das linhas, um UPDATE das reservas e, se for o caso, um UPDATE dos
+    veículos. IDs inexistentes ou em outro status não impedem os demais; o
+    resultado de cada um vem na ordem recebida.
+    """
+    ids_unicos = list(dict.fromkeys(ids_reservas))
+    linhas = {
+        linha.id_reserva: linha
+        for linha in sessao_banco.execute(
+            _consulta_reservas_para_transicao(ids_unicos)
+        ).all()
+    }
+
+    resultados = {}
+    elegiveis = []
+    for id_reserva in ids_unicos:
+        linha = linhas.get(id_reserva)
+        if linha is None:
+            erro = "Reserva não encontrada."
+        elif linha.status != transicao.status_origem:
+            erro = (
+                f"{transicao.mensagem_status_invalido} "
+                f"Status atual: {linha.status.value}"
+            )
+        else:
+            elegiveis.append(linha)
+            continue
+        resultados[id_reserva] = reserva_schema.SchemaReservaTransicaoResultado(
+            id_reserva=id_reserva,
+            sucesso=False,
+            status=linha.status if linha is not None else None,
+            erro=erro,
+        )
+
+    if elegiveis:
+        if transicao.recalcular_total:
+            # Valor final difere por reserva: UPDATE em lote por chave primária
+            # (um executemany), ainda dentro da mesma transação.
+            data_hoje = datetime.now()
+            sessao_banco.execute(
+                update(Reserva),
+                [
+                    {
+                        "id_reserva": linha.id_reserva,
+                        "status": transicao.status_destino,
+                        "valor_total_estimado": _calcular_total_final(linha, data_hoje),
+                    }
+                    for linha in elegiveis
+                ],
+            )
+        else:
+            sessao_banco.execute(
+                update(Reserva)
+                .where(
+                    Reserva.id_reserva.in_([linha.id_reserva for linha in elegiveis]),
+                    Reserva.status == transicao.status_origem,
+                )
+                .values(status=transicao.status_destino)
+                .execution_options(synchronize_session=False)
+            )
+
+        if transicao.status_veiculo is not None:
+            sessao_banco.execute(
+                update(Veiculo)
+                .where(
+                    Veiculo.id_veiculo.in_({linha.veiculo_id for linha in elegiveis})
+                )
+                .values(status=transicao.status_veiculo)
+                .execution_options(synchronize_session=False)
+            )
+
+        for linha in elegiveis:
+            resultados[linha.id_reserva] = (
+                reserva_schema.SchemaReservaTransicaoResultado(
+                    id_reserva=linha.id_reserva,
+                    sucesso=True,
+                    status=transicao.status_destino,
+                )
+            )
+
+    sessao_banco.commit()
+    if elegiveis and transicao.status_veiculo is not None:
+        publicar_status_veiculos(
+            {linha.veiculo_id for linha in elegiveis}, transicao.status_veiculo
+        )
+    return [resultados[id_reserva] for id_reserva in ids_unicos]
+
+
+def confirmar_reservas_em_lote(
+    ids_reservas: List[int], sessao_banco: Session
+) -> List[reserva_schema.SchemaReservaTransicaoResultado]:
+    return _transicionar_reservas_em_lote(
+        ids_reservas, sessao_banco, TRANSICAO_CONFIRMAR
+    )
+
+
+def registrar_retiradas_em_lote(
+    ids_reservas: List[int], sessao_banco: Session
+) -> List[reserva_schema.SchemaReservaTransicaoResultado]:
+    return _transicionar_reservas_em_lote(ids_reservas, sessao_banco, TRANSICAO_RETIRAR)
+
+
+def finalizar_reservas_em_lote(
+    ids_reservas: List[int], sessao_banco: Session
+) -> List[reserva_schema.SchemaReservaTransicaoResultado]:
+    return _transicionar_reservas_em_lote(
+        ids_reservas, sessao_banco, TRANSICAO_FINALIZAR
+    )
+
+
+def expirar_reservas_pendentes(
+    sessao_banco: Session, criadas_antes_de: datetime, tamanho_lote: int
+) -> int:
+    """
+    Cancela reservas PENDENTE criadas antes do limite e devolve seus veículos
+    ao estoque, um lote por transação (duas instruções por lote). Linhas
+    travadas por outra transação são puladas e ficam para a próxima rodada.
+    Confirmação e cancelamento avulsos também só alteram reservas ainda
+    PENDENTE (UPDATE condicional): quem chegar depois da expiração recebe 409.
+    Retorna quantas reservas expiraram.
+    """
+    total_expiradas = 0
+    while True:
+        linhas = sessao_banco.execute(
+            select(Reserva.id_reserva, Reserva.veiculo_id)
+            .where(
+                Reserva.status == StatusReservaEnum.PENDENTE,
+                Reserva.data_criacao < criadas_antes_de,
+            )
+            .order_by(Reserva.data_criacao, Reserva.id_reserva)
+            .limit(tamanho_lote)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not linhas:
+            break
+
+        # Só libera veículos das reservas que este UPDATE de fato cancelou.
+        ids_veiculos_expirados = sessao_banco.scalars(
+            update(Reserva)
+            .where(
+                Reserva.id_reserva.in_([linha.id_reserva for linha in linhas]),
+                Reserva.status == StatusReservaEnum.PENDENTE,
+            )
+            .values(status=StatusReservaEnum.CANCELADA)
+            .returning(Reserva.veiculo_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        ids_liberados = sessao_banco.scalars(
+            update(Veiculo)
+            .where(
+                Veiculo.id_veiculo.in_(set(ids_veiculos_expirados)),
+                Veiculo.status == StatusVeiculoEnum.RESERVADO,
+            )
+            .values(status=StatusVeiculoEnum.DISPONIVEL)
+            .returning(Veiculo.id_veiculo)
+            .execution_options(synchronize_session=False)
+        ).all()
+        sessao_banco.commit()
+        publicar_status_veiculos(ids_liberados, StatusVeiculoEnum.DISPONIVEL)
+
+        total_expiradas += len(linhas)
+        if len(linhas) < tamanho_lote:
+            break
+    return total_expiradas
+
+
+def _chave_cursor_reserva(reserva: Reserva) -> tuple:
+    return (reserva.data_retirada, reserva.id_reserva)
+
+
+def _consulta_listar_reservas(
+    filtro_status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Select:
+    consulta = select(Reserva).options(*_opcoes_carregamento_reserva())
     if filtro_status:
-        query = query.filter(Reserva.status == filtro_status)
-    return query.order_by(Reserva.data_retirada).all()
+        consulta = consulta.where(Reserva.status == filtro_status)
+    if cursor:
+        data_retirada, id_reserva = decodificar_cursor(
+            cursor, (datetime.fromisoformat, int)
+        )
+        consulta = consulta.where(
+            filtro_apos_cursor(
+                (Reserva.data_retirada, Reserva.id_reserva), (data_retirada, id_reserva)
+            )
+        )
+    return consulta.order_by(Reserva.data_retirada, Reserva.id_reserva).limit(
+        limite + 1
+    )
+
+
+def _consulta_reservas_por_cliente(id_cliente: int) -> Select:
+    return (
+        select(Reserva)
+        .options(*_opcoes_carregamento_reserva())
+        .where(Reserva.cliente_id == id_cliente)
+        .order_by(Reserva.data_retirada.desc())
+    )
+
+
+def listar_reservas(
+    sessao_banco: Session,
+    filtro_status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    consulta = _consulta_listar_reservas(filtro_status, cursor, limite)
+    linhas = sessao_banco.scalars(consulta).all()
+    return montar_pagina(linhas, limite, _chave_cursor_reserva)
+
+
+async def listar_reservas_async(
+    sessao_banco: AsyncSession,
+    filtro_status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    consulta = _consulta_listar_reservas(filtro_status, cursor, limite)
+    resultado = await sessao_banco.scalars(consulta)
+    return montar_pagina(resultado.all(), limite, _chave_cursor_reserva)
 
 
 def buscar_reserva_por_id(id_reserva: int, sessao_banco: Session) -> Reserva:
@@ -242,6 +702,17 @@ def buscar_reserva_por_id(id_reserva: int, sessao_banco: Session) -> Reserva:
     return reserva
 
 
+async def buscar_reserva_por_id_async(
+    id_reserva: int, sessao_banco: AsyncSession
+) -> Reserva:
+    reserva = await sessao_banco.get(
+        Reserva, id_reserva, options=_opcoes_carregamento_reserva()
+    )
+    if not reserva:
+        raise HTTPException(404, "Não encontrada")
+    return reserva
+
+
 def buscar_reserva_por_id_e_cliente(
     id_reserva: int, id_cliente: int, sessao_banco: Session
 ) -> Reserva:
@@ -251,15 +722,29 @@ def buscar_reserva_por_id_e_cliente(
     return reserva
 
 
+async def buscar_reserva_por_id_e_cliente_async(
+    id_reserva: int, id_cliente: int, sessao_banco: AsyncSession
+) -> Reserva:
+    reserva = await buscar_reserva_por_id_async(id_reserva, sessao_banco)
+    if reserva.cliente_id != id_cliente:
+        raise HTTPException(403, "Sem permissão")
+    return reserva
+
+
 def listar_reservas_por_cliente(
     cliente_logado: Pessoa, sessao_banco: Session
 ) -> List[Reserva]:
-    return (
-        sessao_banco.query(Reserva)
-        .filter(Reserva.cliente_id == cliente_logado.id_pessoa)
-        .order_by(Reserva.data_retirada.desc())
-        .all()
-    )
+    return sessao_banco.scalars(
+        _consulta_reservas_por_cliente(cliente_logado.id_pessoa)
+    ).all()
+
+
+async def listar_reservas_por_cliente_async(
+    cliente_logado: Pessoa, sessao_banco: AsyncSession
+) -> List[Reserva]:
+    consulta = _consulta_reservas_por_cliente(cliente_logado.id_pessoa)
+    resultado = await sessao_banco.scalars(consulta)
+    return resultado.all()
 
 
 def cancelar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
@@ -272,13 +757,27 @@ def cancelar_reserva(id_reserva: int, sessao_banco: Session) -> Reserva:
     if reserva.status not in [StatusReservaEnum.PENDENTE, StatusReservaEnum.CONFIRMADA]:
         raise HTTPException(400, "Não pode cancelar agora.")
 
-    reserva.status = StatusReservaEnum.CANCELADA
-    if reserva.veiculo:
-        reserva.veiculo.status = StatusVeiculoEnum.DISPONIVEL
-        sessao_banco.add(reserva.veiculo)
-
-    sessao_banco.add(reserva)
+    if not _alterar_status_reserva_se(
+        sessao_banco,
+        id_reserva,
+        (StatusReservaEnum.PENDENTE, StatusReservaEnum.CONFIRMADA),
+        StatusReservaEnum.CANCELADA,
+    ):
+        sessao_banco.rollback()
+        raise _reserva_alterada_concorrentemente()
+
+    ids_liberados = sessao_banco.scalars(
+        update(Veiculo)
+        .where(
+            Veiculo.id_veiculo == reserva.veiculo_id,
+            Veiculo.status == StatusVeiculoEnum.RESERVADO,
+        )
+        .values(status=StatusVeiculoEnum.DISPONIVEL)
+        .returning(Veiculo.id_veiculo)
+        .execution_options(synchronize_session=False)
+    ).all()
     sessao_banco.commit()
+    publicar_status_veiculos(ids_liberados, StatusVeiculoEnum.DISPONIVEL)
     return reserva
 
 
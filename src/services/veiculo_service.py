@@ -1,18 +1,48 @@
-from typing import List, Optional
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_
+from sqlalchemy import Integer, Select, case, cast, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..models.enums import StatusVeiculoEnum, TipoVeiculoEnum
+from ..cache import CacheLRU
+from ..eventos import publicar_status_veiculos
+from ..models.enums import (
+    DirecaoOrdenacaoEnum,
+    OrdenacaoVeiculoEnum,
+    StatusVeiculoEnum,
+    TipoVeiculoEnum,
+)
+from ..models.reserva import STATUS_RESERVA_OCUPAM_VEICULO, Reserva
 from ..models.veiculo import (
     Motocicleta,
+    ProximaVersao,
+    RemocaoVeiculo,
     Utilitario,
     Veiculo,
+    texto_busca_veiculo,
+)
+from ..paginacao import (
+    TAMANHO_PAGINA_PADRAO,
+    Pagina,
+    decodificar_cursor,
+    filtro_apos_cursor,
+    montar_pagina,
 )
 from ..schemas import veiculo_schema
 
+_CONVERSORES_ORDENACAO = {
+    OrdenacaoVeiculoEnum.ID: int,
+    OrdenacaoVeiculoEnum.VALOR_DIARIA: float,
+    OrdenacaoVeiculoEnum.ANO_MODELO: int,
+    OrdenacaoVeiculoEnum.MARCA: str,
+    OrdenacaoVeiculoEnum.RELEVANCIA: int,
+}
+
 
 def criar_veiculo_passeio(
     dados_entrada_veiculo: veiculo_schema.SchemaPasseioCriar, sessao_banco: Session
@@ -172,27 +202,311 @@ def criar_veiculo_motocicleta(
     return novo_veiculo_moto_modelo
 
 
+# Relevância em inteiro (similaridade x 100000): o cursor guarda o mesmo valor
+# que o banco compara, sem a perda de precisão do real do Postgres em float.
+ESCALA_RELEVANCIA = 100_000
+
+
+def _escapar_like(termo: str) -> str:
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filtro_busca(termo_busca: str, dialeto: str):
+    termo = termo_busca.lower()
+    filtro = texto_busca_veiculo.like(f"%{_escapar_like(termo)}%", escape="\\")
+    if dialeto == "postgresql":
+        # Operador de similaridade do pg_trgm: tolera erros de digitação.
+        filtro = or_(filtro, texto_busca_veiculo.op("%")(termo))
+    return filtro
+
+
+def _expressao_relevancia(termo_busca: str, dialeto: str):
+    termo = termo_busca.lower()
+    if dialeto == "postgresql":
+        return cast(
+            func.round(func.similarity(texto_busca_veiculo, termo) * ESCALA_RELEVANCIA),
+            Integer,
+        )
+    # Fallback sem pg_trgm (SQLite nos testes): início do texto ou de uma
+    # palavra vale mais que uma ocorrência no meio.
+    padrao = _escapar_like(termo)
+    return case(
+        (texto_busca_veiculo.like(f"{padrao}%", escape="\\"), ESCALA_RELEVANCIA),
+        (
+            texto_busca_veiculo.like(f"% {padrao}%", escape="\\"),
+            ESCALA_RELEVANCIA * 3 // 4,
+        ),
+        else_=ESCALA_RELEVANCIA // 2,
+    )
+
+
+class FiltroCatalogo(NamedTuple):
+    """Filtros e ordenação da listagem do catálogo (a paginação vem à parte)."""
+
+    categoria: Optional[TipoVeiculoEnum] = None
+    apenas_disponiveis: bool = False
+    termo_busca: Optional[str] = None
+    ordenar_por: Optional[OrdenacaoVeiculoEnum] = None
+    direcao: Optional[DirecaoOrdenacaoEnum] = None
+
+
+def _resolver_ordenacao(filtro: FiltroCatalogo) -> FiltroCatalogo:
+    ordenar_por, direcao = filtro.ordenar_por, filtro.direcao
+    if ordenar_por is None:
+        ordenar_por = (
+            OrdenacaoVeiculoEnum.RELEVANCIA
+            if filtro.termo_busca
+            else OrdenacaoVeiculoEnum.ID
+        )
+    if ordenar_por == OrdenacaoVeiculoEnum.RELEVANCIA and not filtro.termo_busca:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A ordenação por relevância exige um termo de busca.",
+        )
+    if direcao is None:
+        direcao = (
+            DirecaoOrdenacaoEnum.DESC
+            if ordenar_por == OrdenacaoVeiculoEnum.RELEVANCIA
+            else DirecaoOrdenacaoEnum.ASC
+        )
+    return filtro._replace(ordenar_por=ordenar_por, direcao=direcao)
+
+
+def _consulta_listar_veiculos(
+    dialeto: str,
+    filtro: FiltroCatalogo,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Select:
+    """
+    Seleciona (veículo, valor da chave de ordenação). O valor vem do banco
+    para que o cursor reproduza exatamente a ordenação, inclusive a relevância.
+    `filtro` já passou por _resolver_ordenacao.
+    """
+    if filtro.ordenar_por == OrdenacaoVeiculoEnum.RELEVANCIA:
+        expressao_ordem = _expressao_relevancia(filtro.termo_busca, dialeto)
+    else:
+        expressao_ordem = getattr(Veiculo, filtro.ordenar_por.value)
+
+    consulta = select(Veiculo, expressao_ordem.label("chave_ordem"))
+
+    if filtro.apenas_disponiveis:
+        consulta = consulta.where(Veiculo.status == StatusVeiculoEnum.DISPONIVEL)
+
+    if filtro.categoria:
+        consulta = consulta.where(Veiculo.tipo_veiculo == filtro.categoria)
+
+    if filtro.termo_busca:
+        consulta = consulta.where(_filtro_busca(filtro.termo_busca, dialeto))
+
+    descendente = filtro.direcao == DirecaoOrdenacaoEnum.DESC
+    colunas_chave = (
+        (Veiculo.id_veiculo,)
+        if filtro.ordenar_por == OrdenacaoVeiculoEnum.ID
+        else (expressao_ordem, Veiculo.id_veiculo)
+    )
+
+    if cursor:
+        campo, direcao_cursor, valor, id_veiculo = decodificar_cursor(
+            cursor, (str, str, _CONVERSORES_ORDENACAO[filtro.ordenar_por], int)
+        )
+        if campo != filtro.ordenar_por.value or direcao_cursor != filtro.direcao.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O cursor pertence a outra ordenação do catálogo.",
+            )
+        valores_chave = (
+            (id_veiculo,) if len(colunas_chave) == 1 else (valor, id_veiculo)
+        )
+        consulta = consulta.where(
+            filtro_apos_cursor(colunas_chave, valores_chave, descendente=descendente)
+        )
+
+    return consulta.order_by(
+        *(coluna.desc() if descendente else coluna for coluna in colunas_chave)
+    ).limit(limite + 1)
+
+
+def _montar_pagina_veiculos(
+    linhas: list,
+    limite: int,
+    ordenar_por: OrdenacaoVeiculoEnum,
+    direcao: DirecaoOrdenacaoEnum,
+) -> Pagina:
+    pagina = montar_pagina(
+        linhas,
+        limite,
+        lambda linha: (ordenar_por, direcao, linha[1], linha[0].id_veiculo),
+    )
+    return Pagina(
+        itens=[linha[0] for linha in pagina.itens],
+        proximo_cursor=pagina.proximo_cursor,
+    )
+
+
 def listar_veiculos(
     sessao_banco: Session,
-    categoria: Optional[TipoVeiculoEnum] = None,
-    apenas_disponiveis: bool = False,
-    termo_busca: Optional[str] = None,
-) -> List[Veiculo]:
-    query = sessao_banco.query(Veiculo)
-
-    if apenas_disponiveis:
-        query = query.filter(Veiculo.status == StatusVeiculoEnum.DISPONIVEL)
-
-    if categoria:
-        query = query.filter(Veiculo.tipo_veiculo == categoria)
-
-    if termo_busca:
-        termo_limpo = f"%{termo_busca}%"
-        query = query.filter(
-            or_(Veiculo.modelo.ilike(termo_limpo), Veiculo.marca.ilike(termo_limpo))
+    filtro: FiltroCatalogo = FiltroCatalogo(),
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    filtro = _resolver_ordenacao(filtro)
+    consulta = _consulta_listar_veiculos(
+        sessao_banco.get_bind().dialect.name, filtro, cursor, limite
+    )
+    linhas = sessao_banco.execute(consulta).all()
+    return _montar_pagina_veiculos(linhas, limite, filtro.ordenar_por, filtro.direcao)
+
+
+async def listar_veiculos_async(
+    sessao_banco: AsyncSession,
+    filtro: FiltroCatalogo = FiltroCatalogo(),
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    filtro = _resolver_ordenacao(filtro)
+    consulta = _consulta_listar_veiculos(
+        sessao_banco.get_bind().dialect.name, filtro, cursor, limite
+    )
+    resultado = await sessao_banco.execute(consulta)
+    return _montar_pagina_veiculos(
+        resultado.all(), limite, filtro.ordenar_por, filtro.direcao
+    )
+
+
+class FiltroDisponibilidade(NamedTuple):
+    data_retirada: datetime
+    data_devolucao: datetime
+    categoria: Optional[TipoVeiculoEnum] = None
+
+
+def _consulta_veiculos_disponiveis_no_periodo(
+    filtro: FiltroDisponibilidade,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Select:
+    """
+    Veículos que criar_reserva aceitaria para o período: status DISPONIVEL
+    (a reserva exige isso, então RESERVADO/ALUGADO ficam de fora mesmo em
+    datas livres, inclusive um aluguel atrasado) e sem reserva ativa que se
+    sobreponha ao período. O NOT EXISTS é resolvido por veículo no índice
+    ix_reservas_veiculo_periodo_ativas.
+    """
+    if filtro.data_devolucao <= filtro.data_retirada:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A data de devolução deve ser posterior à data de retirada.",
         )
 
-    return query.all()
+    reserva_sobreposta = exists().where(
+        Reserva.veiculo_id == Veiculo.id_veiculo,
+        Reserva.status.in_(STATUS_RESERVA_OCUPAM_VEICULO),
+        Reserva.data_retirada < filtro.data_devolucao,
+        Reserva.data_devolucao > filtro.data_retirada,
+    )
+
+    consulta = select(Veiculo).where(
+        Veiculo.status == StatusVeiculoEnum.DISPONIVEL, ~reserva_sobreposta
+    )
+
+    if filtro.categoria:
+        consulta = consulta.where(Veiculo.tipo_veiculo == filtro.categoria)
+
+    if cursor:
+        (id_veiculo,) = decodificar_cursor(cursor, (int,))
+        consulta = consulta.where(Veiculo.id_veiculo > id_veiculo)
+
+    return consulta.order_by(Veiculo.id_veiculo).limit(limite + 1)
+
+
+def _chave_cursor_disponibilidade(veiculo: Veiculo) -> tuple:
+    return (veiculo.id_veiculo,)
+
+
+def listar_veiculos_disponiveis_no_periodo(
+    sessao_banco: Session,
+    filtro: FiltroDisponibilidade,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    consulta = _consulta_veiculos_disponiveis_no_periodo(filtro, cursor, limite)
+    linhas = sessao_banco.scalars(consulta).all()
+    return montar_pagina(linhas, limite, _chave_cursor_disponibilidade)
+
+
+async def listar_veiculos_disponiveis_no_periodo_async(
+    sessao_banco: AsyncSession,
+    filtro: FiltroDisponibilidade,
+    cursor: Optional[str] = None,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+) -> Pagina:
+    consulta = _consulta_veiculos_disponiveis_no_periodo(filtro, cursor, limite)
+    resultado = await sessao_banco.scalars(consulta)
+    return montar_pagina(resultado.all(), limite, _chave_cursor_disponibilidade)
+
+
+# veiculo_id -> valor_diaria, usado só pelas simulações de reserva. Alterar o
+# preço limpa a entrada neste processo; nos demais a simulação pode usar a
+# diária antiga por até DIARIAS_CACHE_TTL_SEGUNDOS. O cache de cotações não
+# piora isso (a diária é parte da chave) e a reserva em si lê o preço do banco.
+DIARIAS_CACHE_TTL_SEGUNDOS = float(os.getenv("DIARIAS_CACHE_TTL_SEGUNDOS", "60"))
+DIARIAS_CACHE_TAMANHO = int(os.getenv("DIARIAS_CACHE_TAMANHO", "4096"))
+cache_diarias = CacheLRU(DIARIAS_CACHE_TAMANHO)
+
+
+def invalidar_diaria_veiculo(id_veiculo: int) -> None:
+    cache_diarias.invalidar(id_veiculo)
+
+
+def _consulta_diarias_veiculos(ids_veiculos: Iterable[int]) -> Select:
+    # Só as colunas necessárias: sem montar entidades polimórficas.
+    return select(Veiculo.id_veiculo, Veiculo.valor_diaria).where(
+        Veiculo.id_veiculo.in_(ids_veiculos)
+    )
+
+
+def _separar_diarias_em_cache(ids_veiculos: Iterable[int]) -> tuple:
+    encontradas, ausentes = {}, set()
+    for id_veiculo in ids_veiculos:
+        valor_diaria = cache_diarias.obter(id_veiculo)
+        if valor_diaria is None:
+            ausentes.add(id_veiculo)
+        else:
+            encontradas[id_veiculo] = valor_diaria
+    return encontradas, ausentes
+
+
+def _guardar_diarias(linhas) -> dict:
+    expira_em = time.time() + DIARIAS_CACHE_TTL_SEGUNDOS
+    carregadas = {}
+    for id_veiculo, valor_diaria in linhas:
+        cache_diarias.definir(id_veiculo, valor_diaria, expira_em=expira_em)
+        carregadas[id_veiculo] = valor_diaria
+    return carregadas
+
+
+def obter_diarias_veiculos(
+    ids_veiculos: Iterable[int], sessao_banco: Session
+) -> Dict[int, float]:
+    """
+    Valor da diária de cada veículo informado, pelo cache; os ausentes vêm de
+    uma única consulta. Veículos inexistentes simplesmente não aparecem.
+    """
+    diarias, ausentes = _separar_diarias_em_cache(ids_veiculos)
+    if ausentes:
+        linhas = sessao_banco.execute(_consulta_diarias_veiculos(ausentes)).all()
+        diarias.update(_guardar_diarias(linhas))
+    return diarias
+
+
+async def obter_diarias_veiculos_async(
+    ids_veiculos: Iterable[int], sessao_banco: AsyncSession
+) -> Dict[int, float]:
+    diarias, ausentes = _separar_diarias_em_cache(ids_veiculos)
+    if ausentes:
+        resultado = await sessao_banco.execute(_consulta_diarias_veiculos(ausentes))
+        diarias.update(_guardar_diarias(resultado.all()))
+    return diarias
 
 
 def buscar_veiculo_por_id(id_veiculo: int, sessao_banco: Session) -> Veiculo:
@@ -205,6 +519,27 @@ def buscar_veiculo_por_id(id_veiculo: int, sessao_banco: Session) -> Veiculo:
     return veiculo_encontrado
 
 
+async def buscar_veiculo_por_id_async(
+    id_veiculo: int, sessao_banco: AsyncSession
+) -> Veiculo:
+    veiculo_encontrado = await sessao_banco.get(Veiculo, id_veiculo)
+    if not veiculo_encontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Veículo com ID {id_veiculo} não encontrado.",
+        )
+    return veiculo_encontrado
+
+
+async def obter_versao_veiculo_async(
+    id_veiculo: int, sessao_banco: AsyncSession
+) -> Optional[int]:
+    """Só a versão do veículo (para If-None-Match), sem carregar a entidade."""
+    return await sessao_banco.scalar(
+        select(Veiculo.versao).where(Veiculo.id_veiculo == id_veiculo)
+    )
+
+
 def deletar_veiculo(id_veiculo: int, sessao_banco: Session) -> None:
     veiculo_para_deletar = buscar_veiculo_por_id(id_veiculo, sessao_banco)
 
@@ -221,7 +556,9 @@ def deletar_veiculo(id_veiculo: int, sessao_banco: Session) -> None:
             f" pois seu status é '{veiculo_para_deletar.status.value}'.",
         )
     sessao_banco.delete(veiculo_para_deletar)
+    sessao_banco.add(RemocaoVeiculo(id_veiculo=id_veiculo))
     sessao_banco.commit()
+    invalidar_diaria_veiculo(id_veiculo)
 
 
 def atualizar_veiculo_passeio(
@@ -248,9 +585,13 @@ def atualizar_veiculo_passeio(
 
     for key, value in update_data.items():
         setattr(veiculo_para_atualizar, key, value)
+    veiculo_para_atualizar.versao = ProximaVersao()
 
     sessao_banco.add(veiculo_para_atualizar)
     sessao_banco.commit()
+    invalidar_diaria_veiculo(id_veiculo)
+    if update_data.get("status") is not None:
+        publicar_status_veiculos([id_veiculo], update_data["status"])
     sessao_banco.refresh(veiculo_para_atualizar)
 
     return veiculo_para_atualizar
@@ -276,9 +617,13 @@ def atualizar_veiculo_utilitario(
 
     for key, value in update_data.items():
         setattr(veiculo_para_atualizar, key, value)
+    veiculo_para_atualizar.versao = ProximaVersao()
 
     sessao_banco.add(veiculo_para_atualizar)
     sessao_banco.commit()
+    invalidar_diaria_veiculo(id_veiculo)
+    if update_data.get("status") is not None:
+        publicar_status_veiculos([id_veiculo], update_data["status"])
     sessao_banco.refresh(veiculo_para_atualizar)
 
     return veiculo_para_atualizar
@@ -304,9 +649,13 @@ def atualizar_veiculo_motocicleta(
 
     for key, value in update_data.items():
         setattr(veiculo_para_atualizar, key, value)
+    veiculo_para_atualizar.versao = ProximaVersao()
 
     sessao_banco.add(veiculo_para_atualizar)
     sessao_banco.commit()
+    invalidar_diaria_veiculo(id_veiculo)
+    if update_data.get("status") is not None:
+        publicar_status_veiculos([id_veiculo], update_data["status"])
     sessao_banco.refresh(veiculo_para_atualizar)
 
     return veiculo_para_atualizar
@@ -4,18 +4,24 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from src import models
+from src import catalogo, models
 from src import seguranca as seguranca_service
 from src.database import Base, SessionLocal
 from src.database import engine as engine_real
 from src.main import app
 from src.models import funcionario
 from src.schemas import auth_schema, cliente_schema
-from src.services import cliente_service
+from src.services import cliente_service, veiculo_service
 
 
 @pytest.fixture(scope="function")
 def db_session():
+    # Os IDs recomeçam a cada teste; principais de um teste não podem vazar
+    # para o próximo pelo cache.
+    seguranca_service.cache_principais.limpar()
+    seguranca_service.tabela_versoes_token.invalidar()
+    veiculo_service.cache_diarias.limpar()
+    catalogo.invalidar_respostas_catalogo()
     Base.metadata.drop_all(bind=engine_real)
     Base.metadata.create_all(bind=engine_real)
     db = SessionLocal()
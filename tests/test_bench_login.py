@@ -0,0 +1,69 @@
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+import pytest
+from sqlalchemy.orm import Session
+
+# Benchmark: vazão e latência de login (/clientes/token) sob logins
+# concorrentes, com os parâmetros do argon2 e do pool de processos atuais.
+# Serve para ajustar ARGON2_TIME_COST / ARGON2_MEMORY_COST_KIB /
+# ARGON2_PROCESSOS contra um orçamento de latência.
+# Rodar com: pytest -m benchmark -s tests/test_bench_login.py
+# Opcional: LOGIN_ORCAMENTO_P95_MS=250 faz o teste falhar acima do orçamento.
+from src import seguranca as seguranca_service
+from src.database import async_engine
+from src.main import app
+
+LOGINS_CONCORRENTES = 32
+SENHA = "senhaCliente123"
+
+
+async def _login(cliente_http: httpx.AsyncClient) -> tuple:
+    inicio = time.perf_counter()
+    resposta = await cliente_http.post(
+        "/clientes/token",
+        data={"username": "cliente_test@email.com", "password": SENHA},
+    )
+    return resposta.status_code, time.perf_counter() - inicio
+
+
+async def _rodar_logins() -> list:
+    transporte = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transporte, base_url="http://bench"
+        ) as cliente_http:
+            return await asyncio.gather(
+                *(_login(cliente_http) for _ in range(LOGINS_CONCORRENTES))
+            )
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.mark.benchmark
+def test_bench_vazao_de_login(db_session: Session, client_auth_data: dict):
+    inicio = time.perf_counter()
+    resultados = asyncio.run(_rodar_logins())
+    tempo_total = time.perf_counter() - inicio
+
+    latencias_ms = sorted(duracao * 1000 for _, duracao in resultados)
+    p95_ms = latencias_ms[int(len(latencias_ms) * 0.95) - 1]
+    argon2 = seguranca_service.pwd_context.handler("argon2")
+
+    print(
+        f"\n{LOGINS_CONCORRENTES} logins concorrentes"
+        f" (argon2 t={argon2.default_rounds}, m={argon2.memory_cost} KiB,"
+        f" p={argon2.parallelism}; {seguranca_service.ARGON2_PROCESSOS} processos):"
+        f"\n  vazão: {LOGINS_CONCORRENTES / tempo_total:.1f} logins/s"
+        f"\n  latência p50: {statistics.median(latencias_ms):.1f} ms"
+        f" | p95: {p95_ms:.1f} ms | máx: {latencias_ms[-1]:.1f} ms"
+    )
+
+    assert [codigo for codigo, _ in resultados] == [200] * LOGINS_CONCORRENTES
+
+    orcamento_p95_ms = os.getenv("LOGIN_ORCAMENTO_P95_MS")
+    if orcamento_p95_ms:
+        assert p95_ms <= float(orcamento_p95_ms)
@@ -0,0 +1,86 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+# Estresse: N clientes tentam reservar o mesmo veículo ao mesmo tempo; o
+# benchmark mede a vazão (sucesso + conflito). A correção (uma única reserva,
+# 409 para as demais) é coberta em test_int_reserva.py.
+# Rodar com: pytest -m benchmark -s tests/test_bench_reserva_concorrente.py
+from src import models
+from src.database import SessionLocal
+from src.models.enums import CorVeiculoEnum
+from src.schemas import reserva_schema
+from src.services import reserva_service
+
+RESERVAS_CONCORRENTES = 16
+
+
+@pytest.fixture(scope="function")
+def veiculo_disputado(db_session: Session, client_auth_data: dict) -> int:
+    veiculo = models.Passeio(
+        placa="DSP0001",
+        chassi="CHASSIDISPUTA0001",
+        marca="Marca",
+        modelo="Disputado",
+        cor=CorVeiculoEnum.PRETO,
+        valor_diaria=100.0,
+        ano_fabricacao=2023,
+        ano_modelo=2023,
+        capacidade_tanque=50.0,
+        qtde_portas=4,
+    )
+    db_session.add(veiculo)
+    db_session.commit()
+    return veiculo.id_veiculo
+
+
+def _tentar_reservar(
+    id_veiculo: int, id_cliente: int, largada: threading.Barrier
+) -> int:
+    amanha = datetime.now() + timedelta(days=1)
+    dados = reserva_schema.SchemaReservaCriar(
+        veiculo_id=id_veiculo,
+        data_retirada=amanha,
+        data_devolucao=amanha + timedelta(days=3),
+    )
+    # A largada vem antes do checkout da conexão: com mais threads do que o
+    # pool comporta, esperar com a conexão em mãos travaria as demais.
+    largada.wait(timeout=30)
+    with SessionLocal() as sessao_banco:
+        cliente = sessao_banco.get(models.Pessoa, id_cliente)
+        try:
+            reserva_service.criar_reserva(dados, cliente, sessao_banco)
+        except HTTPException as exc:
+            return exc.status_code
+        return 201
+
+
+def _disputar_veiculo(id_veiculo: int, id_cliente: int) -> list:
+    largada = threading.Barrier(RESERVAS_CONCORRENTES)
+    with ThreadPoolExecutor(max_workers=RESERVAS_CONCORRENTES) as executor:
+        return list(
+            executor.map(
+                lambda _: _tentar_reservar(id_veiculo, id_cliente, largada),
+                range(RESERVAS_CONCORRENTES),
+            )
+        )
+
+
+@pytest.mark.benchmark
+def test_bench_vazao_de_reservas_simultaneas_do_mesmo_veiculo(
+    client_auth_data: dict, veiculo_disputado: int
+):
+    inicio = time.perf_counter()
+    resultados = _disputar_veiculo(veiculo_disputado, client_auth_data["cliente_id"])
+    tempo_total = time.perf_counter() - inicio
+
+    print(
+        f"\n{RESERVAS_CONCORRENTES} reservas simultâneas do mesmo veículo:"
+        f"\n  vazão: {RESERVAS_CONCORRENTES / tempo_total:.1f} tentativas/s"
+        f"\n  resultados: {sorted(resultados)}"
+    )
@@ -0,0 +1,151 @@
+import json
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Benchmark: serialização da listagem de reservas (10 mil itens, clientes PF
+# e PJ) pelo caminho clássico jsonable_encoder + json da stdlib, pela
+# validação completa do response_model e pela montagem confiável (sem
+# validar) a partir do ORM. As saídas precisam ser idênticas.
+# Rodar com: pytest -m benchmark -s tests/test_bench_serializacao_reservas.py
+from src import models
+from src.models.enums import CorVeiculoEnum, StatusReservaEnum
+from src.respostas import RespostaJSONRapida, construtor_confiavel
+from src.schemas import reserva_schema
+from src.services import reserva_service
+
+QTDE_RESERVAS = 10_000
+
+_ADAPTADOR = TypeAdapter(List[reserva_schema.SchemaReserva])
+_CONSTRUIR = construtor_confiavel(List[reserva_schema.SchemaReserva])
+
+
+@pytest.fixture(scope="function")
+def reservas_em_massa(
+    db_session: Session, client_auth_data: dict, pj_auth_data: dict
+) -> dict:
+    veiculo = models.Passeio(
+        placa="SER0001",
+        chassi="CHASSISERIAL0001",
+        marca="Marca",
+        modelo="Serializado",
+        cor=CorVeiculoEnum.PRETO,
+        valor_diaria=123.45,
+        ano_fabricacao=2023,
+        ano_modelo=2023,
+        capacidade_tanque=50.0,
+        qtde_portas=4,
+    )
+    db_session.add(veiculo)
+    db_session.commit()
+
+    status_possiveis = list(StatusReservaEnum)
+    base = datetime(2026, 1, 1, 9, 30, 15, 123456)
+    db_session.execute(
+        insert(models.Reserva),
+        [
+            {
+                "data_retirada": base + timedelta(hours=indice),
+                "data_devolucao": base + timedelta(hours=indice, days=3),
+                "data_criacao": base - timedelta(days=1, microseconds=indice),
+                "valor_diaria_no_momento": 123.45,
+                "valor_total_estimado": 370.35 + indice,
+                "seguro_pessoal": indice % 2 == 0,
+                "seguro_terceiros": indice % 3 == 0,
+                "status": status_possiveis[indice % len(status_possiveis)],
+                "veiculo_id": veiculo.id_veiculo,
+                # Uma em cada quatro é de PJ, com o cliente PF como motorista.
+                **(
+                    {
+                        "cliente_id": pj_auth_data["cliente_id"],
+                        "motorista_id": client_auth_data["cliente_id"],
+                    }
+                    if indice % 4 == 0
+                    else {"cliente_id": client_auth_data["cliente_id"]}
+                ),
+            }
+            for indice in range(QTDE_RESERVAS)
+        ],
+    )
+    db_session.commit()
+    return client_auth_data
+
+
+def _medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+@pytest.mark.benchmark
+def test_bench_serializacao_de_10_mil_reservas(
+    test_client, db_session: Session, reservas_em_massa: dict
+):
+    reservas = reserva_service.listar_reservas(db_session, limite=QTDE_RESERVAS).itens
+    assert len(reservas) == QTDE_RESERVAS
+
+    validadas, tempo_validacao = _medir(
+        lambda: _ADAPTADOR.validate_python(reservas, from_attributes=True)
+    )
+    corpo_stdlib, tempo_stdlib = _medir(
+        lambda: json.dumps(
+            jsonable_encoder(validadas), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    )
+    corpo_rapido, tempo_rapido = _medir(lambda: _ADAPTADOR.dump_json(validadas))
+    construidas, tempo_construcao = _medir(lambda: _CONSTRUIR(reservas))
+    with warnings.catch_warnings():
+        # Tipo inesperado num schema montado sem validar vira aviso do pydantic.
+        warnings.simplefilter("error")
+        corpo_confiavel = _ADAPTADOR.dump_json(construidas)
+    resposta_validada, tempo_validada = _medir(
+        lambda: RespostaJSONRapida.de_itens(_ADAPTADOR, reservas)
+    )
+    resposta_confiavel, tempo_confiavel = _medir(
+        lambda: RespostaJSONRapida.de_itens(_ADAPTADOR, reservas, construtor=_CONSTRUIR)
+    )
+
+    print(
+        f"\nSerialização de {QTDE_RESERVAS} reservas:"
+        f"\n  validação (from_attributes): {tempo_validacao:.0f} ms"
+        f"\n  jsonable_encoder + json: {tempo_stdlib:.0f} ms"
+        f"\n  pydantic-core (dump_json): {tempo_rapido:.0f} ms"
+        f"\n  montagem confiável (sem validar): {tempo_construcao:.0f} ms"
+        f"\n  RespostaJSONRapida validando: {tempo_validada:.0f} ms"
+        f"\n  RespostaJSONRapida confiável: {tempo_confiavel:.0f} ms"
+        f" ({tempo_validada / tempo_confiavel:.1f}x)"
+    )
+
+    # Mesmos bytes: datas em ISO 8601 com microssegundos e enums pelo valor.
+    assert corpo_rapido == corpo_stdlib
+    assert corpo_confiavel == corpo_stdlib
+    assert resposta_validada.body == corpo_stdlib
+    assert resposta_confiavel.body == corpo_stdlib
+    # A união SchemaCliente saiu resolvida pelo tipo_pessoa nos dois sentidos.
+    assert {type(reserva.cliente).__name__ for reserva in construidas} == {
+        "SchemaPessoaFisica",
+        "SchemaPessoaJuridica",
+    }
+    primeira = json.loads(corpo_rapido)[0]
+    assert primeira["data_retirada"] == "2026-01-01T09:30:15.123456"
+    assert primeira["status"] in {item.value for item in StatusReservaEnum}
+    assert primeira["veiculo"]["status"] == "disponível"
+
+    cliente = db_session.get(models.Pessoa, reservas_em_massa["cliente_id"])
+    minhas = reserva_service.listar_reservas_por_cliente(cliente, db_session)
+    esperado = json.dumps(
+        jsonable_encoder(_ADAPTADOR.validate_python(minhas, from_attributes=True)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    resposta = test_client.get("/reservas/minhas", headers=reservas_em_massa["headers"])
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "application/json"
+    assert resposta.content == esperado
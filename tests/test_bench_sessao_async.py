@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.orm import Session
+
+# Benchmark: listagem do catálogo pelo caminho síncrono (threadpool) e pelo
+# assíncrono (AsyncSession) sob requisições concorrentes.
+# Rodar com: pytest -m benchmark -s
+from src import models
+from src.database import AsyncSessionLocal, SessionLocal, async_engine
+from src.models.enums import CorVeiculoEnum
+from src.services import veiculo_service
+
+QTDE_VEICULOS = 200
+REQUISICOES_CONCORRENTES = 200
+TAMANHO_THREADPOOL = 40  # Padrão do threadpool do Starlette/AnyIO
+
+
+@pytest.fixture(scope="function")
+def frota_populada(db_session: Session):
+    for indice in range(QTDE_VEICULOS):
+        db_session.add(
+            models.Passeio(
+                placa=f"BEN{indice:04d}",
+                chassi=f"CHASSIBENCH{indice:06d}",
+                marca="Marca",
+                modelo=f"Modelo {indice}",
+                cor=CorVeiculoEnum.PRETO,
+                valor_diaria=100.0 + indice,
+                ano_fabricacao=2022,
+                ano_modelo=2023,
+                capacidade_tanque=50.0,
+                qtde_portas=4,
+            )
+        )
+    db_session.commit()
+
+
+def _listar_sincrono() -> int:
+    with SessionLocal() as sessao_banco:
+        pagina = veiculo_service.listar_veiculos(sessao_banco, limite=QTDE_VEICULOS)
+        return len(pagina.itens)
+
+
+async def _listar_assincrono() -> int:
+    async with AsyncSessionLocal() as sessao_banco:
+        pagina = await veiculo_service.listar_veiculos_async(
+            sessao_banco, limite=QTDE_VEICULOS
+        )
+        return len(pagina.itens)
+
+
+async def _rodar_assincrono() -> list:
+    try:
+        return await asyncio.gather(
+            *(_listar_assincrono() for _ in range(REQUISICOES_CONCORRENTES))
+        )
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.mark.benchmark
+def test_bench_listagem_sincrona_vs_assincrona(frota_populada):
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=TAMANHO_THREADPOOL) as executor:
+        resultados_sync = list(
+            executor.map(lambda _: _listar_sincrono(), range(REQUISICOES_CONCORRENTES))
+        )
+    tempo_sync = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultados_async = asyncio.run(_rodar_assincrono())
+    tempo_async = time.perf_counter() - inicio
+
+    print(
+        f"\n{REQUISICOES_CONCORRENTES} listagens concorrentes de {QTDE_VEICULOS} veículos:"
+        f"\n  síncrono (threadpool={TAMANHO_THREADPOOL}): {tempo_sync:.3f}s"
+        f" ({REQUISICOES_CONCORRENTES / tempo_sync:.0f} req/s)"
+        f"\n  assíncrono (AsyncSession): {tempo_async:.3f}s"
+        f" ({REQUISICOES_CONCORRENTES / tempo_async:.0f} req/s)"
+    )
+
+    assert (
+        resultados_sync
+        == resultados_async
+        == [QTDE_VEICULOS] * REQUISICOES_CONCORRENTES
+    )
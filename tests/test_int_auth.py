@@ -0,0 +1,224 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+from passlib.context import CryptContext
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from src import main, models
+from src import seguranca as seguranca_service
+from src.services import auth_service
+
+# Testes de Integração para os endpoints de login (auth/token e clientes/token).
+# Cobre: credenciais válidas/inválidas, email sem diferenciar maiúsculas e
+# rehash de senha com parâmetros antigos do argon2.
+
+
+@pytest.mark.integration
+def test_login_funcionario_ignora_maiusculas_no_email(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    response: Response = test_client.post(
+        "/auth/token",
+        data={"username": "Admin_Test@Locadora.com", "password": "senhasegura123"},
+    )
+
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert response.json()["token_type"] == "bearer"
+
+    response_protegida = test_client.post(
+        "/veiculos/passeio", json={}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response_protegida.status_code == 422  # autenticado; corpo inválido
+
+
+@pytest.mark.integration
+def test_login_funcionario_senha_errada_falha_401(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    response: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhaErrada"},
+    )
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.integration
+def test_login_cliente_gera_token_aceito_nas_rotas_do_cliente(
+    test_client: TestClient, client_auth_data: dict
+):
+    response: Response = test_client.post(
+        "/clientes/token",
+        data={"username": "cliente_test@email.com", "password": "senhaCliente123"},
+    )
+
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response_me = test_client.get(
+        "/clientes/pessoas-fisicas/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response_me.status_code == 200
+    assert response_me.json()["id_pessoa"] == client_auth_data["cliente_id"]
+
+
+@pytest.mark.integration
+def test_login_regrava_hash_com_parametros_desatualizados(
+    test_client: TestClient, db_session: Session
+):
+    contexto_antigo = CryptContext(schemes=["argon2"], argon2__rounds=1)
+    hash_antigo = contexto_antigo.hash("senhaAntiga123")
+    assert seguranca_service.precisa_rehash(hash_antigo)
+
+    db_session.add(
+        models.Funcionario(
+            email="legado@frotanext.com",
+            nome_completo="Funcionario Legado",
+            senha=hash_antigo,
+        )
+    )
+    db_session.commit()
+
+    response: Response = test_client.post(
+        "/auth/token",
+        data={"username": "legado@frotanext.com", "password": "senhaAntiga123"},
+    )
+    assert response.status_code == 200
+
+    # O TestClient só devolve a resposta depois das tarefas em segundo plano.
+    db_session.expire_all()
+    hash_novo = (
+        db_session.query(models.Funcionario)
+        .filter_by(email="legado@frotanext.com")
+        .one()
+        .senha
+    )
+    assert hash_novo != hash_antigo
+    assert not seguranca_service.precisa_rehash(hash_novo)
+    assert seguranca_service.verificar_senha("senhaAntiga123", hash_novo)
+
+
+@pytest.mark.integration
+def test_token_com_claims_autoriza_funcionario_e_e_revogado_ao_desativar(
+    test_client: TestClient, admin_auth_headers: dict, db_session: Session
+):
+    response_login: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    token = response_login.json()["access_token"]
+    payload = seguranca_service.verificar_token(token)
+    assert payload["papel"] == "admin"
+    assert payload["ver"] == 1
+
+    headers = {"Authorization": f"Bearer {token}"}
+    autorizado = test_client.get("/clientes/pessoas-fisicas/", headers=headers)
+    assert autorizado.status_code == 200
+
+    admin = (
+        db_session.query(models.Funcionario)
+        .filter_by(email="admin_test@locadora.com")
+        .one()
+    )
+    auth_service.alterar_status_funcionario(
+        db_session, id_funcionario=admin.id_funcionario, e_ativado=False
+    )
+
+    revogado = test_client.get("/clientes/pessoas-fisicas/", headers=headers)
+    assert revogado.status_code == 401
+
+
+@pytest.mark.integration
+def test_admin_desativa_funcionario_e_o_cache_de_principais_nao_o_mantem_ativo(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    funcionario_nao_admin_auth_headers: dict,
+    db_session: Session,
+):
+    # Primeira chamada guarda o funcionário no cache de principais.
+    antes = test_client.get(
+        "/clientes/pessoas-fisicas/", headers=funcionario_nao_admin_auth_headers
+    )
+    assert antes.status_code == 200
+
+    funcionario = (
+        db_session.query(models.Funcionario)
+        .filter_by(email="funcionario_comum@frotanext.com")
+        .one()
+    )
+    url = f"/auth/funcionarios/{funcionario.id_funcionario}/status"
+
+    sem_permissao = test_client.patch(
+        url, json={"e_ativado": False}, headers=funcionario_nao_admin_auth_headers
+    )
+    assert sem_permissao.status_code == 403
+
+    desativado = test_client.patch(
+        url, json={"e_ativado": False}, headers=admin_auth_headers
+    )
+    assert desativado.status_code == 200
+    assert desativado.json()["e_ativado"] is False
+
+    depois = test_client.get(
+        "/clientes/pessoas-fisicas/", headers=funcionario_nao_admin_auth_headers
+    )
+    assert depois.status_code == 403
+
+    inexistente = test_client.patch(
+        "/auth/funcionarios/999999/status",
+        json={"e_ativado": False},
+        headers=admin_auth_headers,
+    )
+    assert inexistente.status_code == 404
+
+
+@pytest.mark.integration
+def test_inicializacao_adiciona_versao_token_a_tabela_existente(db_session: Session):
+    # Tabela criada antes da coluna existir, já com um funcionário.
+    db_session.execute(text("ALTER TABLE funcionarios DROP COLUMN versao_token"))
+    db_session.execute(
+        text(
+            "INSERT INTO funcionarios (nome_completo, email, senha, e_admin, e_ativado)"
+            " VALUES ('Antigo', 'antigo@locadora.com', 'x', 0, 1)"
+        )
+    )
+    db_session.commit()
+
+    main.criar_colunas_ausentes()
+    main.criar_colunas_ausentes()
+
+    funcionario = db_session.query(models.Funcionario).one()
+    assert funcionario.versao_token == 1
+
+
+@pytest.mark.integration
+def test_indice_unico_com_duplicados_nao_impede_os_demais(db_session: Session, caplog):
+    db_session.execute(text("DROP INDEX uq_funcionarios_email_lower"))
+    db_session.execute(text("DROP INDEX ix_veiculos_marca_id"))
+    for email in ("dup@locadora.com", "DUP@locadora.com"):
+        db_session.execute(
+            text(
+                "INSERT INTO funcionarios"
+                " (nome_completo, email, senha, e_admin, e_ativado, versao_token)"
+                " VALUES ('Dup', :email, 'x', 0, 1, 1)"
+            ),
+            {"email": email},
+        )
+    db_session.commit()
+
+    with caplog.at_level(logging.ERROR, logger="frotanext.inicializacao"):
+        main.criar_indices_ausentes()
+
+    assert any(
+        "uq_funcionarios_email_lower" in registro.getMessage()
+        for registro in caplog.records
+    )
+    indices_veiculos = {
+        indice["name"] for indice in inspect(db_session.bind).get_indexes("veiculos")
+    }
+    assert "ix_veiculos_marca_id" in indices_veiculos
@@ -3,6 +3,8 @@ import pytest
 from fastapi.testclient import TestClient
 from httpx import Response
 
+from src import seguranca as seguranca_service
+
 dados_validos_pessoa_fisica = [
     {
         "email": "teste.param1@email.com",
@@ -386,6 +388,41 @@ def test_criar_pessoa_fisica_cpf_duplicado(test_client):
     print("\n[SUCESSO] Teste 'test_criar_pessoa_fisica_cpf_duplicado' passou")
 
 
+@pytest.mark.integration
+def test_cadastro_rejeita_email_que_so_difere_em_maiusculas(
+    test_client: TestClient, client_auth_data: dict
+):
+    # client_auth_data já cadastrou cliente_test@email.com.
+    dados_cliente = {
+        "email": "Cliente_Test@Email.COM",
+        "telefone": "444444444",
+        "nome_completo": "Outra Pessoa",
+        "cpf": "55566677788",
+        "cnh": "4444444444",
+        "senha_texto_puro": "senha1234",
+        "endereco": {
+            "rua": "Rua Caixa",
+            "numero": "4",
+            "bairro": "B Caixa",
+            "cidade": "C Caixa",
+            "estado": "CX",
+            "cep": "44444",
+        },
+    }
+    resposta_pf: Response = test_client.post(
+        "/clientes/pessoas-fisicas/", json=dados_cliente
+    )
+    assert resposta_pf.status_code == 400
+    assert "Email" in resposta_pf.json()["detail"]
+
+    resposta_pj: Response = test_client.post(
+        "/clientes/pessoas-juridicas/",
+        json={**dados_validos_pessoa_juridica, "email": "CLIENTE_TEST@email.com"},
+    )
+    assert resposta_pj.status_code == 400
+    assert "Email" in resposta_pj.json()["detail"]
+
+
 @pytest.mark.integration
 def test_criar_pessoa_fisica_email_invalido(test_client):
     dados_email_invalido = {
@@ -457,6 +494,32 @@ def test_criar_pessoa_juridica_cnpj_duplicado_falha_400(test_client):
     )
 
 
+@pytest.mark.integration
+def test_cadastro_duplicado_e_recusado_antes_do_hash(test_client, monkeypatch):
+    assert (
+        test_client.post(
+            "/clientes/pessoas-juridicas/", json=dados_validos_pessoa_juridica
+        ).status_code
+        == 201
+    )
+
+    hashes = []
+    original = seguranca_service.obter_hash_senha_async
+
+    async def registrar_hash(senha):
+        hashes.append(senha)
+        return await original(senha)
+
+    monkeypatch.setattr(seguranca_service, "obter_hash_senha_async", registrar_hash)
+
+    response: Response = test_client.post(
+        "/clientes/pessoas-juridicas/", json=dados_validos_pessoa_juridica
+    )
+
+    assert response.status_code == 400
+    assert hashes == []
+
+
 @pytest.mark.integration
 def test_pessoa_fisica_tenta_acessar_rota_minha_empresa_falha_403(
     test_client: TestClient, client_auth_data: dict
@@ -544,3 +607,25 @@ def test_criar_pessoa_juridica_com_motoristas_validos_sucesso(
     print(
         "\n[SUCESSO] Teste 'test_criar_pessoa_juridica_com_motoristas_validos_sucesso' passou!"
     )
+
+
+@pytest.mark.integration
+def test_cache_de_principal_evita_consulta_e_respeita_bloqueio(
+    test_client: TestClient, admin_auth_headers: dict, client_auth_data: dict
+):
+    id_pf = client_auth_data["cliente_id"]
+    headers_cliente = client_auth_data["headers"]
+
+    primeira = test_client.get("/clientes/pessoas-fisicas/me", headers=headers_cliente)
+    segunda = test_client.get("/clientes/pessoas-fisicas/me", headers=headers_cliente)
+    assert primeira.status_code == segunda.status_code == 200
+    assert segunda.json() == primeira.json()
+    assert int(segunda.headers["X-DB-Queries"]) < int(primeira.headers["X-DB-Queries"])
+
+    test_client.patch(
+        f"/clientes/pessoas-fisicas/{id_pf}/status",
+        json={"novo_status": "bloqueado"},
+        headers=admin_auth_headers,
+    )
+    bloqueado = test_client.get("/clientes/pessoas-fisicas/me", headers=headers_cliente)
+    assert bloqueado.status_code == 403
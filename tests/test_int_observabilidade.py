@@ -0,0 +1,122 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+# Testes de Integração para a instrumentação de SQL por requisição.
+# Cobre: cabeçalhos X-DB-Queries / X-DB-Time-ms e log de consultas lentas.
+from src import dependencies, observabilidade
+from src.database import engine
+
+
+@pytest.mark.integration
+def test_rota_assincrona_informa_consultas_nos_cabecalhos(test_client: TestClient):
+    response: Response = test_client.get("/veiculos/")
+
+    assert response.status_code == 200
+    # Versão do catálogo (ETag) + listagem.
+    assert int(response.headers["X-DB-Queries"]) == 2
+    assert float(response.headers["X-DB-Time-ms"]) >= 0
+
+
+@pytest.mark.integration
+def test_rota_sincrona_conta_consultas_da_autenticacao(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    response: Response = test_client.get(
+        "/clientes/pessoas-fisicas/", headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) == 2
+
+
+@pytest.mark.integration
+def test_requisicao_sem_banco_informa_zero_consultas(test_client: TestClient):
+    response: Response = test_client.get("/")
+
+    assert response.headers["X-DB-Queries"] == "0"
+
+
+@pytest.mark.integration
+def test_consulta_lenta_e_registrada_com_a_rota(
+    test_client: TestClient, monkeypatch, caplog
+):
+    monkeypatch.setattr(observabilidade, "LIMITE_CONSULTA_LENTA_MS", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="frotanext.sql"):
+        test_client.get("/veiculos/42")
+
+    assert any(
+        "/veiculos/{id_veiculo}" in registro.getMessage()
+        for registro in caplog.records
+    )
+
+
+@pytest.mark.integration
+def test_consulta_com_erro_e_contada_e_nao_fica_pendente_na_conexao(
+    db_session, monkeypatch, caplog
+):
+    monkeypatch.setattr(observabilidade, "LIMITE_CONSULTA_LENTA_MS", 0.0)
+    estatisticas = observabilidade.EstatisticasRequisicao({"path": "/teste"})
+    token = observabilidade._estatisticas_requisicao.set(estatisticas)
+    try:
+        with caplog.at_level(logging.WARNING, logger="frotanext.sql"):
+            with engine.connect() as conexao:
+                for _ in range(3):
+                    with pytest.raises(DBAPIError):
+                        conexao.execute(text("SELECT * FROM tabela_inexistente"))
+                    conexao.rollback()
+                assert conexao.info["inicio_consultas"] == []
+    finally:
+        observabilidade._estatisticas_requisicao.reset(token)
+
+    assert estatisticas.quantidade_consultas == 3
+    assert any(
+        "com erro" in registro.getMessage() and "/teste" in registro.getMessage()
+        for registro in caplog.records
+    )
+
+
+@pytest.mark.integration
+def test_metricas_exportam_latencia_por_rota_e_gauges(
+    test_client: TestClient, monkeypatch
+):
+    monkeypatch.setattr(dependencies, "METRICS_TOKEN", "segredo-metricas")
+    test_client.get("/veiculos/")
+    test_client.get("/veiculos/99999")
+
+    response: Response = test_client.get(
+        "/metrics", headers={"Authorization": "Bearer segredo-metricas"}
+    )
+
+    assert response.status_code == 200
+    corpo = response.text
+    assert (
+        'frotanext_requisicao_latencia_segundos_count{metodo="GET",rota="/veiculos/{id_veiculo}",roteador="Veículos"}'
+        in corpo
+    )
+    assert 'rota="/veiculos/{id_veiculo}",roteador="Veículos",status="404"' in corpo
+    assert "frotanext_threadpool_capacidade 40.0" in corpo
+    assert 'frotanext_pool_banco{engine="primario"' in corpo
+    assert 'frotanext_hash_senha{metrica="aguardando"}' in corpo
+    assert 'frotanext_cache{cache="tokens_jwt",metrica="acertos"}' in corpo
+    assert 'frotanext_cache{cache="cotacoes",metrica="taxa_acerto"}' in corpo
+
+
+@pytest.mark.integration
+def test_metricas_exigem_token(test_client: TestClient, monkeypatch):
+    monkeypatch.setattr(dependencies, "METRICS_TOKEN", None)
+    assert test_client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(dependencies, "METRICS_TOKEN", "segredo-metricas")
+    assert test_client.get("/metrics").status_code == 401
+    assert (
+        test_client.get(
+            "/metrics", headers={"Authorization": "Bearer outro-token"}
+        ).status_code
+        == 401
+    )
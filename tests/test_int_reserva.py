@@ -1,7 +1,20 @@
+import asyncio
 from datetime import datetime, timedelta
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from httpx import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src import models
+from src.agendador import AgendadorExpiracao
+from src.database import SessionLocal, engine
+from src.eventos import hub_status_veiculos
+from src.models.enums import StatusReservaEnum, StatusVeiculoEnum
+from src.schemas import reserva_schema
+from src.schemas.reserva_schema import SchemaReserva
+from src.services import reserva_service
 
 veiculo_passeio_valido = {
     "placa": "TESTE123",
@@ -140,4 +153,581 @@ def test_cliente_tenta_cancelar_reserva_ja_finalizada_falha_400(
     
     assert response_cancelar.status_code == 400
     mensagem_erro = response_cancelar.json()["detail"].lower()
-    assert any(x in mensagem_erro for x in ["não pode", "status", "cancelar", "finalizada"])
\ No newline at end of file
+    assert any(x in mensagem_erro for x in ["não pode", "status", "cancelar", "finalizada"])
+
+@pytest.mark.integration
+def test_listagens_de_reserva_retornam_cliente_e_veiculo_completos(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    headers_cliente = setup_para_teste_reserva["headers_cliente"]
+    headers_admin = setup_para_teste_reserva["headers_admin"]
+    id_veiculo = setup_para_teste_reserva["id_veiculo"]
+
+    dados_reserva = {
+        "veiculo_id": id_veiculo,
+        "data_retirada": str(datetime.today() + timedelta(days=1)),
+        "data_devolucao": str(datetime.today() + timedelta(days=3)),
+    }
+    id_reserva = test_client.post(
+        "/reservas/", json=dados_reserva, headers=headers_cliente
+    ).json()["id_reserva"]
+
+    response_admin: Response = test_client.get("/reservas/", headers=headers_admin)
+    assert response_admin.status_code == 200
+    assert response_admin.json()[0]["cliente"]["nome_completo"] == "Cliente de Teste PF"
+    assert response_admin.json()[0]["veiculo"]["qtde_portas"] == 4
+
+    response_minhas: Response = test_client.get(
+        "/reservas/minhas", headers=headers_cliente
+    )
+    assert response_minhas.status_code == 200
+    assert [r["id_reserva"] for r in response_minhas.json()] == [id_reserva]
+
+    response_detalhe: Response = test_client.get(
+        f"/reservas/minhas/{id_reserva}", headers=headers_cliente
+    )
+    assert response_detalhe.status_code == 200
+    assert response_detalhe.json()["motorista"]["cpf"] == "12345678901"
+
+
+@pytest.mark.integration
+def test_simulacao_de_reserva_calcula_diarias_e_seguros(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    amanha = datetime.today() + timedelta(days=1)
+    dados_simulacao = {
+        "veiculo_id": setup_para_teste_reserva["id_veiculo"],
+        "data_retirada": str(amanha),
+        "data_devolucao": str(amanha + timedelta(days=2)),
+        "seguro_pessoal": True,
+    }
+
+    response: Response = test_client.post("/reservas/simulacao", json=dados_simulacao)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "quantidade_diarias": 2,
+        "valor_diarias": 300.0,
+        "valor_seguros": 50.0,
+        "valor_total_estimado": 350.0,
+    }
+
+
+@pytest.mark.integration
+def test_simulacao_em_lote_mantem_ordem_e_regras_da_simulacao_individual(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    amanha = datetime.today() + timedelta(days=1)
+    item_base = {
+        "veiculo_id": setup_para_teste_reserva["id_veiculo"],
+        "data_retirada": str(amanha),
+    }
+    itens = [
+        {
+            **item_base,
+            "data_devolucao": str(amanha + timedelta(days=2)),
+            "seguro_pessoal": True,
+        },
+        {**item_base, "data_devolucao": str(amanha + timedelta(days=5))},
+    ]
+
+    response: Response = test_client.post(
+        "/reservas/simulacao/lote", json={"itens": itens}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "1"
+    individuais = [
+        test_client.post("/reservas/simulacao", json=item).json() for item in itens
+    ]
+    assert response.json() == [
+        {"veiculo_id": setup_para_teste_reserva["id_veiculo"], **individual}
+        for individual in individuais
+    ]
+
+
+@pytest.mark.integration
+def test_simulacao_repetida_usa_cache_e_reflete_alteracao_da_diaria(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    amanha = datetime.today() + timedelta(days=1)
+    dados_simulacao = {
+        "veiculo_id": setup_para_teste_reserva["id_veiculo"],
+        "data_retirada": str(amanha),
+        "data_devolucao": str(amanha + timedelta(days=2)),
+    }
+    test_client.post("/reservas/simulacao", json=dados_simulacao)
+    acertos_antes = reserva_service.cache_cotacoes.acertos
+
+    response: Response = test_client.post("/reservas/simulacao", json=dados_simulacao)
+
+    assert response.headers["X-DB-Queries"] == "0"
+    assert response.json()["valor_total_estimado"] == 300.0
+    assert reserva_service.cache_cotacoes.acertos == acertos_antes + 1
+
+    test_client.put(
+        f"/veiculos/passeio/{setup_para_teste_reserva['id_veiculo']}",
+        json={"valor_diaria": 200.0},
+        headers=setup_para_teste_reserva["headers_admin"],
+    )
+    response = test_client.post("/reservas/simulacao", json=dados_simulacao)
+
+    assert response.json()["valor_total_estimado"] == 400.0
+
+
+@pytest.mark.integration
+def test_simulacao_em_lote_com_veiculo_inexistente_retorna_404(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    amanha = datetime.today() + timedelta(days=1)
+    itens = [
+        {
+            "veiculo_id": id_veiculo,
+            "data_retirada": str(amanha),
+            "data_devolucao": str(amanha + timedelta(days=1)),
+        }
+        for id_veiculo in (setup_para_teste_reserva["id_veiculo"], 99999)
+    ]
+
+    response: Response = test_client.post(
+        "/reservas/simulacao/lote", json={"itens": itens}
+    )
+
+    assert response.status_code == 404
+    assert "99999" in response.json()["detail"]
+
+
+@pytest.mark.integration
+def test_listar_reservas_pagina_por_cursor_sem_repetir_itens(
+    test_client: TestClient, db_session: Session, setup_para_teste_reserva: dict
+):
+    headers_admin = setup_para_teste_reserva["headers_admin"]
+    mesma_data = datetime.today() + timedelta(days=10)
+    for indice in range(5):
+        db_session.add(
+            models.Reserva(
+                veiculo_id=setup_para_teste_reserva["id_veiculo"],
+                cliente_id=setup_para_teste_reserva["id_cliente"],
+                data_retirada=mesma_data + timedelta(days=max(indice - 2, 0)),
+                data_devolucao=mesma_data + timedelta(days=20),
+                valor_diaria_no_momento=150.0,
+                valor_total_estimado=1500.0,
+            )
+        )
+    db_session.commit()
+
+    ids_vistos = []
+    cursor = None
+    while True:
+        params = {"limite": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response: Response = test_client.get(
+            "/reservas/", params=params, headers=headers_admin
+        )
+        assert response.status_code == 200
+        ids_vistos.extend(r["id_reserva"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert ids_vistos == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.integration
+def test_listar_reservas_com_cursor_invalido_retorna_400(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    response: Response = test_client.get(
+        "/reservas/?cursor=invalido", headers=admin_auth_headers
+    )
+
+    assert response.status_code == 400
+
+
+def _criar_reservas_mistas(db_session: Session, quantidade_por_tipo: int):
+    """Cria reservas de clientes PF e PJ (com motoristas), cada uma em um veículo."""
+    for indice in range(quantidade_por_tipo):
+        endereco = {
+            "rua": "Rua",
+            "numero": str(indice),
+            "bairro": "Bairro",
+            "cidade": "Cidade",
+            "estado": "TS",
+            "cep": "00000000",
+        }
+        motoristas = [
+            models.PessoaFisica(
+                email=f"motorista{indice}_{n}@email.com",
+                telefone="1",
+                senha="hash",
+                nome_completo=f"Motorista {indice}-{n}",
+                cpf=f"9{indice:04d}{n}",
+                endereco=models.Endereco(**endereco),
+            )
+            for n in range(2)
+        ]
+        empresa = models.PessoaJuridica(
+            email=f"empresa{indice}@email.com",
+            telefone="1",
+            senha="hash",
+            razao_social=f"Empresa {indice}",
+            cnpj=f"8{indice:04d}",
+            endereco=models.Endereco(**endereco),
+            motoristas=motoristas,
+        )
+        db_session.add(empresa)
+        db_session.flush()
+
+        pares_cliente_motorista = (
+            (motoristas[0], motoristas[0]),
+            (empresa, motoristas[1]),
+        )
+        for cliente, motorista in pares_cliente_motorista:
+            veiculo = models.Passeio(
+                placa=f"N1{cliente.id_pessoa:05d}",
+                chassi=f"CHASSIN1{cliente.id_pessoa:05d}",
+                marca="Marca",
+                modelo="Modelo",
+                cor=models.CorVeiculoEnum.PRETO,
+                valor_diaria=100.0,
+                ano_fabricacao=2022,
+                ano_modelo=2022,
+                capacidade_tanque=40.0,
+                qtde_portas=4,
+            )
+            db_session.add(veiculo)
+            db_session.flush()
+            db_session.add(
+                models.Reserva(
+                    veiculo_id=veiculo.id_veiculo,
+                    cliente_id=cliente.id_pessoa,
+                    motorista_id=motorista.id_pessoa,
+                    data_retirada=datetime.today() + timedelta(days=1 + indice),
+                    data_devolucao=datetime.today() + timedelta(days=5 + indice),
+                    valor_diaria_no_momento=100.0,
+                    valor_total_estimado=400.0,
+                )
+            )
+    db_session.commit()
+
+
+def _contar_consultas_listagem_sincrona(limite: int) -> int:
+    contador = {"consultas": 0}
+
+    def contar(*_args):
+        contador["consultas"] += 1
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        with SessionLocal() as sessao_banco:
+            pagina = reserva_service.listar_reservas(sessao_banco, limite=limite)
+            serializadas = [SchemaReserva.model_validate(r) for r in pagina.itens]
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert len(serializadas) == limite
+    return contador["consultas"]
+
+
+@pytest.mark.integration
+def test_listagem_de_reservas_tem_numero_fixo_de_consultas(
+    test_client: TestClient, db_session: Session, admin_auth_headers: dict
+):
+    _criar_reservas_mistas(db_session, quantidade_por_tipo=6)
+
+    assert _contar_consultas_listagem_sincrona(
+        limite=4
+    ) == _contar_consultas_listagem_sincrona(limite=12)
+
+    # A primeira requisição também carrega o admin; as seguintes usam o cache
+    # de principais e medem só a listagem.
+    consultas_por_pagina = [
+        test_client.get(
+            "/reservas/", params={"limite": limite}, headers=admin_auth_headers
+        ).headers["X-DB-Queries"]
+        for limite in (4, 4, 12)
+    ][1:]
+    assert consultas_por_pagina[0] == consultas_por_pagina[1]
+
+
+@pytest.mark.integration
+def test_disponibilidade_por_periodo_so_lista_veiculos_reservaveis(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    id_veiculo = setup_para_teste_reserva["id_veiculo"]
+    amanha = datetime.today().replace(microsecond=0) + timedelta(days=1)
+
+    def disponiveis(inicio: datetime, fim: datetime) -> Response:
+        return test_client.get(
+            "/veiculos/disponiveis",
+            params={"retirada": inicio.isoformat(), "devolucao": fim.isoformat()},
+        )
+
+    livre = disponiveis(amanha, amanha + timedelta(days=2))
+    assert [v["id_veiculo"] for v in livre.json()] == [id_veiculo]
+
+    response_criar = test_client.post(
+        "/reservas/",
+        json={
+            "veiculo_id": id_veiculo,
+            "data_retirada": str(amanha),
+            "data_devolucao": str(amanha + timedelta(days=4)),
+        },
+        headers=setup_para_teste_reserva["headers_cliente"],
+    )
+    assert response_criar.status_code == 201
+
+    periodo_sobreposto = disponiveis(
+        amanha + timedelta(days=3), amanha + timedelta(days=6)
+    )
+    assert periodo_sobreposto.status_code == 200
+    assert periodo_sobreposto.json() == []
+
+    # Começa exatamente na devolução, mas criar_reserva recusaria o veículo
+    # reservado (409): a busca não pode anunciá-lo.
+    periodo_seguinte = disponiveis(
+        amanha + timedelta(days=4), amanha + timedelta(days=6)
+    )
+    assert periodo_seguinte.json() == []
+
+    periodo_invertido = disponiveis(amanha + timedelta(days=2), amanha)
+    assert periodo_invertido.status_code == 400
+
+
+@pytest.mark.integration
+def test_transicoes_em_lote_informam_resultado_por_reserva(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    headers_admin = setup_para_teste_reserva["headers_admin"]
+    segundo_veiculo = {
+        **veiculo_passeio_valido,
+        "placa": "LOTE1234",
+        "chassi": "CHASSILOTE123456",
+    }
+    id_segundo_veiculo = test_client.post(
+        "/veiculos/passeio", json=segundo_veiculo, headers=headers_admin
+    ).json()["id_veiculo"]
+
+    amanha = datetime.today() + timedelta(days=1)
+    ids_reservas = [
+        test_client.post(
+            "/reservas/",
+            json={
+                "veiculo_id": id_veiculo,
+                "data_retirada": str(amanha),
+                "data_devolucao": str(amanha + timedelta(days=2)),
+            },
+            headers=setup_para_teste_reserva["headers_cliente"],
+        ).json()["id_reserva"]
+        for id_veiculo in (setup_para_teste_reserva["id_veiculo"], id_segundo_veiculo)
+    ]
+
+    response: Response = test_client.put(
+        "/reservas/lote/confirmar",
+        json={"ids_reservas": [*ids_reservas, 99999]},
+        headers=headers_admin,
+    )
+
+    assert response.status_code == 200
+    resultados = response.json()
+    assert [r["id_reserva"] for r in resultados] == [*ids_reservas, 99999]
+    assert [r["sucesso"] for r in resultados] == [True, True, False]
+    assert resultados[2]["erro"] == "Reserva não encontrada."
+
+    response = test_client.put(
+        "/reservas/lote/retirar",
+        json={"ids_reservas": ids_reservas[:1]},
+        headers=headers_admin,
+    )
+    assert response.json()[0]["status"] == "em_andamento"
+
+    response = test_client.put(
+        "/reservas/lote/finalizar",
+        json={"ids_reservas": ids_reservas},
+        headers=headers_admin,
+    )
+    finalizada, nao_iniciada = response.json()
+    assert finalizada["sucesso"] and finalizada["status"] == "finalizada"
+    assert not nao_iniciada["sucesso"]
+    assert nao_iniciada["status"] == "confirmada"
+
+    reserva_finalizada = test_client.get(
+        f"/reservas/{ids_reservas[0]}", headers=headers_admin
+    ).json()
+    assert reserva_finalizada["valor_total_estimado"] == 150.0
+    assert reserva_finalizada["veiculo"]["status"] == "disponível"
+
+
+@pytest.mark.integration
+def test_expiracao_cancela_pendentes_antigas_e_libera_veiculos(
+    test_client: TestClient, setup_para_teste_reserva: dict, db_session: Session
+):
+    segundo_veiculo = {
+        **veiculo_passeio_valido,
+        "placa": "EXPI1234",
+        "chassi": "CHASSIEXPIRA1234",
+    }
+    id_segundo_veiculo = test_client.post(
+        "/veiculos/passeio",
+        json=segundo_veiculo,
+        headers=setup_para_teste_reserva["headers_admin"],
+    ).json()["id_veiculo"]
+
+    amanha = datetime.today() + timedelta(days=1)
+    id_antiga, id_recente = [
+        test_client.post(
+            "/reservas/",
+            json={
+                "veiculo_id": id_veiculo,
+                "data_retirada": str(amanha),
+                "data_devolucao": str(amanha + timedelta(days=2)),
+            },
+            headers=setup_para_teste_reserva["headers_cliente"],
+        ).json()["id_reserva"]
+        for id_veiculo in (setup_para_teste_reserva["id_veiculo"], id_segundo_veiculo)
+    ]
+    reserva_antiga = db_session.get(models.Reserva, id_antiga)
+    reserva_antiga.data_criacao = datetime.now() - timedelta(hours=3)
+    db_session.commit()
+
+    agendador = AgendadorExpiracao(
+        intervalo_segundos=60, validade_minutos=120, tamanho_lote=1
+    )
+
+    assert agendador.executar_rodada() == 1
+
+    db_session.expire_all()
+    antiga = db_session.get(models.Reserva, id_antiga)
+    assert antiga.status == StatusReservaEnum.CANCELADA
+    assert antiga.veiculo.status == StatusVeiculoEnum.DISPONIVEL
+    recente = db_session.get(models.Reserva, id_recente)
+    assert recente.status == StatusReservaEnum.PENDENTE
+    assert recente.veiculo.status == StatusVeiculoEnum.RESERVADO
+
+
+@pytest.mark.integration
+def test_transicoes_da_reserva_publicam_status_do_veiculo(
+    test_client: TestClient, setup_para_teste_reserva: dict
+):
+    id_veiculo = setup_para_teste_reserva["id_veiculo"]
+    headers_admin = setup_para_teste_reserva["headers_admin"]
+    amanha = datetime.today() + timedelta(days=1)
+
+    def percorrer_ciclo_da_reserva():
+        id_reserva = test_client.post(
+            "/reservas/",
+            json={
+                "veiculo_id": id_veiculo,
+                "data_retirada": str(amanha),
+                "data_devolucao": str(amanha + timedelta(days=2)),
+            },
+            headers=setup_para_teste_reserva["headers_cliente"],
+        ).json()["id_reserva"]
+        test_client.put(f"/reservas/{id_reserva}/confirmar", headers=headers_admin)
+        test_client.put(f"/reservas/{id_reserva}/retirar", headers=headers_admin)
+        test_client.put(f"/reservas/{id_reserva}/finalizar", headers=headers_admin)
+
+    async def cenario():
+        assinatura = hub_status_veiculos.assinar()
+        try:
+            await asyncio.to_thread(percorrer_ciclo_da_reserva)
+            return [
+                (await asyncio.wait_for(assinatura.proximo(), timeout=5))[1]
+                for _ in range(3)
+            ]
+        finally:
+            hub_status_veiculos.cancelar(assinatura)
+
+    eventos = asyncio.run(cenario())
+
+    assert [(e["id_veiculo"], e["status"]) for e in eventos] == [
+        (id_veiculo, "reservado"),
+        (id_veiculo, "alugado"),
+        (id_veiculo, "disponível"),
+    ]
+
+
+@pytest.mark.integration
+def test_reserva_concorrente_do_mesmo_veiculo_recebe_409(
+    db_session: Session, setup_para_teste_reserva: dict
+):
+    id_veiculo = setup_para_teste_reserva["id_veiculo"]
+    id_cliente = setup_para_teste_reserva["id_cliente"]
+    amanha = datetime.now() + timedelta(days=1)
+    dados = reserva_schema.SchemaReservaCriar(
+        veiculo_id=id_veiculo,
+        data_retirada=amanha,
+        data_devolucao=amanha + timedelta(days=3),
+    )
+
+    with SessionLocal() as sessao_a, SessionLocal() as sessao_b:
+        # A já leu o veículo como disponível (e o mantém na sessão)...
+        veiculo_lido_por_a = sessao_a.get(models.Veiculo, id_veiculo)
+        assert veiculo_lido_por_a.status == StatusVeiculoEnum.DISPONIVEL
+        # ...quando B reserva e confirma a transação.
+        reserva_service.criar_reserva(
+            dados, sessao_b.get(models.Pessoa, id_cliente), sessao_b
+        )
+
+        # A segue com a leitura antiga; só o UPDATE condicional a barra.
+        with pytest.raises(HTTPException) as erro:
+            reserva_service.criar_reserva(
+                dados, sessao_a.get(models.Pessoa, id_cliente), sessao_a
+            )
+    assert erro.value.status_code == 409
+
+    db_session.expire_all()
+    assert (
+        db_session.query(models.Reserva)
+        .filter(models.Reserva.veiculo_id == id_veiculo)
+        .count()
+        == 1
+    )
+
+
+@pytest.mark.integration
+def test_confirmar_ou_cancelar_reserva_expirada_no_meio_recebe_409(
+    test_client: TestClient, setup_para_teste_reserva: dict, db_session: Session
+):
+    id_veiculo = setup_para_teste_reserva["id_veiculo"]
+    amanha = datetime.today() + timedelta(days=1)
+    id_reserva = test_client.post(
+        "/reservas/",
+        json={
+            "veiculo_id": id_veiculo,
+            "data_retirada": str(amanha),
+            "data_devolucao": str(amanha + timedelta(days=2)),
+        },
+        headers=setup_para_teste_reserva["headers_cliente"],
+    ).json()["id_reserva"]
+
+    with SessionLocal() as sessao_confirmacao, SessionLocal() as sessao_cancelamento:
+        # As duas operações já leram a reserva como PENDENTE...
+        lidas = [
+            sessao.get(models.Reserva, id_reserva)
+            for sessao in (sessao_confirmacao, sessao_cancelamento)
+        ]
+        assert {reserva.status for reserva in lidas} == {StatusReservaEnum.PENDENTE}
+
+        # ...quando a expiração a cancela e devolve o veículo ao estoque.
+        with SessionLocal() as sessao_expiracao:
+            assert (
+                reserva_service.expirar_reservas_pendentes(
+                    sessao_expiracao, datetime.now() + timedelta(hours=1), 10
+                )
+                == 1
+            )
+
+        for operacao, sessao in (
+            (reserva_service.confirmar_reserva, sessao_confirmacao),
+            (reserva_service.cancelar_reserva, sessao_cancelamento),
+        ):
+            with pytest.raises(HTTPException) as erro:
+                operacao(id_reserva, sessao)
+            assert erro.value.status_code == 409
+
+    db_session.expire_all()
+    reserva = db_session.get(models.Reserva, id_reserva)
+    assert reserva.status == StatusReservaEnum.CANCELADA
+    assert reserva.veiculo.status == StatusVeiculoEnum.DISPONIVEL
@@ -1,7 +1,16 @@
 from datetime import datetime, timedelta
+from typing import List
 from fastapi.testclient import TestClient
 from httpx import Response
+from pydantic import TypeAdapter
 import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from src import main, models
+from src.catalogo import obter_versao_catalogo
+from src.database import engine
+from src.schemas.veiculo_schema import SchemaVeiculo
 
 # Testes de Integração (API/DB) para os endpoints de Veículos.
 # Cobre: CRUD de Passeio, Utilitário e Motocicleta, incluindo regras de negócio.
@@ -252,7 +261,7 @@ def test_tentar_deletar_veiculo_com_reserva_ativa_falha_400(
         "veiculo_id": id_veiculo_criado,
         "data_retirada": (datetime.now() + timedelta(days=1)).isoformat(),
         "data_devolucao": (datetime.now() + timedelta(days=3)).isoformat(),
-        "seguro_pessoal": True
+        "seguro_pessoal": True,
     }
     response_reserva = test_client.post(
         "/reservas/", json=dados_reserva, headers=client_auth_data["headers"]
@@ -539,3 +548,323 @@ def test_admin_deleta_veiculo_sem_reserva_sucesso_204(
     print(
         "\n[SUCESSO] Teste 'test_admin_deleta_veiculo_sem_reserva_sucesso_204' passou!"
     )
+
+
+@pytest.mark.integration
+def test_listar_veiculos_ordenado_por_diaria_pagina_com_cursor(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    )
+    test_client.post(
+        "/veiculos/utilitario",
+        json=veiculo_utilitario_valido,
+        headers=admin_auth_headers,
+    )
+    test_client.post(
+        "/veiculos/motocicleta",
+        json=veiculo_motocicleta_valido,
+        headers=admin_auth_headers,
+    )
+
+    params = {"ordenar_por": "valor_diaria", "direcao": "desc", "limite": 2}
+    primeira_pagina: Response = test_client.get("/veiculos/", params=params)
+
+    assert primeira_pagina.status_code == 200
+    assert [v["valor_diaria"] for v in primeira_pagina.json()] == [220.0, 150.5]
+    cursor = primeira_pagina.headers["X-Next-Cursor"]
+
+    segunda_pagina: Response = test_client.get(
+        "/veiculos/", params={**params, "cursor": cursor}
+    )
+
+    assert [v["valor_diaria"] for v in segunda_pagina.json()] == [120.0]
+    assert "X-Next-Cursor" not in segunda_pagina.headers
+
+    cursor_outra_ordenacao: Response = test_client.get(
+        "/veiculos/", params={"ordenar_por": "marca", "cursor": cursor}
+    )
+    assert cursor_outra_ordenacao.status_code == 400
+
+
+@pytest.mark.integration
+def test_buscar_veiculos_por_placa_e_relevancia(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    )
+    test_client.post(
+        "/veiculos/utilitario",
+        json=veiculo_utilitario_valido,
+        headers=admin_auth_headers,
+    )
+    test_client.post(
+        "/veiculos/motocicleta",
+        json=veiculo_motocicleta_valido,
+        headers=admin_auth_headers,
+    )
+
+    por_placa: Response = test_client.get(
+        "/veiculos/", params={"termo_busca": "abc1234"}
+    )
+    assert [v["placa"] for v in por_placa.json()] == ["ABC1234"]
+
+    # "F" abre o texto do Fiat Fiorino e só aparece no meio de "Golf".
+    por_relevancia: Response = test_client.get(
+        "/veiculos/", params={"termo_busca": "F", "limite": 1}
+    )
+    assert por_relevancia.status_code == 200
+    assert [v["placa"] for v in por_relevancia.json()] == ["UTL5678"]
+
+    proxima_pagina: Response = test_client.get(
+        "/veiculos/",
+        params={
+            "termo_busca": "F",
+            "limite": 1,
+            "cursor": por_relevancia.headers["X-Next-Cursor"],
+        },
+    )
+    assert [v["placa"] for v in proxima_pagina.json()] == ["ABC1234"]
+    assert "X-Next-Cursor" not in proxima_pagina.headers
+
+    sem_termo: Response = test_client.get(
+        "/veiculos/", params={"ordenar_por": "relevancia"}
+    )
+    assert sem_termo.status_code == 400
+
+
+@pytest.mark.integration
+def test_busca_com_termo_vazio_ou_curingas_de_like(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    )
+
+    # Termo vazio equivale a não buscar, como antes da busca textual.
+    termo_vazio: Response = test_client.get("/veiculos/?termo_busca=")
+    assert termo_vazio.status_code == 200
+    assert [v["placa"] for v in termo_vazio.json()] == ["ABC1234"]
+
+    # % e _ vêm do usuário como texto literal, não como curingas do LIKE.
+    for termo in ("%", "_", "abc_234"):
+        resposta: Response = test_client.get(
+            "/veiculos/", params={"termo_busca": termo}
+        )
+        assert resposta.status_code == 200
+        assert resposta.json() == []
+
+
+@pytest.mark.integration
+def test_catalogo_responde_304_ate_um_veiculo_mudar(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    primeira: Response = test_client.get("/veiculos/")
+    etag_lista = primeira.headers["ETag"]
+
+    nao_modificada = test_client.get(
+        "/veiculos/", headers={"If-None-Match": etag_lista}
+    )
+
+    assert nao_modificada.status_code == 304
+    assert nao_modificada.headers["ETag"] == etag_lista
+    assert nao_modificada.headers["X-DB-Queries"] == "0"  # resposta em cache
+
+    # Alteração só em coluna da subclasse também muda as duas ETags.
+    etag_veiculo = test_client.get(f"/veiculos/{id_veiculo}").headers["ETag"]
+    test_client.put(
+        f"/veiculos/passeio/{id_veiculo}",
+        json={"qtde_portas": 2},
+        headers=admin_auth_headers,
+    )
+
+    lista = test_client.get("/veiculos/", headers={"If-None-Match": etag_lista})
+    assert lista.status_code == 200
+    assert lista.headers["ETag"] != etag_lista
+    veiculo = test_client.get(
+        f"/veiculos/{id_veiculo}", headers={"If-None-Match": etag_veiculo}
+    )
+    assert veiculo.status_code == 200
+    assert veiculo.headers["ETag"] != etag_veiculo
+    revalidado = test_client.get(
+        f"/veiculos/{id_veiculo}", headers={"If-None-Match": veiculo.headers["ETag"]}
+    )
+    assert revalidado.status_code == 304
+
+
+@pytest.mark.integration
+def test_reserva_muda_versao_do_catalogo(
+    test_client: TestClient, admin_auth_headers: dict, client_auth_data: dict
+):
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    etag_lista = test_client.get("/veiculos/").headers["ETag"]
+
+    amanha = datetime.today() + timedelta(days=1)
+    test_client.post(
+        "/reservas/",
+        json={
+            "veiculo_id": id_veiculo,
+            "data_retirada": str(amanha),
+            "data_devolucao": str(amanha + timedelta(days=2)),
+        },
+        headers=client_auth_data["headers"],
+    )
+
+    response = test_client.get("/veiculos/", headers={"If-None-Match": etag_lista})
+    assert response.status_code == 200
+    assert response.json() == []  # reservado: fora dos disponíveis
+
+
+@pytest.mark.integration
+def test_catalogo_em_cache_tem_o_mesmo_corpo_do_response_model(
+    test_client: TestClient, admin_auth_headers: dict, db_session: Session
+):
+    for rota, dados in (
+        ("/veiculos/passeio", veiculo_passeio_valido),
+        ("/veiculos/utilitario", veiculo_utilitario_valido),
+        ("/veiculos/motocicleta", veiculo_motocicleta_valido),
+    ):
+        test_client.post(rota, json=dados, headers=admin_auth_headers)
+
+    montada: Response = test_client.get("/veiculos/")
+    em_cache: Response = test_client.get("/veiculos/")
+    assert em_cache.headers["X-DB-Queries"] == "0"
+
+    # O que o response_model List[SchemaVeiculo] produziria validando as
+    # linhas do banco, na ordem em que o catálogo as devolveu.
+    por_id = {
+        veiculo.id_veiculo: veiculo
+        for veiculo in db_session.scalars(select(models.Veiculo))
+    }
+    adaptador = TypeAdapter(List[SchemaVeiculo])
+    esperado = adaptador.dump_json(
+        adaptador.validate_python(
+            [por_id[item["id_veiculo"]] for item in montada.json()],
+            from_attributes=True,
+        )
+    )
+
+    assert len(montada.json()) == 3
+    assert montada.content == esperado
+    assert em_cache.content == esperado
+
+
+@pytest.mark.integration
+def test_versao_do_catalogo_muda_com_o_commit_sem_escrita_compartilhada(
+    test_client: TestClient, admin_auth_headers: dict, db_session: Session
+):
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    versao_inicial = obter_versao_catalogo(db_session)
+    db_session.rollback()
+
+    veiculo = db_session.get(models.Veiculo, id_veiculo)
+    veiculo.valor_diaria = 99.0
+    db_session.flush()
+    db_session.rollback()
+    assert obter_versao_catalogo(db_session) == versao_inicial
+
+    instrucoes = []
+
+    def registrar_instrucao(_conexao, _cursor, sql, *_args):
+        instrucoes.append(sql)
+
+    event.listen(engine, "before_cursor_execute", registrar_instrucao)
+    try:
+        veiculo = db_session.get(models.Veiculo, id_veiculo)
+        veiculo.valor_diaria = 99.0
+        db_session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar_instrucao)
+
+    # Só a própria linha do veículo é escrita: nenhum contador global para
+    # serializar reservas e transições concorrentes.
+    escritas = [sql for sql in instrucoes if not sql.lstrip().startswith("SELECT")]
+    assert len(escritas) == 1 and escritas[0].startswith("UPDATE veiculos")
+    versao_apos_preco = obter_versao_catalogo(db_session)
+    assert versao_apos_preco != versao_inicial
+
+    test_client.delete(f"/veiculos/{id_veiculo}", headers=admin_auth_headers)
+    assert obter_versao_catalogo(db_session) not in (versao_inicial, versao_apos_preco)
+
+
+@pytest.mark.integration
+def test_etag_do_catalogo_nao_se_repete_quando_o_id_e_reaproveitado(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    outro = {
+        **veiculo_passeio_valido,
+        "placa": "XYZ9A87",
+        "chassi": "9BWZZZ377VT004252",
+    }
+    test_client.post("/veiculos/passeio", json=outro, headers=admin_auth_headers)
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    etags = [test_client.get("/veiculos/").headers["ETag"]]
+
+    test_client.delete(f"/veiculos/{id_veiculo}", headers=admin_auth_headers)
+    etags.append(test_client.get("/veiculos/").headers["ETag"])
+
+    # O SQLite reaproveita o maior rowid: mesmo id, mesma quantidade.
+    recriado = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()
+    assert recriado["id_veiculo"] == id_veiculo
+    etags.append(test_client.get("/veiculos/").headers["ETag"])
+
+    assert len(set(etags)) == 3
+
+
+@pytest.mark.integration
+def test_catalogo_repetido_sai_do_cache_e_escrita_invalida(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    primeira: Response = test_client.get("/veiculos/?termo_busca=GOLF")
+
+    repetida = test_client.get("/veiculos/?termo_busca=golf")
+
+    assert repetida.headers["X-DB-Queries"] == "0"
+    assert repetida.content == primeira.content
+    assert repetida.headers["ETag"] == primeira.headers["ETag"]
+
+    test_client.put(
+        f"/veiculos/passeio/{id_veiculo}",
+        json={"valor_diaria": 99.0},
+        headers=admin_auth_headers,
+    )
+    depois_da_escrita = test_client.get("/veiculos/?termo_busca=golf")
+
+    assert int(depois_da_escrita.headers["X-DB-Queries"]) > 0
+    assert depois_da_escrita.json()[0]["valor_diaria"] == 99.0
+
+
+@pytest.mark.integration
+def test_inicializacao_adiciona_versao_a_tabela_de_veiculos_existente(
+    test_client: TestClient, admin_auth_headers: dict, db_session: Session
+):
+    id_veiculo = test_client.post(
+        "/veiculos/passeio", json=veiculo_passeio_valido, headers=admin_auth_headers
+    ).json()["id_veiculo"]
+    # Tabela de antes da coluna (e do seu índice) existir.
+    db_session.execute(text("DROP INDEX ix_veiculos_versao"))
+    db_session.execute(text("ALTER TABLE veiculos DROP COLUMN versao"))
+    db_session.commit()
+
+    main.criar_colunas_ausentes()
+    main.criar_indices_ausentes()
+
+    response = test_client.get(f"/veiculos/{id_veiculo}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'W/"veiculo-{id_veiculo}-1"'
@@ -99,6 +99,23 @@ def test_autenticar_funcionario_senha_incorreta(
     )
 
 
+@pytest.mark.unit
+@patch("src.services.auth_service.seguranca_service.invalidar_principal_funcionario")
+def test_desativar_funcionario_invalida_cache_de_principal(mock_invalidar):
+    mock_sessao = MagicMock()
+    mock_funcionario = MagicMock()
+    mock_funcionario.email = "staff@frotanext.com"
+    mock_sessao.get.return_value = mock_funcionario
+
+    resultado = auth_service.alterar_status_funcionario(
+        sessao_banco=mock_sessao, id_funcionario=7, e_ativado=False
+    )
+
+    assert resultado.e_ativado is False
+    mock_sessao.commit.assert_called_once()
+    mock_invalidar.assert_called_once_with("staff@frotanext.com")
+
+
 @pytest.mark.unit
 @patch("src.services.cliente_auth_service.seguranca_service.verificar_senha")
 def test_autenticar_cliente_sucesso(mock_verificar_senha, mocker):
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from src.cache import CacheLRU, GeracaoCache
+
+
+@pytest.mark.unit
+def test_cache_lru_descarta_entrada_usada_ha_mais_tempo():
+    cache = CacheLRU(tamanho_maximo=2)
+    cache.definir("a", 1)
+    cache.definir("b", 2)
+
+    assert cache.obter("a") == 1  # "b" passa a ser a menos recente
+    cache.definir("c", 3)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1
+    assert cache.obter("c") == 3
+
+
+@pytest.mark.unit
+def test_cache_lru_respeita_expiracao_e_conta_acertos():
+    cache = CacheLRU(tamanho_maximo=10)
+    cache.definir("vencida", "x", expira_em=time.time() - 1)
+    cache.definir("valida", "y", expira_em=time.time() + 60)
+
+    assert cache.obter("vencida") is None
+    assert cache.obter("valida") == "y"
+    assert cache.obter("ausente", "padrao") == "padrao"
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas["acertos"] == 1
+    assert estatisticas["falhas"] == 2
+    assert estatisticas["entradas"] == 1
+
+
+@pytest.mark.unit
+def test_geracao_cache_descarta_valor_montado_antes_da_invalidacao():
+    cache = CacheLRU(tamanho_maximo=4)
+    geracao = GeracaoCache(cache)
+    cache.definir("antigo", 0)
+
+    capturada = geracao.atual()
+    geracao.invalidar()  # escrita concorrente com a montagem do valor
+    geracao.definir_se_atual(capturada, "a", 1)
+
+    assert cache.obter("antigo") is None
+    assert cache.obter("a") is None
+
+    geracao.definir_se_atual(geracao.atual(), "a", 2)
+    assert cache.obter("a") == 2
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+# Testes Unitários para a configuração do pool de conexões e roteamento de réplica.
+from src import models
+from src.database import (
+    Base,
+    PoolObservavel,
+    SessaoRoteada,
+    obter_estatisticas_pool,
+)
+
+
+@pytest.mark.unit
+def test_pool_observavel_registra_checkouts_e_overflow():
+    engine_teste = create_engine(
+        "sqlite://", poolclass=PoolObservavel, pool_size=1, max_overflow=1
+    )
+
+    with engine_teste.connect() as conexao_1, engine_teste.connect() as conexao_2:
+        conexao_1.execute(text("SELECT 1"))
+        conexao_2.execute(text("SELECT 1"))
+        estatisticas = obter_estatisticas_pool(engine_teste)
+
+        assert estatisticas["conexoes_em_uso"] == 2
+        assert estatisticas["overflow"] == 1
+        assert estatisticas["aguardando"] == 0
+
+    estatisticas_final = obter_estatisticas_pool(engine_teste)
+    assert estatisticas_final["conexoes_em_uso"] == 0
+    assert estatisticas_final["total_checkouts"] == 2
+    # Havia conexão ou overflow livre: abrir uma conexão nova não é espera.
+    assert estatisticas_final["checkouts_com_espera"] == 0
+    assert estatisticas_final["espera_maxima_ms"] == 0
+
+
+@pytest.mark.unit
+def test_pool_observavel_mede_espera_quando_esgotado():
+    engine_teste = create_engine(
+        "sqlite://",
+        poolclass=PoolObservavel,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    with engine_teste.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine_teste.connect()
+
+    estatisticas = obter_estatisticas_pool(engine_teste)
+    assert estatisticas["aguardando"] == 0
+    assert estatisticas["checkouts_com_espera"] == 1
+    assert estatisticas["espera_maxima_ms"] >= 50
+
+
+@pytest.mark.unit
+def test_sessao_roteada_le_da_replica_ate_a_primeira_escrita(tmp_path):
+    engine_primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    engine_replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(engine_primario)
+    Base.metadata.create_all(engine_replica)
+
+    fabrica_sessao = sessionmaker(
+        class_=SessaoRoteada, bind=engine_primario, bind_replica=engine_replica
+    )
+    consulta_emails = select(models.Funcionario.email)
+
+    with fabrica_sessao() as sessao_banco:
+        assert sessao_banco.scalars(consulta_emails).all() == []
+
+        sessao_banco.add(
+            models.Funcionario(
+                email="novo@frotanext.com", nome_completo="Novo", senha="hash"
+            )
+        )
+        sessao_banco.commit()
+
+        assert sessao_banco.escreveu_no_primario is True
+        assert sessao_banco.scalars(consulta_emails).all() == ["novo@frotanext.com"]
+
+    with fabrica_sessao() as outra_sessao:
+        assert outra_sessao.scalars(consulta_emails).all() == []
+
+
+@pytest.mark.unit
+def test_sessao_roteada_sem_replica_usa_o_primario(tmp_path):
+    engine_primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    fabrica_sessao = sessionmaker(class_=SessaoRoteada, bind=engine_primario)
+
+    with fabrica_sessao() as sessao_banco:
+        assert sessao_banco.get_bind() is engine_primario
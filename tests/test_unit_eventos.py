@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.eventos import HubEventos
+from src.routers import veiculo_router
+
+
+@pytest.mark.unit
+def test_hub_entrega_eventos_publicados_de_outra_thread_em_ordem():
+    async def cenario():
+        hub = HubEventos(tamanho_fila=10)
+        assinatura = hub.assinar()
+        publicador = threading.Thread(
+            target=lambda: [hub.publicar(f"evento {i}") for i in range(3)]
+        )
+        publicador.start()
+        publicador.join()
+        return [await assinatura.proximo() for _ in range(3)]
+
+    assert asyncio.run(cenario()) == [(1, "evento 0"), (2, "evento 1"), (3, "evento 2")]
+
+
+@pytest.mark.unit
+def test_hub_descarta_evento_mais_antigo_quando_fila_do_assinante_enche():
+    async def cenario():
+        hub = HubEventos(tamanho_fila=2)
+        assinatura = hub.assinar()
+        for i in range(5):
+            hub.publicar(i)
+        await asyncio.sleep(0)  # entregas agendadas no loop do assinante
+        recebidos = [await assinatura.proximo(), await assinatura.proximo()]
+        return recebidos, hub.estatisticas()
+
+    recebidos, estatisticas = asyncio.run(cenario())
+
+    assert recebidos == [(4, 3), (5, 4)]
+    assert estatisticas == {"assinantes": 1, "publicados": 5, "descartados": 3}
+
+
+@pytest.mark.unit
+def test_rota_sse_emite_status_veiculo_e_cancela_assinatura_ao_fechar():
+    async def cenario():
+        fluxo = veiculo_router.rota_eventos_status_veiculos()
+        proximo = asyncio.ensure_future(anext(fluxo))
+        while veiculo_router.hub_status_veiculos.estatisticas()["assinantes"] == 0:
+            await asyncio.sleep(0)
+        veiculo_router.hub_status_veiculos.publicar({"id_veiculo": 7})
+        evento = await asyncio.wait_for(proximo, timeout=5)
+        await fluxo.aclose()
+        return evento, veiculo_router.hub_status_veiculos.estatisticas()
+
+    evento, estatisticas = asyncio.run(cenario())
+
+    assert evento.event == "status_veiculo"
+    assert evento.data == {"id_veiculo": 7}
+    assert int(evento.id) >= 1
+    assert estatisticas["assinantes"] == 0
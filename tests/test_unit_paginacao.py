@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+# Testes Unitários para os utilitários de paginação por cursor (keyset).
+from src.paginacao import (
+    cabecalhos_pagina,
+    codificar_cursor,
+    decodificar_cursor,
+    montar_pagina,
+)
+
+
+@pytest.mark.unit
+def test_cursor_roundtrip_preserva_data_e_id():
+    data = datetime(2025, 3, 10, 14, 30)
+
+    token = codificar_cursor((data, 42))
+
+    assert decodificar_cursor(token, (datetime.fromisoformat, int)) == [data, 42]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token", ["nao-e-base64!!", codificar_cursor([1, 2, 3])])
+def test_cursor_invalido_gera_400(token):
+    with pytest.raises(HTTPException) as exc_info:
+        decodificar_cursor(token, (datetime.fromisoformat, int))
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_montar_pagina_so_gera_cursor_quando_ha_excedente():
+    pagina_final = montar_pagina([1, 2], limite=2, chave_cursor=lambda item: (item,))
+    pagina_com_mais = montar_pagina(
+        [1, 2, 3], limite=2, chave_cursor=lambda item: (item,)
+    )
+
+    assert pagina_final.itens == [1, 2]
+    assert pagina_final.proximo_cursor is None
+    assert pagina_com_mais.itens == [1, 2]
+    assert decodificar_cursor(pagina_com_mais.proximo_cursor, (int,)) == [2]
+
+
+@pytest.mark.unit
+def test_cabecalhos_pagina_so_tem_cursor_quando_ha_proxima_pagina():
+    assert cabecalhos_pagina(None) == {}
+    assert cabecalhos_pagina("abc") == {"X-Next-Cursor": "abc"}
@@ -0,0 +1,146 @@
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from src.models.enums import (
+    CorVeiculoEnum,
+    StatusReservaEnum,
+    StatusVeiculoEnum,
+    TipoVeiculoEnum,
+)
+from src.respostas import construtor_confiavel
+from src.schemas import cliente_schema, reserva_schema, veiculo_schema
+
+_ADAPTADOR = TypeAdapter(List[reserva_schema.SchemaReserva])
+
+
+def _endereco():
+    return SimpleNamespace(
+        id_endereco=1,
+        rua="Rua",
+        numero="10",
+        complemento=None,
+        bairro="Centro",
+        cidade="Cidade",
+        estado="TS",
+        cep="12345000",
+    )
+
+
+def _pessoa_fisica(id_pessoa=1):
+    return SimpleNamespace(
+        tipo_pessoa="pessoa_fisica",
+        id_pessoa=id_pessoa,
+        email=f"pf{id_pessoa}@email.com",
+        telefone="999999999",
+        nome_completo="Cliente PF",
+        cpf="12345678901",
+        cnh=None,
+        e_ativo=True,
+        data_criacao=datetime(2026, 1, 1, 8, 0, 0, 5),
+        endereco=_endereco(),
+    )
+
+
+def _pessoa_juridica():
+    return SimpleNamespace(
+        tipo_pessoa="pessoa_juridica",
+        id_pessoa=2,
+        email="pj@email.com",
+        telefone="888888888",
+        razao_social="Empresa LTDA",
+        nome_fantasia=None,
+        cnpj="12345678000199",
+        e_ativo=True,
+        data_criacao=datetime(2026, 1, 1, 8, 0, 0),
+        endereco=_endereco(),
+        motoristas=[_pessoa_fisica(3)],
+    )
+
+
+def _reserva(cliente, motorista=None):
+    # Passeio: sem os atributos de utilitário/moto, que ficam no default.
+    veiculo = SimpleNamespace(
+        id_veiculo=7,
+        tipo_veiculo=TipoVeiculoEnum.PASSEIO,
+        status=StatusVeiculoEnum.RESERVADO,
+        placa="ABC1D23",
+        marca="Marca",
+        modelo="Modelo",
+        cor=CorVeiculoEnum.PRETO,
+        valor_diaria=150.5,
+        ano_fabricacao=2023,
+        ano_modelo=2024,
+        chassi="CHASSI",
+        renavam=None,
+        capacidade_tanque=50.0,
+        cambio_automatico=True,
+        ar_condicionado=True,
+        imagem_url=None,
+        tipo_carroceria="Sedan",
+        qtde_portas=4,
+        qtde_passageiros=5,
+    )
+    return SimpleNamespace(
+        id_reserva=1,
+        veiculo_id=7,
+        data_retirada=datetime(2026, 10, 17, 9, 30, 15, 123456),
+        data_devolucao=datetime(2026, 10, 20, 9, 30),
+        data_criacao=datetime(2026, 10, 16, 12, 0),
+        seguro_pessoal=True,
+        seguro_terceiros=False,
+        valor_diaria_no_momento=150.5,
+        valor_total_estimado=451.5,
+        status=StatusReservaEnum.CONFIRMADA,
+        cliente_id=cliente.id_pessoa,
+        cliente=cliente,
+        veiculo=veiculo,
+        motorista_id=motorista.id_pessoa if motorista else None,
+        motorista=motorista,
+    )
+
+
+@pytest.mark.unit
+def test_construcao_confiavel_gera_os_mesmos_bytes_da_validacao():
+    reservas = [
+        _reserva(_pessoa_fisica()),
+        _reserva(_pessoa_juridica(), motorista=_pessoa_fisica(3)),
+    ]
+
+    construidas = construtor_confiavel(List[reserva_schema.SchemaReserva])(reservas)
+
+    assert _ADAPTADOR.dump_json(construidas) == _ADAPTADOR.dump_json(
+        _ADAPTADOR.validate_python(reservas, from_attributes=True)
+    )
+
+
+@pytest.mark.unit
+def test_uniao_do_cliente_resolvida_pelo_tipo_pessoa():
+    construir = construtor_confiavel(reserva_schema.SchemaCliente)
+
+    assert isinstance(construir(_pessoa_fisica()), cliente_schema.SchemaPessoaFisica)
+    empresa = construir(_pessoa_juridica())
+    assert isinstance(empresa, cliente_schema.SchemaPessoaJuridica)
+    assert isinstance(empresa.motoristas[0], cliente_schema.SchemaPessoaFisica)
+
+
+@pytest.mark.unit
+def test_uniao_com_tipo_pessoa_desconhecido_recorre_a_validacao():
+    pessoa = _pessoa_fisica()
+    pessoa.tipo_pessoa = "pessoa"
+
+    construido = construtor_confiavel(reserva_schema.SchemaCliente)(pessoa)
+
+    assert isinstance(construido, cliente_schema.SchemaPessoaFisica)
+
+
+@pytest.mark.unit
+def test_campo_obrigatorio_ausente_no_objeto_falha():
+    veiculo = _reserva(_pessoa_fisica()).veiculo
+    del veiculo.placa
+
+    with pytest.raises(AttributeError):
+        construtor_confiavel(veiculo_schema.SchemaVeiculo)(veiculo)
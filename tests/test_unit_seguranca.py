@@ -1,13 +1,22 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 import pytest
+from fastapi import HTTPException
 
 # Testes Unitários para as funções de Segurança.
 # Cobre: Hashing de senhas e criação/validação de tokens JWT.
 from src.seguranca import (
+    PoolHashSenha,
+    TabelaVersoesToken,
+    cache_tokens,
     criar_token_acesso,
     obter_hash_senha,
+    obter_hash_senha_async,
     verificar_senha,
+    verificar_senha_async,
     verificar_token,
 )
 
@@ -26,6 +35,40 @@ def test_hash_senha_e_verificacao_roundtrip():
     assert verificar_senha("SenhaErrada", hash_da_senha) is False
 
 
+@pytest.mark.unit
+def test_hash_senha_async_roundtrip():
+    async def roundtrip():
+        hash_da_senha = await obter_hash_senha_async("MinhaSenha@123!")
+        return (
+            await verificar_senha_async("MinhaSenha@123!", hash_da_senha),
+            await verificar_senha_async("SenhaErrada", hash_da_senha),
+        )
+
+    assert asyncio.run(roundtrip()) == (True, False)
+
+
+@pytest.mark.unit
+def test_pool_hash_senha_rejeita_com_503_quando_saturado():
+    pool = PoolHashSenha(processos=1, fila_maxima=1)
+    try:
+        em_execucao = pool.executar(time.sleep, 0.5)
+        na_fila = pool.executar(time.sleep, 0)
+
+        with pytest.raises(HTTPException) as excecao:
+            pool.executar(time.sleep, 0)
+        assert excecao.value.status_code == 503
+
+        estatisticas = pool.estatisticas()
+        assert estatisticas["em_execucao"] == 1
+        assert estatisticas["aguardando"] == 1
+        assert estatisticas["rejeitadas"] == 1
+
+        em_execucao.result()
+        na_fila.result()
+    finally:
+        pool.encerrar()
+
+
 @pytest.mark.unit
 def test_token_jwt_roundtrip_e_payload():
     dados_para_o_token = {"sub": "teste@frotanext.com", "id_usuario": 123}
@@ -49,3 +92,76 @@ def test_verificar_token_invalido_retorna_none():
 
     assert verificar_token(token_falso) is None
     assert verificar_token(token_malformado) is None
+
+
+@pytest.mark.unit
+def test_verificar_token_reaproveita_payload_do_cache():
+    token_jwt = criar_token_acesso(dados={"sub": "cache@frotanext.com"})
+    acertos_antes = cache_tokens.acertos
+
+    primeiro = verificar_token(token_jwt)
+    primeiro["sub"] = "alterado"  # o chamador recebe uma cópia
+    segundo = verificar_token(token_jwt)
+
+    assert segundo["sub"] == "cache@frotanext.com"
+    assert cache_tokens.acertos == acertos_antes + 1
+
+
+@pytest.mark.unit
+def test_verificar_token_expirado_nao_vem_do_cache():
+    token_expirado = criar_token_acesso(
+        dados={"sub": "expirado@frotanext.com"}, expira_em=timedelta(seconds=-1)
+    )
+
+    assert verificar_token(token_expirado) is None
+    assert verificar_token(token_expirado) is None
+
+
+@pytest.mark.unit
+def test_tabela_versoes_token_recarrega_por_intervalo_e_para_email_novo():
+    cargas = []
+
+    def carregar():
+        cargas.append(1)
+        return {"a@frotanext.com": len(cargas)}
+
+    tabela = TabelaVersoesToken(intervalo_segundos=60, intervalo_ausente_segundos=0.05)
+
+    assert tabela.versao_vigente("a@frotanext.com", carregar) == 1
+    assert tabela.versao_vigente("a@frotanext.com", carregar) == 1
+    assert len(cargas) == 1
+
+    # Logo após uma carga, email desconhecido não consulta o banco de novo.
+    assert tabela.versao_vigente("novo@frotanext.com", carregar) is None
+    assert len(cargas) == 1
+
+    # Passado o intervalo, força uma recarga (funcionário recém-criado).
+    time.sleep(0.06)
+    assert tabela.versao_vigente("novo@frotanext.com", carregar) is None
+    assert len(cargas) == 2
+
+    tabela.registrar("a@frotanext.com", None)
+    time.sleep(0.06)
+    assert tabela.versao_vigente("a@frotanext.com", carregar) == 3
+
+
+@pytest.mark.unit
+def test_tabela_versoes_token_compartilha_recarga_entre_ausentes_concorrentes():
+    cargas = []
+
+    def carregar():
+        cargas.append(1)
+        time.sleep(0.05)
+        return {}
+
+    tabela = TabelaVersoesToken(intervalo_segundos=60, intervalo_ausente_segundos=60)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(
+            executor.map(
+                lambda _: tabela.versao_vigente("revogado@frotanext.com", carregar),
+                range(32),
+            )
+        )
+
+    assert resultados == [None] * 32
+    assert len(cargas) == 1